@@ -1,11 +1,19 @@
 from django.contrib import admin
-from .models import Chamado, Comentario, Video
+from vision_hub.paginacao import PaginadorEstimado
+from .models import (
+    ArquivoVideo, Chamado, ChamadoArquivado, Comentario, ComentarioArquivado, MetricaDiaria,
+    Video, VideoArquivado,
+)
+from .services import ArquivamentoService
 
 
 class VideoInline(admin.TabularInline):
+    # Vídeos só entram pelo VideoService (contadores, blob, metadados).
     model = Video
     extra = 0
-    readonly_fields = ('nome_original', 'tamanho', 'enviado_por', 'enviado_em')
+    fields = ('nome_original', 'descricao', 'tamanho', 'duracao', 'mime_type', 'enviado_por', 'enviado_em')
+    readonly_fields = ('nome_original', 'tamanho', 'duracao', 'mime_type', 'enviado_por', 'enviado_em')
+    max_num = 0
 
 
 class ComentarioInline(admin.TabularInline):
@@ -17,25 +25,93 @@ class ComentarioInline(admin.TabularInline):
 
 @admin.register(Chamado)
 class ChamadoAdmin(admin.ModelAdmin):
+    # Tabelas grandes: total estimado pelo pg_class, sem COUNT(*) extra.
+    paginator = PaginadorEstimado
+    show_full_result_count = False
     list_display = (
         'id', 'titulo', 'cliente', 'status', 'prioridade',
         'tipo_compartilhamento', 'criado_por', 'criado_em',
     )
     list_filter = ('status', 'prioridade', 'tipo_compartilhamento')
     search_fields = ('titulo', 'descricao', 'cliente__nome', 'slug')
-    readonly_fields = ('slug', 'criado_em', 'atualizado_em')
+    # A senha é um hash: só se troca pelo formulário do chamado.
+    readonly_fields = ('slug', 'senha_compartilhamento', 'criado_em', 'atualizado_em')
     inlines = [VideoInline, ComentarioInline]
 
 
+class VideoArquivadoInline(admin.TabularInline):
+    model = VideoArquivado
+    extra = 0
+    fields = readonly_fields = (
+        'nome_original', 'tamanho', 'duracao', 'mime_type', 'enviado_por', 'enviado_em',
+    )
+    can_delete = False
+    max_num = 0
+
+
+class ComentarioArquivadoInline(admin.TabularInline):
+    model = ComentarioArquivado
+    extra = 0
+    fields = readonly_fields = ('autor_display', 'texto', 'criado_em')
+    can_delete = False
+    max_num = 0
+
+
+@admin.register(ChamadoArquivado)
+class ChamadoArquivadoAdmin(admin.ModelAdmin):
+    """Somente leitura: o arquivo só muda pelo arquivar_chamados e pela restauração."""
+    paginator = PaginadorEstimado
+    show_full_result_count = False
+    list_display = ('id', 'titulo', 'cliente', 'status', 'criado_por', 'criado_em', 'arquivado_em')
+    list_filter = ('prioridade', 'tipo_compartilhamento')
+    search_fields = ('titulo', 'cliente__nome', 'slug')
+    inlines = [VideoArquivadoInline, ComentarioArquivadoInline]
+    actions = ['restaurar']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.action(description='Restaurar chamados selecionados')
+    def restaurar(self, request, queryset):
+        total = ArquivamentoService.restaurar(queryset.values_list('pk', flat=True))
+        self.message_user(request, f'{total} chamado(s) restaurado(s).')
+
+
 @admin.register(Video)
 class VideoAdmin(admin.ModelAdmin):
-    list_display = ('nome_original', 'chamado', 'tamanho', 'enviado_por', 'enviado_em')
-    list_filter = ('enviado_em',)
+    paginator = PaginadorEstimado
+    show_full_result_count = False
+    list_display = ('nome_original', 'chamado', 'tamanho', 'duracao', 'codec', 'enviado_por', 'enviado_em')
+    list_filter = ('enviado_em', 'mime_type')
+    # Arquivo, tamanho e chamado alimentam os contadores e o blob: só o
+    # VideoService cria vídeos; aqui se edita apenas a descrição.
+    readonly_fields = (
+        'chamado', 'arquivo', 'blob', 'nome_original', 'tamanho', 'otimizado',
+        'duracao', 'largura', 'altura', 'codec', 'mime_type', 'enviado_por', 'enviado_em',
+    )
     search_fields = ('nome_original', 'descricao')
 
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(ArquivoVideo)
+class ArquivoVideoAdmin(admin.ModelAdmin):
+    list_display = ('sha256', 'tamanho', 'referencias', 'criado_em')
+    search_fields = ('sha256',)
+    readonly_fields = ('sha256', 'arquivo', 'tamanho', 'referencias', 'criado_em')
+
+    def has_add_permission(self, request):
+        return False
+
 
 @admin.register(Comentario)
 class ComentarioAdmin(admin.ModelAdmin):
+    paginator = PaginadorEstimado
+    show_full_result_count = False
     list_display = ('chamado', 'autor_display', 'texto_truncado', 'criado_em')
     list_filter = ('criado_em',)
     search_fields = ('texto', 'autor_nome', 'autor_usuario__username')
@@ -44,3 +120,13 @@ class ComentarioAdmin(admin.ModelAdmin):
     def texto_truncado(self, obj):
         return obj.texto[:50] + '...' if len(obj.texto) > 50 else obj.texto
     texto_truncado.short_description = 'Texto'
+
+
+@admin.register(MetricaDiaria)
+class MetricaDiariaAdmin(admin.ModelAdmin):
+    list_display = (
+        'dia', 'usuario', 'chamados_criados', 'chamados_resolvidos',
+        'videos_enviados', 'bytes_enviados',
+    )
+    list_filter = ('dia',)
+    date_hierarchy = 'dia'
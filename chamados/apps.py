@@ -5,3 +5,6 @@ class ChamadosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'chamados'
     verbose_name = 'Chamados'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,325 @@
+"""
+Busca textual de chamados.
+
+O texto pesquisável de cada chamado (título, descrição, nome e documento do
+cliente e comentários) fica em um índice próprio, mantido pelos sinais de
+``chamados.signals``:
+
+- SQLite: tabela virtual FTS5 ``chamados_busca`` (``rowid`` = id do chamado),
+  tokenizador ``unicode61`` sem acentos, ranking por ``bm25``;
+- PostgreSQL: tabela ``chamados_busca`` com ``tsvector`` (configuração
+  ``portuguese``, com stemming) e índice GIN, ranking por ``ts_rank``;
+- demais bancos (ou FTS5 indisponível): ``icontains``, sem ranking.
+
+Os acentos são removidos em Python antes de indexar e de pesquisar, então
+"acao" encontra "Ação" em qualquer backend.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+from django.db import connection, models
+
+TABELA = 'chamados_busca'
+
+# Pesos por coluna: título, descrição, cliente, comentários.
+PESOS_BM25 = (10.0, 2.0, 5.0, 1.0)
+PESOS_TSVECTOR = ('A', 'C', 'B', 'D')
+
+_PALAVRA = re.compile(r'\w+')
+
+
+def sem_acentos(texto):
+    normalizado = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in normalizado if not unicodedata.combining(c))
+
+
+def termos(consulta):
+    """Palavras da consulta, sem acentos e em minúsculas (máx. 16)."""
+    return _PALAVRA.findall(sem_acentos(consulta).lower())[:16]
+
+
+def _so_digitos(texto):
+    return re.sub(r'\D', '', texto or '')
+
+
+# ─────────────────── Índice no ORM ───────────────────
+# Campos e expressões dos modelos IndiceBuscaFTS5 / IndiceBuscaTsvector, para
+# a busca juntar o índice aos chamados numa única consulta.
+class DocumentoFTS5(models.TextField):
+    """
+    Coluna oculta de uma tabela FTS5 (de mesmo nome da tabela): alvo do
+    ``MATCH`` e primeiro argumento das funções de ranking.
+    """
+
+
+class VetorBusca(models.TextField):
+    def db_type(self, conexao):
+        return 'tsvector'
+
+
+class Match(models.Lookup):
+    """``documento MATCH expressao`` (FTS5) / ``vetor @@ to_tsquery(expressao)``."""
+
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, conexao):
+        lhs, lhs_params = self.process_lhs(compiler, conexao)
+        rhs, rhs_params = self.process_rhs(compiler, conexao)
+        if isinstance(self.lhs.output_field, VetorBusca):
+            return f"{lhs} @@ to_tsquery('portuguese', {rhs})", [*lhs_params, *rhs_params]
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+DocumentoFTS5.register_lookup(Match)
+VetorBusca.register_lookup(Match)
+
+
+class Bm25(models.Func):
+    """``bm25(tabela, pesos...)``: menor é mais relevante."""
+
+    function = 'bm25'
+    output_field = models.FloatField()
+
+    def __init__(self, documento, pesos):
+        super().__init__(documento, *(models.Value(p) for p in pesos))
+
+
+class TsRank(models.Func):
+    function = 'ts_rank'
+    template = "%(function)s(%(expressions)s)"
+    output_field = models.FloatField()
+
+    def __init__(self, vetor, expressao):
+        consulta = models.Func(
+            models.Value(expressao), template="to_tsquery('portuguese', %(expressions)s)",
+        )
+        super().__init__(vetor, consulta)
+
+
+# ─────────────────── Documentos ───────────────────
+def documentos(chamado_ids, Chamado=None, Comentario=None, using=None):
+    """
+    Retorna ``{id: (titulo, descricao, cliente, comentarios)}`` dos chamados
+    informados, em duas consultas no banco ``using``. ``Chamado``/``Comentario``
+    podem ser os modelos históricos de uma migração.
+    """
+    if Chamado is None:
+        from .models import Chamado, Comentario
+
+    docs = {}
+    linhas = Chamado.objects.using(using).filter(pk__in=chamado_ids).values_list(
+        'pk', 'slug', 'titulo', 'descricao', 'cliente__nome', 'cliente__nome_fantasia',
+        'cliente__cpf', 'cliente__cnpj',
+    )
+    for pk, slug, titulo, descricao, nome, fantasia, cpf, cnpj in linhas:
+        # O documento entra formatado e só com dígitos.
+        cliente = ' '.join(filter(None, [
+            nome, fantasia, cpf, cnpj, _so_digitos(cpf), _so_digitos(cnpj),
+        ]))
+        docs[pk] = [f'{titulo} {slug}', descricao, cliente, []]
+
+    comentarios = Comentario.objects.using(using).filter(chamado_id__in=docs).order_by()
+    for chamado_id, texto in comentarios.values_list('chamado_id', 'texto'):
+        docs[chamado_id][3].append(texto)
+
+    return {
+        pk: tuple(sem_acentos(t) for t in (titulo, descricao, cliente, '\n'.join(textos)))
+        for pk, (titulo, descricao, cliente, textos) in docs.items()
+    }
+
+
+# ─────────────────── Backends ───────────────────
+class BuscaLike:
+    """
+    ``icontains`` em todos os campos (sem índice nem ranking).
+
+    Cada backend lê e grava o índice pela conexão recebida: a do
+    ``schema_editor`` na migração, a padrão no restante.
+    """
+
+    nome = 'like'
+
+    def __init__(self, conexao=None):
+        self.conexao = conexao or connection
+
+    def criar(self, schema_editor):
+        pass
+
+    def remover_estrutura(self, schema_editor):
+        pass
+
+    def indexar(self, chamado_ids, Chamado=None, Comentario=None):
+        pass
+
+    def remover(self, chamado_ids):
+        pass
+
+    def filtrar(self, qs, consulta):
+        from django.db.models import Exists, OuterRef, Q
+
+        from .models import Comentario
+
+        filtro = Q()
+        for termo in consulta.split():
+            filtro &= (
+                Q(titulo__icontains=termo)
+                | Q(descricao__icontains=termo)
+                | Q(slug__icontains=termo)
+                | Q(cliente__nome__icontains=termo)
+                | Q(cliente__nome_fantasia__icontains=termo)
+                | Q(cliente__cpf__icontains=termo)
+                | Q(cliente__cnpj__icontains=termo)
+                | Exists(Comentario.objects.filter(
+                    chamado=OuterRef('pk'), texto__icontains=termo,
+                ))
+            )
+        return qs.filter(filtro)
+
+
+class BuscaSQLite(BuscaLike):
+    """FTS5 com ``remove_diacritics`` e prefixo em cada termo."""
+
+    nome = 'sqlite-fts5'
+
+    def criar(self, schema_editor):
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {TABELA} USING fts5('
+            'titulo, descricao, cliente, comentarios, '
+            "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+
+    def remover_estrutura(self, schema_editor):
+        schema_editor.execute(f'DROP TABLE IF EXISTS {TABELA}')
+
+    def indexar(self, chamado_ids, Chamado=None, Comentario=None):
+        docs = documentos(chamado_ids, Chamado, Comentario, using=self.conexao.alias)
+        with self.conexao.cursor() as cursor:
+            self._apagar(cursor, chamado_ids)
+            cursor.executemany(
+                f'INSERT INTO {TABELA} (rowid, titulo, descricao, cliente, comentarios) '
+                'VALUES (%s, %s, %s, %s, %s)',
+                [(pk, *doc) for pk, doc in docs.items()],
+            )
+
+    def remover(self, chamado_ids):
+        with self.conexao.cursor() as cursor:
+            self._apagar(cursor, chamado_ids)
+
+    @staticmethod
+    def _apagar(cursor, chamado_ids):
+        cursor.executemany(
+            f'DELETE FROM {TABELA} WHERE rowid = %s', [(pk,) for pk in chamado_ids],
+        )
+
+    @staticmethod
+    def expressao(consulta):
+        return ' '.join(f'"{t}"*' for t in termos(consulta))
+
+    def filtrar(self, qs, consulta):
+        expressao = self.expressao(consulta)
+        if not expressao:
+            return qs
+        # Junção com a tabela FTS5 (IndiceBuscaFTS5): bm25() só existe na
+        # mesma consulta do MATCH; numa subconsulta correlacionada seria
+        # recalculado, com as estatísticas do índice todo, a cada linha.
+        return qs.filter(
+            indice_fts5__documento__match=expressao,
+        ).annotate(
+            relevancia=-Bm25('indice_fts5__documento', PESOS_BM25),
+        ).order_by('-relevancia', '-criado_em', '-id')
+
+
+class BuscaPostgres(BuscaLike):
+    """``tsvector`` em português com índice GIN e ``ts_rank``."""
+
+    nome = 'postgresql'
+
+    def criar(self, schema_editor):
+        schema_editor.execute(
+            # Sem FOREIGN KEY: o TRUNCATE do flush (e dos testes) não sabe
+            # desta tabela e falharia com a referência a chamados_chamado.
+            f'CREATE TABLE IF NOT EXISTS {TABELA} ('
+            'chamado_id bigint PRIMARY KEY, vetor tsvector NOT NULL)'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {TABELA}_vetor ON {TABELA} USING gin (vetor)'
+        )
+
+    def remover_estrutura(self, schema_editor):
+        schema_editor.execute(f'DROP TABLE IF EXISTS {TABELA}')
+
+    def indexar(self, chamado_ids, Chamado=None, Comentario=None):
+        docs = documentos(chamado_ids, Chamado, Comentario, using=self.conexao.alias)
+        vetor = ' || '.join(
+            f"setweight(to_tsvector('portuguese', %s), '{peso}')" for peso in PESOS_TSVECTOR
+        )
+        with self.conexao.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {TABELA} (chamado_id, vetor) VALUES (%s, {vetor}) '
+                'ON CONFLICT (chamado_id) DO UPDATE SET vetor = EXCLUDED.vetor',
+                [(pk, *doc) for pk, doc in docs.items()],
+            )
+
+    def remover(self, chamado_ids):
+        with self.conexao.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {TABELA} WHERE chamado_id = ANY(%s)', [chamado_ids])
+
+    @staticmethod
+    def expressao(consulta):
+        return ' & '.join(f'{t}:*' for t in termos(consulta))
+
+    def filtrar(self, qs, consulta):
+        expressao = self.expressao(consulta)
+        if not expressao:
+            return qs
+        # Junção com a tabela (IndiceBuscaTsvector), como no SQLite: o
+        # ts_rank sai da mesma linha do @@, sem nova busca por chamado.
+        return qs.filter(
+            indice_tsvector__vetor__match=expressao,
+        ).annotate(
+            relevancia=TsRank('indice_tsvector__vetor', expressao),
+        ).order_by('-relevancia', '-criado_em', '-id')
+
+
+def _fts5_disponivel(conexao):
+    with conexao.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return any('FTS5' in opcao for opcao, in cursor.fetchall())
+
+
+def backend_para(conexao):
+    """Backend adequado ao banco de ``conexao`` (usado também pela migração)."""
+    if conexao.vendor == 'postgresql':
+        return BuscaPostgres(conexao)
+    if conexao.vendor == 'sqlite' and _fts5_disponivel(conexao):
+        return BuscaSQLite(conexao)
+    return BuscaLike(conexao)
+
+
+@lru_cache(maxsize=None)
+def _backend(alias):
+    from django.db import connections
+
+    conexao = connections[alias]
+    backend = backend_para(conexao)
+    if backend.nome != 'like' and TABELA not in conexao.introspection.table_names():
+        # Migração ainda não aplicada neste banco.
+        return BuscaLike(conexao)
+    return backend
+
+
+def backend():
+    return _backend(connection.alias)
+
+
+def filtrar(qs, consulta):
+    return backend().filtrar(qs, consulta)
+
+
+def indexar(chamado_ids):
+    backend().indexar(list(chamado_ids))
+
+
+def remover(chamado_ids):
+    backend().remover(list(chamado_ids))
@@ -0,0 +1,193 @@
+"""
+"Faststart" para MP4/MOV: move a caixa ``moov`` para antes de ``mdat``.
+
+Muitos DVR/NVR gravam o ``moov`` (índice do vídeo) no fim do arquivo; sem
+ele o navegador não consegue exibir o primeiro quadro e, com
+``preload="metadata"``, acaba baixando quase o arquivo inteiro. A reescrita
+copia as caixas em blocos (memória limitada ao tamanho do ``moov``), corrige
+os offsets das tabelas ``stco``/``co64`` e troca o arquivo de forma atômica.
+"""
+import bisect
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+
+from .metadados import caixas
+
+BLOCO = 1024 * 1024
+CONTEINERES = {'moov', 'trak', 'mdia', 'minf', 'stbl'}
+LIMITE_STCO = 0xFFFFFFFF
+
+
+def _topo(buf):
+    """Lista ``(tipo, inicio, fim)`` das caixas de nível superior (com cabeçalho)."""
+    resultado = []
+    pos = 0
+    for tipo, conteudo, fim in caixas(buf, 0, len(buf)):
+        resultado.append((tipo, pos, fim))
+        pos = fim
+    return resultado
+
+
+def situacao(caminho):
+    """
+    Retorna ``'otimizado'`` se o ``moov`` já vem antes do ``mdat``,
+    ``'pendente'`` se vem depois e ``None`` se o arquivo não é MP4/MOV
+    reconhecível (ou não tem ``moov``).
+    """
+    with open(caminho, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            tipos = [t for t, _, _ in _topo(buf)]
+    if 'moov' not in tipos or 'mdat' not in tipos:
+        return None
+    return 'otimizado' if tipos.index('moov') < tipos.index('mdat') else 'pendente'
+
+
+def _cabecalho(tipo, tamanho_conteudo):
+    return struct.pack('>I4s', tamanho_conteudo + 8, tipo.encode('latin-1'))
+
+
+def _reescrever_moov(buf, inicio, fim, novo_offset, usar_co64):
+    """Serializa as caixas de ``buf[inicio:fim]`` corrigindo ``stco``/``co64``."""
+    partes = []
+    pos = inicio
+    for tipo, conteudo, fim_caixa in caixas(buf, inicio, fim):
+        if tipo in CONTEINERES:
+            interno = _reescrever_moov(buf, conteudo, fim_caixa, novo_offset, usar_co64)
+            partes.append(_cabecalho(tipo, len(interno)) + interno)
+        elif tipo in ('stco', 'co64'):
+            versao_flags = bytes(buf[conteudo:conteudo + 4])
+            total, = struct.unpack_from('>I', buf, conteudo + 4)
+            fmt = '>I' if tipo == 'stco' else '>Q'
+            passo = struct.calcsize(fmt)
+            offsets = [
+                novo_offset(struct.unpack_from(fmt, buf, conteudo + 8 + n * passo)[0])
+                for n in range(total)
+            ]
+            saida = 'co64' if usar_co64 or tipo == 'co64' else 'stco'
+            corpo = versao_flags + struct.pack('>I', total) + struct.pack(
+                f'>{total}{"Q" if saida == "co64" else "I"}', *offsets,
+            )
+            partes.append(_cabecalho(saida, len(corpo)) + corpo)
+        else:
+            partes.append(bytes(buf[pos:fim_caixa]))
+        pos = fim_caixa
+    return b''.join(partes)
+
+
+def _maior_offset(buf, inicio, fim):
+    maior = 0
+    for tipo, conteudo, fim_caixa in caixas(buf, inicio, fim):
+        if tipo in CONTEINERES:
+            maior = max(maior, _maior_offset(buf, conteudo, fim_caixa))
+        elif tipo in ('stco', 'co64'):
+            total, = struct.unpack_from('>I', buf, conteudo + 4)
+            fmt = '>I' if tipo == 'stco' else '>Q'
+            passo = struct.calcsize(fmt)
+            for n in range(total):
+                maior = max(maior, struct.unpack_from(fmt, buf, conteudo + 8 + n * passo)[0])
+    return maior
+
+
+def _copiar(origem, destino, inicio, fim):
+    origem.seek(inicio)
+    restante = fim - inicio
+    while restante > 0:
+        bloco = origem.read(min(BLOCO, restante))
+        if not bloco:
+            raise ValueError('Arquivo truncado.')
+        destino.write(bloco)
+        restante -= len(bloco)
+
+
+def otimizar(caminho, destino=None):
+    """
+    Reescreve ``caminho`` com o ``moov`` antes dos dados de mídia.
+
+    Com ``destino``, o resultado é gravado nele e ``caminho`` fica intacto
+    (se o arquivo já estava otimizado, ``destino`` nem é criado).
+
+    Retorna ``True`` se o arquivo ficou (ou já estava) otimizado e ``False``
+    se não é um MP4/MOV que possa ser reescrito.
+    """
+    destino = destino or caminho
+    with open(caminho, 'rb') as origem:
+        if os.fstat(origem.fileno()).st_size == 0:
+            return False
+        with mmap.mmap(origem.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            topo = _topo(buf)
+            tipos = [t for t, _, _ in topo]
+            if 'moov' not in tipos or 'mdat' not in tipos:
+                return False
+            indice_moov = tipos.index('moov')
+            indice_mdat = tipos.index('mdat')
+            if indice_moov < indice_mdat:
+                return True
+
+            _, moov_inicio, moov_fim = topo[indice_moov]
+            conteudo_moov = moov_inicio + 8
+            if struct.unpack_from('>I', buf, moov_inicio)[0] == 1:
+                conteudo_moov += 8
+            moov = bytes(buf[moov_inicio:moov_fim])
+        # O moov (índice) costuma ter poucos MB; os dados de mídia nunca
+        # são carregados em memória.
+        deslocamento = conteudo_moov - moov_inicio
+
+        # Nova ordem: caixas antes do primeiro mdat, moov, demais caixas.
+        ordem = (
+            topo[:indice_mdat]
+            + [topo[indice_moov]]
+            + [c for n, c in enumerate(topo[indice_mdat:], indice_mdat) if n != indice_moov]
+        )
+
+        def mapeamento(tamanho_moov):
+            inicios_antigos, inicios_novos = [], []
+            pos = 0
+            for tipo, inicio, fim in ordem:
+                inicios_antigos.append(inicio)
+                inicios_novos.append(pos)
+                pos += tamanho_moov if tipo == 'moov' else fim - inicio
+            pares = sorted(zip(inicios_antigos, inicios_novos))
+            antigos = [a for a, _ in pares]
+            novos = [n for _, n in pares]
+
+            def novo_offset(offset):
+                i = bisect.bisect_right(antigos, offset) - 1
+                return offset - antigos[i] + novos[i]
+            return novo_offset
+
+        def montar(usar_co64):
+            # O tamanho do moov não depende dos valores dos offsets.
+            tamanho = 8 + len(_reescrever_moov(
+                moov, deslocamento, len(moov), lambda o: 0, usar_co64,
+            ))
+            novo_offset = mapeamento(tamanho)
+            corpo = _reescrever_moov(moov, deslocamento, len(moov), novo_offset, usar_co64)
+            return _cabecalho('moov', len(corpo)) + corpo, novo_offset
+
+        novo_moov, novo_offset = montar(False)
+        if novo_offset(_maior_offset(moov, deslocamento, len(moov))) > LIMITE_STCO:
+            novo_moov, _ = montar(True)
+
+        diretorio = os.path.dirname(os.path.abspath(destino))
+        fd, temporario = tempfile.mkstemp(dir=diretorio, suffix='.faststart')
+        try:
+            with os.fdopen(fd, 'wb') as saida:
+                for tipo, inicio, fim in ordem:
+                    if tipo == 'moov':
+                        saida.write(novo_moov)
+                    else:
+                        _copiar(origem, saida, inicio, fim)
+                saida.flush()
+                os.fsync(saida.fileno())
+            shutil.copymode(caminho, temporario)
+            os.replace(temporario, destino)
+        except BaseException:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+    return True
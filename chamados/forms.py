@@ -1,4 +1,8 @@
 from django import forms
+from django.contrib.auth.hashers import make_password
+from django.db.models import Q
+from clientes.forms import ClienteAutocompleteSelect
+from clientes.models import Cliente
 from .models import Chamado, Video
 
 
@@ -18,7 +22,7 @@ class ChamadoForm(forms.ModelForm):
                 'class': 'form-control', 'rows': 4,
                 'placeholder': 'Descreva a ocorrência...',
             }),
-            'cliente': forms.Select(attrs={
+            'cliente': ClienteAutocompleteSelect(attrs={
                 'class': 'form-select',
             }),
             'status': forms.Select(attrs={'class': 'form-select'}),
@@ -26,20 +30,41 @@ class ChamadoForm(forms.ModelForm):
             'tipo_compartilhamento': forms.Select(attrs={
                 'class': 'form-select', 'id': 'id_tipo_compartilhamento',
             }),
-            'senha_compartilhamento': forms.TextInput(attrs={
+            'senha_compartilhamento': forms.PasswordInput(attrs={
                 'class': 'form-control', 'placeholder': 'Senha para acesso',
+                'autocomplete': 'new-password',
             }),
             'expira_em': forms.DateTimeInput(attrs={
                 'class': 'form-control', 'type': 'datetime-local',
             }),
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Só clientes ativos (e o atual, se já foi desativado).
+        self.fields['cliente'].queryset = Cliente.objects.filter(
+            Q(ativo=True) | Q(pk=self.instance.cliente_id),
+        )
+        # A senha é gravada como hash: nunca volta para o formulário.
+        if self.instance.senha_compartilhamento:
+            self.fields['senha_compartilhamento'].widget.attrs['placeholder'] = (
+                'Deixe em branco para manter a atual'
+            )
+
     def clean(self):
         cleaned_data = super().clean()
         tipo = cleaned_data.get('tipo_compartilhamento')
         senha = cleaned_data.get('senha_compartilhamento')
         expira = cleaned_data.get('expira_em')
 
+        if tipo != Chamado.TipoCompartilhamento.PROTEGIDO:
+            senha = ''
+        elif senha:
+            senha = make_password(senha)
+        else:
+            senha = self.instance.senha_compartilhamento
+        cleaned_data['senha_compartilhamento'] = senha
+
         if tipo == Chamado.TipoCompartilhamento.PROTEGIDO and not senha:
             self.add_error(
                 'senha_compartilhamento',
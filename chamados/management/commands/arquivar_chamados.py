@@ -0,0 +1,81 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from chamados.services import ArquivamentoService
+
+
+class Command(BaseCommand):
+    help = (
+        'Move chamados fechados sem atividade há --dias dias, com vídeos e '
+        'comentários, para as tabelas de arquivo, em lotes transacionais. '
+        'Com --restaurar, devolve os chamados informados às tabelas quentes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dias', type=int, default=settings.ARQUIVAMENTO_DIAS,
+            help='Idade mínima, em dias, da última atividade do chamado.',
+        )
+        parser.add_argument(
+            '--lote', type=int, default=settings.ARQUIVAMENTO_LOTE,
+            help='Chamados movidos por transação.',
+        )
+        parser.add_argument(
+            '--max-lotes', type=int, default=None,
+            help='Para depois de N lotes (o restante fica para a próxima execução).',
+        )
+        parser.add_argument(
+            '--pausa', type=float, default=0.0,
+            help='Segundos de espera entre lotes, para aliviar o banco.',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Apenas conta os chamados que seriam arquivados.',
+        )
+        parser.add_argument(
+            '--restaurar', type=int, nargs='+', metavar='ID',
+            help='Ids de chamados arquivados a restaurar.',
+        )
+
+    def handle(self, *args, **options):
+        if options['restaurar']:
+            total = ArquivamentoService.restaurar(options['restaurar'])
+            self.stdout.write(self.style.SUCCESS(f'{total} chamado(s) restaurado(s).'))
+            return
+
+        if options['dias'] < 1:
+            raise CommandError('--dias deve ser maior que zero.')
+        if options['lote'] < 1:
+            raise CommandError('--lote deve ser maior que zero.')
+        corte = timezone.now() - timedelta(days=options['dias'])
+
+        if options['dry_run']:
+            total = ArquivamentoService.candidatos(corte).count()
+            self.stdout.write(
+                f'{total} chamado(s) fechado(s) sem atividade desde {corte:%d/%m/%Y} '
+                'seriam arquivados.'
+            )
+            return
+
+        lotes = total = 0
+        inicio = time.perf_counter()
+        while options['max_lotes'] is None or lotes < options['max_lotes']:
+            ids = ArquivamentoService.arquivar_lote(corte, options['lote'])
+            if not ids:
+                break
+            lotes += 1
+            total += len(ids)
+            self.stdout.write(f'Lote {lotes}: {len(ids)} chamado(s) (#{ids[0]} a #{ids[-1]}).')
+            if options['pausa']:
+                time.sleep(options['pausa'])
+
+        duracao = time.perf_counter() - inicio
+        taxa = total / duracao if duracao else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} chamado(s) arquivado(s) em {lotes} lote(s), '
+            f'{duracao:.2f}s ({taxa:.0f} chamados/s).'
+        ))
@@ -0,0 +1,113 @@
+import os
+import shutil
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from chamados.models import ArquivoVideo, SessaoUpload, Video, VideoArquivado
+
+
+class Command(BaseCommand):
+    help = (
+        'Procura arquivos em MEDIA_ROOT/videos sem Video/VideoArquivado/ArquivoVideo '
+        'correspondente (e partes de upload sem sessão) e os remove.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Apenas relata os órfãos, sem remover.',
+        )
+        parser.add_argument(
+            '--lote', type=int, default=1000,
+            help='Quantidade de arquivos conferidos por consulta ao banco.',
+        )
+        parser.add_argument(
+            '--idade-minima', type=int, default=60,
+            help='Ignora arquivos modificados há menos de N minutos '
+                 '(envios ainda em andamento).',
+        )
+
+    def handle(self, *args, **options):
+        self.dry_run = options['dry_run']
+        self.limite_mtime = time.time() - options['idade_minima'] * 60
+        self.verificados = self.orfaos = self.bytes_orfaos = 0
+        inicio = time.perf_counter()
+
+        raiz = os.path.join(settings.MEDIA_ROOT, 'videos')
+        lote = []
+        for caminho, stat in self._varrer(raiz):
+            lote.append((caminho, stat))
+            if len(lote) >= options['lote']:
+                self._conferir(lote)
+                lote = []
+        if lote:
+            self._conferir(lote)
+
+        sessoes = self._conferir_uploads_parciais()
+
+        duracao = time.perf_counter() - inicio
+        taxa = self.verificados / duracao if duracao else 0
+        acao = 'encontrado(s)' if self.dry_run else 'removido(s)'
+        self.stdout.write(self.style.SUCCESS(
+            f'{self.verificados} arquivo(s) verificados em {duracao:.2f}s '
+            f'({taxa:.0f} arquivos/s); {self.orfaos} órfão(s) {acao} '
+            f'({self.bytes_orfaos / (1024 * 1024):.1f} MB); '
+            f'{sessoes} diretório(s) de upload sem sessão.'
+        ))
+
+    def _varrer(self, diretorio):
+        try:
+            entradas = os.scandir(diretorio)
+        except FileNotFoundError:
+            return
+        with entradas:
+            for entrada in entradas:
+                if entrada.is_dir(follow_symlinks=False):
+                    yield from self._varrer(entrada.path)
+                elif entrada.is_file(follow_symlinks=False):
+                    yield entrada.path, entrada.stat(follow_symlinks=False)
+
+    def _conferir(self, lote):
+        nomes = {
+            os.path.relpath(caminho, settings.MEDIA_ROOT).replace(os.sep, '/'): (caminho, stat)
+            for caminho, stat in lote
+        }
+        self.verificados += len(nomes)
+        usados = set(Video.objects.filter(arquivo__in=nomes).values_list('arquivo', flat=True))
+        usados.update(VideoArquivado.objects.filter(arquivo__in=nomes).values_list('arquivo', flat=True))
+        usados.update(ArquivoVideo.objects.filter(arquivo__in=nomes).values_list('arquivo', flat=True))
+        for nome, (caminho, stat) in nomes.items():
+            if nome in usados or stat.st_mtime > self.limite_mtime:
+                continue
+            self.orfaos += 1
+            self.bytes_orfaos += stat.st_size
+            self.stdout.write(f'Órfão: {nome}')
+            if not self.dry_run:
+                try:
+                    os.remove(caminho)
+                except FileNotFoundError:
+                    pass
+
+    def _conferir_uploads_parciais(self):
+        try:
+            entradas = [e for e in os.scandir(settings.UPLOAD_SESSAO_DIR) if e.is_dir()]
+        except FileNotFoundError:
+            return 0
+        ids = {}
+        for entrada in entradas:
+            try:
+                ids[uuid.UUID(entrada.name)] = entrada
+            except ValueError:
+                continue
+        ativas = set(SessaoUpload.objects.filter(pk__in=ids).values_list('pk', flat=True))
+        total = 0
+        for pk, entrada in ids.items():
+            if pk in ativas or entrada.stat().st_mtime > self.limite_mtime:
+                continue
+            total += 1
+            if not self.dry_run:
+                shutil.rmtree(entrada.path, ignore_errors=True)
+        return total
@@ -0,0 +1,67 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+
+from chamados.models import Chamado, ChamadoArquivado, ConsolidacaoMetricas
+from chamados.services import DashboardService
+
+MARCA = 'diaria'
+
+
+class Command(BaseCommand):
+    help = (
+        'Consolida as métricas diárias (MetricaDiaria) a partir do último dia '
+        'já processado. Use --backfill para reprocessar todo o histórico.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--backfill', action='store_true',
+            help='Processa desde o primeiro chamado, ignorando a marca d\'água.',
+        )
+        parser.add_argument(
+            '--desde', type=date.fromisoformat,
+            help='Processa a partir desta data (AAAA-MM-DD).',
+        )
+        parser.add_argument(
+            '--lote', type=int, default=31,
+            help='Dias consolidados por transação.',
+        )
+
+    def handle(self, *args, **options):
+        if options['lote'] < 1:
+            raise CommandError('--lote deve ser maior que zero.')
+        hoje = timezone.localdate()
+        marca = ConsolidacaoMetricas.objects.filter(nome=MARCA).first()
+
+        if options['desde']:
+            inicio = options['desde']
+        elif options['backfill'] or marca is None:
+            primeiros = [
+                modelo.objects.aggregate(primeiro=Min('criado_em'))['primeiro']
+                for modelo in (Chamado, ChamadoArquivado)
+            ]
+            primeiros = [primeiro for primeiro in primeiros if primeiro]
+            inicio = timezone.localdate(min(primeiros)) if primeiros else hoje
+        else:
+            inicio = marca.processado_ate + timedelta(days=1)
+
+        dias = linhas = 0
+        while inicio <= hoje:
+            fim = min(inicio + timedelta(days=options['lote'] - 1), hoje)
+            linhas += DashboardService.consolidar(inicio, fim)
+            dias += (fim - inicio).days + 1
+            # Hoje ainda está aberto: volta a ser processado na próxima execução.
+            fechado = min(fim, hoje - timedelta(days=1))
+            if marca is None or fechado > marca.processado_ate:
+                marca, _ = ConsolidacaoMetricas.objects.update_or_create(
+                    nome=MARCA, defaults={'processado_ate': fechado},
+                )
+            self.stdout.write(f'{inicio:%d/%m/%Y} a {fim:%d/%m/%Y} consolidado.')
+            inicio = fim + timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{dias} dia(s) processado(s), {linhas} linha(s) gravada(s).'
+        ))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from chamados import metadados
+from chamados.models import Video
+from chamados.services import ChamadoService
+
+
+class Command(BaseCommand):
+    help = 'Preenche duração, resolução, codec e MIME dos vídeos enviados antes da extração automática.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--todos', action='store_true',
+            help='Reprocessa também os vídeos que já têm metadados.',
+        )
+
+    def handle(self, *args, **options):
+        videos = Video.objects.only('id', 'chamado_id', 'arquivo', 'nome_original')
+        if not options['todos']:
+            videos = videos.filter(mime_type='')
+
+        atualizados = 0
+        for video in videos.iterator():
+            try:
+                with video.arquivo.open('rb') as arquivo:
+                    dados = metadados.extrair(arquivo, video.nome_original)
+            except (FileNotFoundError, ValueError):
+                self.stderr.write(f'Arquivo ausente: {video.arquivo.name}')
+                continue
+            Video.objects.filter(pk=video.pk).update(**dados)
+            ChamadoService.invalidar_compartilhado(video.chamado_id)
+            atualizados += 1
+
+        self.stdout.write(self.style.SUCCESS(f'{atualizados} vídeo(s) atualizado(s).'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from chamados.services import UploadService
+
+
+class Command(BaseCommand):
+    help = 'Remove sessões de upload retomável expiradas e suas partes em disco.'
+
+    def handle(self, *args, **options):
+        total = UploadService.limpar_expiradas()
+        self.stdout.write(self.style.SUCCESS(f'{total} sessão(ões) expirada(s) removida(s).'))
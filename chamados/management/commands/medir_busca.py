@@ -0,0 +1,82 @@
+import random
+import time
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from chamados import busca
+from chamados.busca import BuscaLike
+from chamados.management.medicao import banco_temporario, cronometrar
+from chamados.models import Chamado
+from chamados.services import ChamadoService
+from clientes.models import Cliente
+
+PALAVRAS = (
+    'camera', 'portaria', 'gravador', 'hd', 'cabo', 'fonte', 'dvr', 'nvr', 'rede', 'switch',
+    'poste', 'lente', 'infravermelho', 'acesso', 'alarme', 'sensor', 'motor', 'portão',
+    'interfone', 'monitor',
+)
+CONSULTAS = ('camera', 'camera portaria', 'infravermelho lente', 'xyz')
+LOTE = 5000
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara a busca de chamados por icontains (BuscaLike) com o índice '
+        'textual do banco atual (FTS5 no SQLite, tsvector no PostgreSQL): '
+        'popula um banco de teste temporário com --chamados chamados e mede '
+        'o que a lista faz numa pesquisa (contagem limitada e a primeira '
+        'página de resultados) para algumas consultas.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chamados', type=int, default=100_000)
+        parser.add_argument('--repeticoes', type=int, default=5)
+
+    def handle(self, *args, **options):
+        if options['chamados'] < 1 or options['repeticoes'] < 1:
+            raise CommandError('--chamados e --repeticoes devem ser maiores que zero.')
+        with banco_temporario() as conexao:
+            indice = busca.backend_para(conexao)
+            if indice.nome == BuscaLike.nome:
+                raise CommandError(f'Banco "{conexao.vendor}" sem índice textual para comparar.')
+            usuario = self._popular(options['chamados'], indice)
+            self.stdout.write(f'Índice: {indice.nome}; {options["repeticoes"]} repetição(ões).')
+            like = BuscaLike(conexao)
+            chamados = Chamado.objects.filter(criado_por=usuario)
+            for consulta in CONSULTAS:
+                medidas = []
+                for backend in (like, indice):
+                    qs = backend.filtrar(chamados, consulta)
+                    tempo = cronometrar(lambda: self._pagina(qs), options['repeticoes'])
+                    medidas.append(f'{backend.nome} {tempo:8.1f} ms ({qs.count():>7,} resultados)')
+                self.stdout.write(f'{consulta!r:>24}: ' + ', '.join(medidas))
+
+    @staticmethod
+    def _pagina(qs):
+        ChamadoService.estimar_total(qs)
+        return ChamadoService.paginar_busca(qs)
+
+    def _popular(self, quantidade, indice):
+        aleatorio = random.Random(1)
+        usuario = User.objects.create_user('medicao')
+        cliente = Cliente.objects.create(nome='Condomínio Medição', cpf='123.456.789-00')
+        inicio = time.perf_counter()
+        for lote in range(0, quantidade, LOTE):
+            criados = Chamado.objects.bulk_create(
+                Chamado(
+                    titulo=' '.join(aleatorio.choices(PALAVRAS, k=4)),
+                    descricao=' '.join(aleatorio.choices(PALAVRAS, k=12)),
+                    cliente=cliente, criado_por=usuario, slug=uuid.uuid4().hex[:12],
+                )
+                for _ in range(min(LOTE, quantidade - lote))
+            )
+            # bulk_create não dispara os sinais que mantêm o índice.
+            indice.indexar([c.pk for c in criados])
+        # Estatísticas em dia, como num banco em uso (PRAGMA optimize / autovacuum).
+        with indice.conexao.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.stdout.write(f'{quantidade:,} chamados criados e indexados em {time.perf_counter() - inicio:.1f}s.')
+        return usuario
+
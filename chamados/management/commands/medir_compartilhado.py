@@ -0,0 +1,85 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment,
+)
+from django.urls import reverse
+
+from chamados.management.medicao import banco_temporario
+from chamados.models import Chamado, Comentario, Video
+from clientes.models import Cliente
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede as requisições por segundo da página pública de um chamado '
+        '(um slug "quente", sempre o mesmo) com o cache de fragmento do '
+        'template ligado e com COMPARTILHADO_CACHE_TIMEOUT=0, pelo Client de '
+        'teste do Django num banco de teste temporário.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requisicoes', type=int, default=500)
+        parser.add_argument('--videos', type=int, default=20, help='Vídeos e comentários do chamado.')
+
+    def handle(self, *args, **options):
+        if options['requisicoes'] < 1 or options['videos'] < 0:
+            raise CommandError('--requisicoes deve ser maior que zero e --videos não pode ser negativo.')
+        setup_test_environment()
+        try:
+            # Sem depender do collectstatic (manifesto do whitenoise).
+            with banco_temporario(), override_settings(
+                STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+            ):
+                url = reverse('chamados:compartilhado', args=[self._criar_chamado(options['videos']).slug])
+                for nome, timeout in (('sem cache', 0), ('com cache', None)):
+                    configuracao = {} if timeout is None else {'COMPARTILHADO_CACHE_TIMEOUT': timeout}
+                    with override_settings(**configuracao):
+                        self._medir(nome, url, options['requisicoes'])
+        finally:
+            teardown_test_environment()
+
+    @staticmethod
+    def _criar_chamado(quantidade):
+        usuario = User.objects.create_user('medicao')
+        cliente = Cliente.objects.create(nome='Condomínio Medição', cpf='123.456.789-00')
+        chamado = Chamado.objects.create(
+            titulo='Câmera da portaria sem imagem', descricao='Sem imagem desde ontem.',
+            cliente=cliente, criado_por=usuario,
+        )
+        Video.objects.bulk_create(
+            Video(
+                chamado=chamado, arquivo=f'videos/{i}.mp4', nome_original=f'camera-{i}.mp4',
+                tamanho=1024 ** 2, mime_type='video/mp4', enviado_por=usuario,
+            )
+            for i in range(quantidade)
+        )
+        Comentario.objects.bulk_create(
+            Comentario(
+                chamado=chamado, texto=f'Comentário {i}',
+                autor_usuario=usuario if i % 2 else None, autor_nome='Visitante',
+            )
+            for i in range(quantidade)
+        )
+        return chamado
+
+    def _medir(self, nome, url, requisicoes):
+        cache.clear()
+        cliente = Client()
+        if cliente.get(url).status_code != 200:
+            raise CommandError(f'{url} não respondeu 200.')
+        with CaptureQueriesContext(connection) as consultas:
+            inicio = time.perf_counter()
+            for _ in range(requisicoes):
+                cliente.get(url)
+            duracao = time.perf_counter() - inicio
+        self.stdout.write(
+            f'{nome:>9}: {requisicoes / duracao:7.1f} req/s, '
+            f'{duracao / requisicoes * 1000:5.2f} ms e '
+            f'{len(consultas) / requisicoes:.1f} consulta(s) por requisição'
+        )
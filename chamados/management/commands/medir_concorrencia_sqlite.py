@@ -0,0 +1,138 @@
+import multiprocessing
+import random
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from vision_hub.sqlite.base import aplicar_pragmas, validar_modo
+
+CHAMADOS = 2000
+
+
+def _criar_banco(caminho):
+    conexao = sqlite3.connect(caminho)
+    conexao.executescript('''
+        CREATE TABLE chamado (
+            id INTEGER PRIMARY KEY, titulo TEXT, atualizado_em REAL
+        );
+        CREATE TABLE comentario (
+            id INTEGER PRIMARY KEY, chamado_id INTEGER REFERENCES chamado(id),
+            texto TEXT, criado_em REAL
+        );
+        CREATE INDEX comentario_chamado ON comentario (chamado_id, criado_em);
+    ''')
+    agora = time.time()
+    conexao.executemany(
+        'INSERT INTO chamado VALUES (?, ?, ?)',
+        ((i, f'Chamado {i}', agora) for i in range(1, CHAMADOS + 1)),
+    )
+    conexao.executemany(
+        'INSERT INTO comentario (chamado_id, texto, criado_em) VALUES (?, ?, ?)',
+        ((i % CHAMADOS + 1, 'x' * 200, agora) for i in range(CHAMADOS * 5)),
+    )
+    conexao.commit()
+    conexao.close()
+
+
+def _trabalhador(caminho, pragmas, modo, duracao, proporcao_escrita, semente):
+    """Processo que mistura leituras e escritas como as views; devolve contagens."""
+    aleatorio = random.Random(semente)
+    # Autocommit + BEGIN explícito, como o backend do Django.
+    conexao = sqlite3.connect(caminho, isolation_level=None)
+    aplicar_pragmas(conexao, pragmas)
+    begin = f'BEGIN {modo}' if modo else 'BEGIN'
+    resultado = {'leituras': 0, 'escritas': 0, 'erros': 0, 'latencias': []}
+    fim = time.monotonic() + duracao
+    while time.monotonic() < fim:
+        chamado = aleatorio.randint(1, CHAMADOS)
+        escrita = aleatorio.random() < proporcao_escrita
+        inicio = time.monotonic()
+        try:
+            if escrita:
+                # atomic(): lê o chamado, grava o comentário e atualiza o chamado.
+                conexao.execute(begin)
+                conexao.execute('SELECT id, titulo FROM chamado WHERE id = ?', (chamado,)).fetchone()
+                conexao.execute(
+                    'INSERT INTO comentario (chamado_id, texto, criado_em) VALUES (?, ?, ?)',
+                    (chamado, 'y' * 200, time.time()),
+                )
+                conexao.execute(
+                    'UPDATE chamado SET atualizado_em = ? WHERE id = ?', (time.time(), chamado),
+                )
+                conexao.execute('COMMIT')
+            else:
+                conexao.execute('SELECT id, titulo FROM chamado WHERE id = ?', (chamado,)).fetchone()
+                conexao.execute(
+                    'SELECT texto FROM comentario WHERE chamado_id = ? '
+                    'ORDER BY criado_em DESC LIMIT 20', (chamado,),
+                ).fetchall()
+        except sqlite3.OperationalError as erro:
+            if conexao.in_transaction:
+                conexao.execute('ROLLBACK')
+            if 'locked' not in str(erro) and 'busy' not in str(erro):
+                raise
+            resultado['erros'] += 1
+            continue
+        resultado['latencias'].append(time.monotonic() - inicio)
+        resultado['escritas' if escrita else 'leituras'] += 1
+    conexao.close()
+    return resultado
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede vazão e erros "database is locked" com vários processos lendo e '
+        'escrevendo no SQLite, com os padrões do sqlite3 e com os PRAGMAs/modo '
+        'de transação de DATABASES["default"]["OPTIONS"]. Usa um banco temporário.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processos', type=int, default=8)
+        parser.add_argument('--duracao', type=float, default=5.0, help='Segundos por cenário.')
+        parser.add_argument(
+            '--escritas', type=float, default=0.2,
+            help='Proporção de operações de escrita (0 a 1).',
+        )
+
+    def handle(self, *args, **options):
+        if options['processos'] < 1:
+            raise CommandError('--processos deve ser maior que zero.')
+        if not 0 <= options['escritas'] <= 1:
+            raise CommandError('--escritas deve estar entre 0 e 1.')
+        opcoes = settings.DATABASES['default'].get('OPTIONS', {})
+        cenarios = [
+            ('padrão', {}, None),
+            ('ajustado', opcoes.get('pragmas', {}), validar_modo(opcoes.get('transaction_mode'))),
+        ]
+        self.stdout.write(
+            f'{options["processos"]} processo(s), {options["duracao"]:g}s por cenário, '
+            f'{options["escritas"]:.0%} de escritas.'
+        )
+        for nome, pragmas, modo in cenarios:
+            with tempfile.TemporaryDirectory() as pasta:
+                caminho = str(Path(pasta) / 'benchmark.sqlite3')
+                _criar_banco(caminho)
+                argumentos = [
+                    (caminho, pragmas, modo, options['duracao'], options['escritas'], semente)
+                    for semente in range(options['processos'])
+                ]
+                with multiprocessing.Pool(options['processos']) as pool:
+                    resultados = pool.starmap(_trabalhador, argumentos)
+            self._relatorio(nome, resultados, options['duracao'])
+
+    def _relatorio(self, nome, resultados, duracao):
+        leituras = sum(r['leituras'] for r in resultados)
+        escritas = sum(r['escritas'] for r in resultados)
+        erros = sum(r['erros'] for r in resultados)
+        latencias = sorted(l for r in resultados for l in r['latencias'])
+        tentativas = leituras + escritas + erros
+        p95 = latencias[int(len(latencias) * 0.95)] * 1000 if latencias else 0
+        self.stdout.write(
+            f'{nome:>9}: {(leituras + escritas) / duracao:8.0f} op/s '
+            f'({leituras / duracao:.0f} leituras/s, {escritas / duracao:.0f} escritas/s), '
+            f'{erros} erro(s) de lock ({erros / max(tentativas, 1):.2%}), p95 {p95:.1f} ms'
+        )
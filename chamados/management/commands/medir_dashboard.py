@@ -0,0 +1,79 @@
+import random
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+
+from chamados.management.medicao import banco_temporario, cronometrar
+from chamados.models import Chamado, UsoArmazenamento
+from chamados.services import DashboardService
+from clientes.models import Cliente
+
+LOTE = 5000
+
+
+def metricas_por_contagem(usuario):
+    """``get_metricas`` antes da agregação única: um ``COUNT`` por status e por prioridade."""
+    chamados = Chamado.objects.filter(criado_por=usuario)
+    metricas = {'total_chamados': chamados.count()}
+    for status in Chamado.Status.values:
+        metricas[f'status_{status}'] = chamados.filter(status=status).count()
+    metricas['por_prioridade'] = {
+        prioridade: chamados.filter(prioridade=prioridade).count()
+        for prioridade in Chamado.Prioridade.values
+    }
+    metricas['uso'] = UsoArmazenamento.objects.filter(usuario=usuario).first()
+    metricas['ultimos_chamados'] = list(chamados.select_related('cliente')[:5])
+    return metricas
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede o cálculo das métricas do dashboard num banco de teste '
+        'temporário, para cada quantidade de chamados informada: um COUNT '
+        'por status/prioridade (como antes), a agregação única de '
+        'DashboardService.get_metricas e a leitura do cache (obter_metricas).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chamados', type=int, nargs='+', default=[100, 10_000, 100_000])
+        parser.add_argument('--repeticoes', type=int, default=20)
+
+    def handle(self, *args, **options):
+        quantidades = sorted(options['chamados'])
+        if quantidades[0] < 1 or options['repeticoes'] < 1:
+            raise CommandError('--chamados e --repeticoes devem ser maiores que zero.')
+        repeticoes = options['repeticoes']
+        with banco_temporario():
+            aleatorio = random.Random(1)
+            usuario = User.objects.create_user('medicao')
+            cliente = Cliente.objects.create(nome='Condomínio Medição', cpf='123.456.789-00')
+            UsoArmazenamento.objects.create(usuario=usuario, total_videos=10, espaco_usado=10 * 1024 ** 3)
+            existentes = 0
+            for quantidade in quantidades:
+                self._popular(aleatorio, usuario, cliente, quantidade - existentes)
+                existentes = quantidade
+
+                antes = cronometrar(lambda: metricas_por_contagem(usuario), repeticoes)
+                depois = cronometrar(lambda: DashboardService.get_metricas(usuario), repeticoes)
+                cache.clear()
+                DashboardService.obter_metricas(usuario)
+                em_cache = cronometrar(lambda: DashboardService.obter_metricas(usuario), repeticoes)
+                self.stdout.write(
+                    f'{quantidade:>9,} chamados: um COUNT cada {antes:7.1f} ms, '
+                    f'agregação única {depois:7.1f} ms, cache {em_cache:5.2f} ms'
+                )
+
+    @staticmethod
+    def _popular(aleatorio, usuario, cliente, quantidade):
+        for lote in range(0, quantidade, LOTE):
+            Chamado.objects.bulk_create(
+                Chamado(
+                    titulo=f'Chamado {uuid.uuid4().hex[:8]}',
+                    status=aleatorio.choice(Chamado.Status.values),
+                    prioridade=aleatorio.choice(Chamado.Prioridade.values),
+                    cliente=cliente, criado_por=usuario, slug=uuid.uuid4().hex[:12],
+                )
+                for _ in range(min(LOTE, quantidade - lote))
+            )
@@ -0,0 +1,103 @@
+import mmap
+import resource
+import struct
+import tempfile
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from chamados import metadados
+
+
+def _caixa(tipo, conteudo):
+    return struct.pack('>I4s', 8 + len(conteudo), tipo) + conteudo
+
+
+def _caixa_completa(tipo, conteudo):
+    # version 0, flags 0
+    return _caixa(tipo, b'\0\0\0\0' + conteudo)
+
+
+def _moov():
+    """``moov`` de um vídeo H.264 1920x1080 de 125,5 s, como o de uma câmera."""
+    mvhd = _caixa_completa(b'mvhd', struct.pack('>IIII', 0, 0, 1000, 125500) + b'\0' * 80)
+    tkhd = _caixa_completa(b'tkhd', b'\0' * 72 + struct.pack('>II', 1920 << 16, 1080 << 16))
+    hdlr = _caixa_completa(b'hdlr', b'\0' * 4 + b'vide' + b'\0' * 12 + b'video\0')
+    stsd = _caixa_completa(b'stsd', struct.pack('>I', 1) + struct.pack('>I4s', 16, b'avc1') + b'\0' * 8)
+    stbl = _caixa(b'stbl', stsd)
+    mdia = _caixa(b'mdia', hdlr + _caixa(b'minf', stbl))
+    return _caixa(b'moov', mvhd + _caixa(b'trak', tkhd + mdia))
+
+
+def criar_mp4(caminho, tamanho, moov_no_fim=True):
+    """
+    MP4 de ``tamanho`` bytes com ``mdat`` esparso (não ocupa disco). Com
+    ``moov_no_fim`` o índice fica depois dos dados, como gravam os DVRs e
+    celulares sem faststart: o pior caso para o extrator.
+    """
+    ftyp = _caixa(b'ftyp', b'isom\0\0\0\0isommp41')
+    moov = _moov()
+    dados = tamanho - len(ftyp) - len(moov) - 16
+    with open(caminho, 'wb') as f:
+        f.write(ftyp)
+        if not moov_no_fim:
+            f.write(moov)
+        # Tamanho de 64 bits (largesize), válido também acima de 4 GB.
+        f.write(struct.pack('>I4sQ', 1, b'mdat', 16 + dados))
+        f.seek(dados, 1)
+        if moov_no_fim:
+            f.write(moov)
+        else:
+            f.truncate()
+
+
+def _paginas():
+    uso = resource.getrusage(resource.RUSAGE_SELF)
+    return uso.ru_minflt + uso.ru_majflt
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede quanto do arquivo o extrator de metadados lê: cria MP4s '
+        'temporários do tamanho informado (índice moov no início e no fim) e '
+        'conta as páginas do mmap acessadas (page faults) e o tempo por extração.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tamanho', type=int, default=500, help='Tamanho de cada arquivo, em MB.')
+        parser.add_argument('--repeticoes', type=int, default=20)
+
+    def handle(self, *args, **options):
+        if options['tamanho'] < 1:
+            raise CommandError('--tamanho deve ser maior que zero.')
+        if options['repeticoes'] < 1:
+            raise CommandError('--repeticoes deve ser maior que zero.')
+        tamanho = options['tamanho'] * 1024 * 1024
+        self.stdout.write(f'Arquivos de {options["tamanho"]} MB, {options["repeticoes"]} extração(ões) cada.')
+        with tempfile.TemporaryDirectory() as pasta:
+            for nome, moov_no_fim in (('moov no início', False), ('moov no fim', True)):
+                caminho = Path(pasta) / 'video.mp4'
+                criar_mp4(caminho, tamanho, moov_no_fim)
+                self._medir(nome, caminho, tamanho, options['repeticoes'])
+
+    def _medir(self, nome, caminho, tamanho, repeticoes):
+        with open(caminho, 'rb') as arquivo:
+            meta = metadados.extrair(arquivo)
+        if meta['duracao'] != 125.5 or (meta['largura'], meta['altura']) != (1920, 1080):
+            raise CommandError(f'Metadados inesperados ({nome}): {meta}')
+
+        paginas, tempos = [], []
+        for _ in range(repeticoes):
+            with open(caminho, 'rb') as arquivo:
+                antes = _paginas()
+                inicio = time.perf_counter()
+                metadados.extrair(arquivo)
+                tempos.append(time.perf_counter() - inicio)
+                paginas.append(_paginas() - antes)
+        # Page faults do processo: inclui alocações do Python, é um teto.
+        lidos = max(paginas) * mmap.PAGESIZE
+        self.stdout.write(
+            f'{nome:>15}: {min(tempos) * 1000:.2f} ms, até {max(paginas)} página(s) '
+            f'({lidos / 1024:.0f} KB, {lidos / tamanho:.4%} do arquivo)'
+        )
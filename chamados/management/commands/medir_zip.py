@@ -0,0 +1,76 @@
+import os
+import resource
+import tempfile
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from chamados.streaming import resposta_zip
+
+MB = 1024 * 1024
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede a vazão e a memória do download em ZIP dos vídeos de um chamado '
+        '(resposta_zip). Sem arquivos informados, cria --quantidade arquivos '
+        'esparsos de --tamanho MB num diretório temporário (lidos do page '
+        'cache: mede a montagem do ZIP, não o disco).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('arquivos', nargs='*', help='Vídeos reais a compactar (opcional).')
+        parser.add_argument('--quantidade', type=int, default=5)
+        parser.add_argument('--tamanho', type=int, default=1024, help='MB por arquivo sintético.')
+
+    def handle(self, *args, **options):
+        if options['arquivos']:
+            caminhos = [Path(c) for c in options['arquivos']]
+            faltando = [str(c) for c in caminhos if not c.is_file()]
+            if faltando:
+                raise CommandError(f'Arquivo(s) não encontrado(s): {", ".join(faltando)}')
+            self._medir(caminhos)
+            return
+
+        if options['quantidade'] < 1 or options['tamanho'] < 1:
+            raise CommandError('--quantidade e --tamanho devem ser maiores que zero.')
+        with tempfile.TemporaryDirectory() as pasta:
+            caminhos = []
+            for i in range(options['quantidade']):
+                caminho = Path(pasta) / f'camera-{i + 1}.mp4'
+                with open(caminho, 'wb') as f:
+                    f.truncate(options['tamanho'] * MB)
+                caminhos.append(caminho)
+            self._medir(caminhos)
+
+    def _medir(self, caminhos):
+        tamanhos = [os.path.getsize(c) for c in caminhos]
+        entradas = [
+            (c.name, lambda c=c: open(c, 'rb'), t, datetime.now())
+            for c, t in zip(caminhos, tamanhos)
+        ]
+        self.stdout.write(f'{len(caminhos)} arquivo(s), {sum(tamanhos) / MB:,.0f} MB no total.')
+
+        memoria_antes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        enviados = maior_bloco = 0
+        final = deque(maxlen=16)  # últimos blocos: diretório central
+        inicio = time.perf_counter()
+        for bloco in resposta_zip(entradas, 'videos.zip').streaming_content:
+            enviados += len(bloco)
+            maior_bloco = max(maior_bloco, len(bloco))
+            final.append(bloco)
+        duracao = time.perf_counter() - inicio
+        memoria = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - memoria_antes
+        final = b''.join(final)
+
+        if b'PK\x05\x06' not in final or (enviados > 0xFFFFFFFF and b'PK\x06\x06' not in final):
+            raise CommandError('ZIP sem diretório central (ZIP64) no final.')
+        self.stdout.write(self.style.SUCCESS(
+            f'{enviados / MB:,.0f} MB enviados em {duracao:.1f}s '
+            f'({enviados / MB / duracao:,.0f} MB/s), sobrecarga do ZIP '
+            f'{enviados - sum(tamanhos):,} bytes, maior bloco {maior_bloco / 1024:.0f} KB, '
+            f'pico de memória +{memoria / 1024:.1f} MB.'
+        ))
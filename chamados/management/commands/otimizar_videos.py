@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+
+from chamados import faststart
+from chamados.models import Video
+from chamados.services import FASTSTART_MIME_TYPES, VideoService
+
+
+class Command(BaseCommand):
+    help = (
+        'Move o índice (moov) dos vídeos MP4/MOV já enviados para o início '
+        'do arquivo, permitindo iniciar a reprodução sem baixar tudo. '
+        'Complementa a fila em segundo plano do envio (vídeos que ficaram de '
+        'fora, p. ex. por reinício do processo). Conteúdos deduplicados viram '
+        'um arquivo novo, com outro SHA-256, compartilhado pelos mesmos vídeos.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Apenas lista os arquivos que seriam reescritos.',
+        )
+
+    def handle(self, *args, **options):
+        reescritos = 0
+        # Um conteúdo deduplicado é tratado uma vez, pelo primeiro vídeo; os
+        # demais já apontam para o arquivo novo.
+        conteudos = set()
+        for video in Video.objects.filter(otimizado=False).iterator():
+            if video.tipo_mime not in FASTSTART_MIME_TYPES or video.blob_id in conteudos:
+                continue
+            if video.blob_id:
+                conteudos.add(video.blob_id)
+            try:
+                situacao = faststart.situacao(video.arquivo.path)
+            except (FileNotFoundError, ValueError):
+                self.stderr.write(f'Arquivo ausente: {video.arquivo.name}')
+                continue
+            if situacao is None:
+                continue
+            if options['dry_run']:
+                if situacao == 'pendente':
+                    self.stdout.write(f'Seria reescrito: {video.arquivo.name}')
+                    reescritos += 1
+                continue
+            if VideoService.otimizar_streaming(video) and situacao == 'pendente':
+                self.stdout.write(f'Reescrito: {video.arquivo.name}')
+                reescritos += 1
+
+        acao = 'a reescrever' if options['dry_run'] else 'reescrito(s)'
+        self.stdout.write(self.style.SUCCESS(f'{reescritos} vídeo(s) {acao}.'))
@@ -0,0 +1,117 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+from django.db.models import Count, Exists, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from chamados.models import Chamado, UsoArmazenamento, Video, VideoArquivado
+from chamados.services import DashboardService
+
+
+def _agregado(modelo, funcao, **filtro):
+    """``funcao`` sobre os vídeos de ``modelo`` que atendem ``filtro``, ou 0."""
+    valores = modelo.objects.filter(**filtro).order_by().values(*filtro).annotate(valor=funcao)
+    return Coalesce(Subquery(valores.values('valor')), 0, output_field=models.BigIntegerField())
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula a quantidade e o tamanho dos vídeos por chamado e por usuário '
+        'a partir da tabela de vídeos e corrige divergências nos contadores.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Apenas lista as divergências, sem corrigir.',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        chamado = OuterRef('pk')
+        chamados_corrigidos = self._reconciliar(
+            Chamado.objects.all(),
+            {
+                'qtd_videos': _agregado(Video, Count('id'), chamado=chamado),
+                'tamanho_videos': _agregado(Video, Sum('tamanho'), chamado=chamado),
+            },
+            'Chamado {pk}: {qtd_videos} vídeo(s) / {tamanho_videos} B → {qtd_videos_real} / {tamanho_videos_real} B',
+            'criado_por_id', dry_run,
+        )
+
+        # Os vídeos arquivados continuam ocupando espaço do usuário.
+        dono = OuterRef('pk')
+        with transaction.atomic():
+            self._criar_usos_ausentes()
+            usuarios_corrigidos = self._reconciliar(
+                UsoArmazenamento.objects.all(),
+                {
+                    'total_videos': (
+                        _agregado(Video, Count('id'), chamado__criado_por=dono)
+                        + _agregado(VideoArquivado, Count('id'), chamado__criado_por=dono)
+                    ),
+                    'espaco_usado': (
+                        _agregado(Video, Sum('tamanho'), chamado__criado_por=dono)
+                        + _agregado(VideoArquivado, Sum('tamanho'), chamado__criado_por=dono)
+                    ),
+                },
+                'Usuário {pk}: ({total_videos}, {espaco_usado}) → ({total_videos_real}, {espaco_usado_real})',
+                'usuario_id', dry_run,
+            )
+            if dry_run:
+                # Desfaz os registros criados por _criar_usos_ausentes.
+                transaction.set_rollback(True)
+
+        verbo = 'divergente(s)' if dry_run else 'corrigido(s)'
+        self.stdout.write(self.style.SUCCESS(
+            f'{chamados_corrigidos} chamado(s) e {usuarios_corrigidos} usuário(s) {verbo}.'
+        ))
+
+    @staticmethod
+    def _criar_usos_ausentes():
+        """Registro zerado para quem tem vídeos mas nunca foi contabilizado."""
+        tem_videos = Q(Exists(Video.objects.filter(chamado__criado_por=OuterRef('pk')))) | Q(
+            Exists(VideoArquivado.objects.filter(chamado__criado_por=OuterRef('pk')))
+        )
+        ausentes = get_user_model().objects.filter(
+            tem_videos, ~Exists(UsoArmazenamento.objects.filter(usuario=OuterRef('pk'))),
+        ).values_list('pk', flat=True)
+        UsoArmazenamento.objects.bulk_create(
+            [UsoArmazenamento(usuario_id=pk) for pk in ausentes], ignore_conflicts=True,
+        )
+
+    def _reconciliar(self, qs, reais, mensagem, campo_usuario, dry_run):
+        """
+        Corrige os contadores de ``qs`` que divergem de ``reais`` (campo →
+        expressão calculada a partir dos vídeos). Retorna quantos divergiam.
+
+        As linhas divergentes são travadas antes de recalcular: um envio em
+        andamento termina (ou espera) e o UPDATE, que recalcula tudo no mesmo
+        comando, já enxerga o vídeo dele. Escrever um valor lido antes
+        apagaria os incrementos ``F()`` feitos nesse meio-tempo.
+        """
+        anotados = qs.annotate(**{f'{campo}_real': expressao for campo, expressao in reais.items()})
+        divergentes = Q()
+        for campo in reais:
+            divergentes |= ~Q(**{campo: F(f'{campo}_real')})
+        with transaction.atomic():
+            candidatos = list(anotados.filter(divergentes).values_list('pk', flat=True))
+            if candidatos and not dry_run:
+                list(qs.select_for_update().filter(pk__in=candidatos).order_by('pk').values_list('pk'))
+            # Relido depois da trava: outro envio pode ter mudado os números.
+            linhas = list(
+                anotados.filter(divergentes, pk__in=candidatos).order_by('pk')
+                .values('pk', campo_usuario, *reais, *(f'{campo}_real' for campo in reais))
+            )
+            for linha in linhas:
+                self.stdout.write(mensagem.format(**linha))
+            if linhas and not dry_run:
+                qs.filter(pk__in=[linha['pk'] for linha in linhas]).update(**reais)
+                usuarios = {linha[campo_usuario] for linha in linhas}
+
+                def invalidar():
+                    for usuario_id in usuarios:
+                        DashboardService.invalidar(usuario_id)
+
+                transaction.on_commit(invalidar)
+        return len(linhas)
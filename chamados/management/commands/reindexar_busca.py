@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from chamados import busca
+from chamados.models import Chamado
+
+LOTE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Reconstrói o índice de busca textual de todos os chamados.'
+
+    def handle(self, *args, **options):
+        backend = busca.backend()
+        ids = list(Chamado.objects.order_by('pk').values_list('pk', flat=True))
+        for inicio in range(0, len(ids), LOTE):
+            backend.indexar(ids[inicio:inicio + LOTE])
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(ids)} chamado(s) indexado(s) ({backend.nome}).'
+        ))
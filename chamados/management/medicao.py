@@ -0,0 +1,51 @@
+"""
+Apoio aos comandos ``medir_*`` que precisam de dados no banco.
+"""
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.db import connection
+from django.test.utils import override_settings
+
+CACHE_MEDICAO = {'default': {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'medicao',
+}}
+
+
+@contextmanager
+def banco_temporario():
+    """
+    Banco de teste do ``default`` (migrado e vazio), destruído na saída: a
+    medição popula à vontade sem tocar nos dados de verdade. No SQLite o banco
+    fica num arquivo temporário, e não em memória, para valerem os pragmas de
+    produção. Réplicas ficam desligadas: os dados só existem no banco de teste.
+    O cache também é trocado por um locmem próprio, que a medição pode limpar
+    sem apagar o cache compartilhado nem ler entradas dos dados de verdade.
+    """
+    nome = connection.settings_dict['NAME']
+    teste = connection.settings_dict['TEST']
+    nome_teste = teste.get('NAME')
+    with tempfile.TemporaryDirectory() as pasta, override_settings(
+        DATABASE_REPLICAS=[], CACHES=CACHE_MEDICAO,
+    ):
+        if connection.vendor == 'sqlite':
+            teste['NAME'] = str(Path(pasta) / 'medicao.sqlite3')
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            yield connection
+        finally:
+            connection.creation.destroy_test_db(nome, verbosity=0)
+            teste['NAME'] = nome_teste
+
+
+def cronometrar(funcao, repeticoes):
+    """Menor tempo de ``funcao()`` em ``repeticoes`` execuções, em ms."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos) * 1000
@@ -0,0 +1,282 @@
+"""
+Extração de metadados de vídeo (duração, resolução, codec e MIME) lendo
+apenas os cabeçalhos do contêiner, sem ffmpeg.
+
+O arquivo é mapeado com ``mmap``: só as páginas efetivamente acessadas
+(caixas ``moov`` do MP4/MOV, cabeçalhos EBML do Matroska, ``avih`` do AVI)
+são lidas do disco. Os dados de mídia (``mdat``, ``Cluster``, ``movi``) são
+pulados pelo tamanho declarado, sem leitura.
+"""
+import io
+import mimetypes
+import mmap
+import struct
+
+CODECS_MP4 = {
+    'avc1': 'h264',
+    'avc3': 'h264',
+    'hvc1': 'h265',
+    'hev1': 'h265',
+    'mp4v': 'mpeg4',
+    'av01': 'av1',
+    'vp09': 'vp9',
+    'jpeg': 'mjpeg',
+    'mjpa': 'mjpeg',
+}
+
+CODECS_MATROSKA = {
+    'V_MPEG4/ISO/AVC': 'h264',
+    'V_MPEGH/ISO/HEVC': 'h265',
+    'V_MPEG4/ISO/ASP': 'mpeg4',
+    'V_VP8': 'vp8',
+    'V_VP9': 'vp9',
+    'V_AV1': 'av1',
+    'V_MJPEG': 'mjpeg',
+}
+
+# Cabeçalhos que identificam contêineres sem metadados extraídos aqui.
+ASF_GUID = bytes.fromhex('3026b2758e66cf11a6d900aa0062ce6c')
+
+
+def _vazio():
+    return {'duracao': None, 'largura': None, 'altura': None, 'codec': '', 'mime_type': ''}
+
+
+# ─────────────────── MP4 / MOV (ISO BMFF) ───────────────────
+def caixas(buf, inicio, fim):
+    """Itera ``(tipo, inicio_do_conteudo, fim)`` das caixas em ``buf[inicio:fim]``."""
+    pos = inicio
+    while pos + 8 <= fim:
+        tamanho, tipo = struct.unpack_from('>I4s', buf, pos)
+        cabecalho = 8
+        if tamanho == 1:
+            if pos + 16 > fim:
+                return
+            tamanho = struct.unpack_from('>Q', buf, pos + 8)[0]
+            cabecalho = 16
+        elif tamanho == 0:
+            tamanho = fim - pos
+        if tamanho < cabecalho or pos + tamanho > fim:
+            return
+        yield tipo.decode('latin-1'), pos + cabecalho, pos + tamanho
+        pos += tamanho
+
+
+def _filho(buf, inicio, fim, tipo):
+    for t, i, f in caixas(buf, inicio, fim):
+        if t == tipo:
+            return i, f
+    return None
+
+
+def _mp4(buf):
+    meta = _vazio()
+    ftyp = _filho(buf, 0, len(buf), 'ftyp')
+    marca = bytes(buf[ftyp[0]:ftyp[0] + 4]) if ftyp else b''
+    meta['mime_type'] = 'video/quicktime' if marca == b'qt  ' else 'video/mp4'
+
+    moov = _filho(buf, 0, len(buf), 'moov')
+    if not moov:
+        return meta
+
+    mvhd = _filho(buf, *moov, 'mvhd')
+    if mvhd:
+        i = mvhd[0]
+        if buf[i] == 1:
+            escala, duracao = struct.unpack_from('>IQ', buf, i + 20)
+        else:
+            escala, duracao = struct.unpack_from('>II', buf, i + 12)
+        if escala:
+            meta['duracao'] = duracao / escala
+
+    for tipo, i, f in caixas(buf, *moov):
+        if tipo != 'trak':
+            continue
+        mdia = _filho(buf, i, f, 'mdia')
+        hdlr = mdia and _filho(buf, *mdia, 'hdlr')
+        if not hdlr or bytes(buf[hdlr[0] + 8:hdlr[0] + 12]) != b'vide':
+            continue
+        tkhd = _filho(buf, i, f, 'tkhd')
+        if tkhd:
+            largura, altura = struct.unpack_from('>II', buf, tkhd[1] - 8)
+            meta['largura'] = largura >> 16 or None
+            meta['altura'] = altura >> 16 or None
+        minf = _filho(buf, *mdia, 'minf')
+        stbl = minf and _filho(buf, *minf, 'stbl')
+        stsd = stbl and _filho(buf, *stbl, 'stsd')
+        if stsd:
+            # version/flags (4) + entry_count (4) + primeira entrada.
+            fourcc = bytes(buf[stsd[0] + 12:stsd[0] + 16]).decode('latin-1')
+            meta['codec'] = CODECS_MP4.get(fourcc, fourcc.strip())
+        break
+    return meta
+
+
+# ─────────────────── Matroska / WebM (EBML) ───────────────────
+EBML = 0x1A45DFA3
+EBML_DOCTYPE = 0x4282
+SEGMENT = 0x18538067
+INFO = 0x1549A966
+TIMESCALE = 0x2AD7B1
+DURACAO = 0x4489
+TRACKS = 0x1654AE6B
+TRACK_ENTRY = 0xAE
+TRACK_TIPO = 0x83
+CODEC_ID = 0x86
+VIDEO = 0xE0
+LARGURA = 0xB0
+ALTURA = 0xBA
+CLUSTER = 0x1F43B675
+
+
+def _vint(buf, pos, manter_marcador):
+    primeiro = buf[pos]
+    comprimento = 1
+    mascara = 0x80
+    while comprimento <= 8 and not primeiro & mascara:
+        mascara >>= 1
+        comprimento += 1
+    if comprimento > 8:
+        raise ValueError('VINT inválido')
+    valor = primeiro if manter_marcador else primeiro & (mascara - 1)
+    for b in buf[pos + 1:pos + comprimento]:
+        valor = (valor << 8) | b
+    desconhecido = not manter_marcador and valor == (1 << (7 * comprimento)) - 1
+    return valor, comprimento, desconhecido
+
+
+def _elementos(buf, inicio, fim):
+    pos = inicio
+    while pos < fim:
+        ident, n, _ = _vint(buf, pos, True)
+        tamanho, m, desconhecido = _vint(buf, pos + n, False)
+        dados = pos + n + m
+        fim_el = fim if desconhecido else min(fim, dados + tamanho)
+        yield ident, dados, fim_el
+        pos = fim_el
+
+
+def _uint(buf, i, f):
+    return int.from_bytes(buf[i:f], 'big')
+
+
+def _matroska(buf):
+    meta = _vazio()
+    meta['mime_type'] = 'video/x-matroska'
+    escala = 1_000_000
+    duracao = None
+    for ident, i, f in _elementos(buf, 0, len(buf)):
+        if ident == EBML:
+            for sub, si, sf in _elementos(buf, i, f):
+                if sub == EBML_DOCTYPE and bytes(buf[si:sf]).rstrip(b'\0') == b'webm':
+                    meta['mime_type'] = 'video/webm'
+        elif ident == SEGMENT:
+            for sub, si, sf in _elementos(buf, i, f):
+                if sub == INFO:
+                    for el, ei, ef in _elementos(buf, si, sf):
+                        if el == TIMESCALE:
+                            escala = _uint(buf, ei, ef)
+                        elif el == DURACAO:
+                            fmt = '>f' if ef - ei == 4 else '>d'
+                            duracao = struct.unpack_from(fmt, buf, ei)[0]
+                elif sub == TRACKS:
+                    _matroska_tracks(buf, si, sf, meta)
+                elif sub == CLUSTER:
+                    # Info e Tracks vêm antes dos clusters; não há mais o que ler.
+                    break
+            break
+    if duracao is not None:
+        meta['duracao'] = duracao * escala / 1e9
+    return meta
+
+
+def _matroska_tracks(buf, inicio, fim, meta):
+    for ident, i, f in _elementos(buf, inicio, fim):
+        if ident != TRACK_ENTRY:
+            continue
+        tipo, codec, largura, altura = None, '', None, None
+        for el, ei, ef in _elementos(buf, i, f):
+            if el == TRACK_TIPO:
+                tipo = _uint(buf, ei, ef)
+            elif el == CODEC_ID:
+                codec = bytes(buf[ei:ef]).rstrip(b'\0').decode('ascii', 'replace')
+            elif el == VIDEO:
+                for v, vi, vf in _elementos(buf, ei, ef):
+                    if v == LARGURA:
+                        largura = _uint(buf, vi, vf)
+                    elif v == ALTURA:
+                        altura = _uint(buf, vi, vf)
+        if tipo == 1:
+            meta['codec'] = CODECS_MATROSKA.get(codec, codec)
+            meta['largura'] = largura
+            meta['altura'] = altura
+            return
+
+
+# ─────────────────── AVI (RIFF) ───────────────────
+def _avi(buf):
+    meta = _vazio()
+    meta['mime_type'] = 'video/x-msvideo'
+    # RIFF 'AVI ' → LIST 'hdrl' → 'avih' (MainAVIHeader)
+    pos = 12
+    if bytes(buf[pos:pos + 4]) == b'LIST' and bytes(buf[pos + 8:pos + 12]) == b'hdrl':
+        if bytes(buf[pos + 12:pos + 16]) == b'avih':
+            i = pos + 20
+            us_por_quadro, = struct.unpack_from('<I', buf, i)
+            total_quadros, = struct.unpack_from('<I', buf, i + 16)
+            largura, altura = struct.unpack_from('<II', buf, i + 32)
+            if us_por_quadro:
+                meta['duracao'] = total_quadros * us_por_quadro / 1e6
+            meta['largura'] = largura or None
+            meta['altura'] = altura or None
+        # Primeiro 'strh' de vídeo: fccType 'vids' seguido do fccHandler (codec).
+        vids = bytes(buf[pos:pos + 4096]).find(b'vids')
+        if vids >= 0:
+            fourcc = bytes(buf[pos + vids + 4:pos + vids + 8])
+            meta['codec'] = fourcc.decode('latin-1').strip('\0 ').lower()
+    return meta
+
+
+def _detectar(buf, nome):
+    inicio = bytes(buf[:16])
+    if inicio[4:8] in (b'ftyp', b'moov', b'mdat', b'free', b'wide', b'skip'):
+        return _mp4(buf)
+    if inicio[:4] == b'\x1a\x45\xdf\xa3':
+        return _matroska(buf)
+    if inicio[:4] == b'RIFF' and inicio[8:12] == b'AVI ':
+        return _avi(buf)
+    meta = _vazio()
+    if inicio == ASF_GUID:
+        meta['mime_type'] = 'video/x-ms-wmv'
+    else:
+        meta['mime_type'] = mimetypes.guess_type(nome)[0] or ''
+    return meta
+
+
+def extrair(arquivo, nome=''):
+    """
+    Retorna ``{'duracao', 'largura', 'altura', 'codec', 'mime_type'}`` de
+    ``arquivo`` (objeto de arquivo aberto). Campos não identificados ficam
+    vazios; arquivos corrompidos nunca geram exceção.
+    """
+    nome = nome or getattr(arquivo, 'name', '') or ''
+    try:
+        fd = arquivo.fileno()
+    except (AttributeError, OSError):
+        fd = None
+
+    try:
+        if fd is not None:
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as buf:
+                return _detectar(buf, nome)
+        # Upload pequeno mantido em memória (abaixo de FILE_UPLOAD_MAX_MEMORY_SIZE).
+        posicao = arquivo.tell()
+        arquivo.seek(0)
+        try:
+            return _detectar(arquivo.read(), nome)
+        finally:
+            arquivo.seek(posicao)
+    except (ValueError, IndexError, struct.error, io.UnsupportedOperation):
+        meta = _vazio()
+        meta['mime_type'] = mimetypes.guess_type(nome)[0] or ''
+        return meta
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.16 on 2026-10-17 11:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('chamados', '0002_remove_chamado_endereco_alter_chamado_cliente_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessaoUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('nome_original', models.CharField(max_length=255, verbose_name='Nome Original')),
+                ('tamanho', models.BigIntegerField(verbose_name='Tamanho (bytes)')),
+                ('tamanho_parte', models.PositiveIntegerField(verbose_name='Tamanho da parte (bytes)')),
+                ('descricao', models.CharField(blank=True, max_length=300, verbose_name='Descrição do vídeo')),
+                ('finalizando', models.BooleanField(default=False)),
+                ('criado_em', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('expira_em', models.DateTimeField(db_index=True, verbose_name='Expira em')),
+                ('chamado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sessoes_upload', to='chamados.chamado')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sessoes_upload', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Sessão de Upload',
+                'verbose_name_plural': 'Sessões de Upload',
+            },
+        ),
+    ]
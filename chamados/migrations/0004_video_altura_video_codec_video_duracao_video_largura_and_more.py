@@ -0,0 +1,38 @@
+# Generated by Django 4.2.16 on 2026-10-17 12:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chamados', '0003_sessaoupload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='altura',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Altura'),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='codec',
+            field=models.CharField(blank=True, max_length=50, verbose_name='Codec'),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='duracao',
+            field=models.FloatField(blank=True, null=True, verbose_name='Duração (s)'),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='largura',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Largura'),
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='mime_type',
+            field=models.CharField(blank=True, max_length=100, verbose_name='Tipo MIME'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-17 12:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chamados', '0004_video_altura_video_codec_video_duracao_video_largura_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='otimizado',
+            field=models.BooleanField(default=False, help_text='MP4/MOV com o índice (moov) no início do arquivo.', verbose_name='Otimizado para streaming'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.16 on 2026-10-17 12:04
+
+import chamados.models
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chamados', '0005_video_otimizado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArquivoVideo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='SHA-256')),
+                ('arquivo', models.FileField(upload_to=chamados.models.blob_upload_path, verbose_name='Arquivo')),
+                ('tamanho', models.BigIntegerField(default=0, verbose_name='Tamanho (bytes)')),
+                ('referencias', models.PositiveIntegerField(default=0, verbose_name='Referências')),
+                ('criado_em', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+            ],
+            options={
+                'verbose_name': 'Arquivo de Vídeo',
+                'verbose_name_plural': 'Arquivos de Vídeo',
+            },
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='blob',
+            field=models.ForeignKey(blank=True, help_text='Preenchido no armazenamento deduplicado.', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='videos', to='chamados.arquivovideo', verbose_name='Conteúdo'),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.16 on 2026-10-17 12:07
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+import django.db.models.deletion
+
+
+def preencher_contadores(apps, schema_editor):
+    Chamado = apps.get_model('chamados', 'Chamado')
+    Video = apps.get_model('chamados', 'Video')
+    UsoArmazenamento = apps.get_model('chamados', 'UsoArmazenamento')
+    alias = schema_editor.connection.alias
+
+    por_chamado = Video.objects.using(alias).values('chamado_id').annotate(
+        qtd=Count('id'), tamanho=Sum('tamanho'),
+    )
+    for linha in por_chamado.iterator():
+        Chamado.objects.using(alias).filter(pk=linha['chamado_id']).update(
+            qtd_videos=linha['qtd'], tamanho_videos=linha['tamanho'] or 0,
+        )
+
+    por_usuario = Video.objects.using(alias).values('chamado__criado_por_id').annotate(
+        qtd=Count('id'), tamanho=Sum('tamanho'),
+    )
+    UsoArmazenamento.objects.using(alias).bulk_create([
+        UsoArmazenamento(
+            usuario_id=linha['chamado__criado_por_id'],
+            total_videos=linha['qtd'],
+            espaco_usado=linha['tamanho'] or 0,
+        )
+        for linha in por_usuario
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('chamados', '0006_arquivovideo_video_blob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UsoArmazenamento',
+            fields=[
+                ('usuario', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='uso_armazenamento', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_videos', models.PositiveIntegerField(default=0, verbose_name='Total de vídeos')),
+                ('espaco_usado', models.BigIntegerField(default=0, verbose_name='Espaço usado (bytes)')),
+            ],
+            options={
+                'verbose_name': 'Uso de Armazenamento',
+                'verbose_name_plural': 'Uso de Armazenamento',
+            },
+        ),
+        migrations.AddField(
+            model_name='chamado',
+            name='qtd_videos',
+            field=models.PositiveIntegerField(default=0, verbose_name='Quantidade de vídeos'),
+        ),
+        migrations.AddField(
+            model_name='chamado',
+            name='tamanho_videos',
+            field=models.BigIntegerField(default=0, verbose_name='Tamanho dos vídeos (bytes)'),
+        ),
+        migrations.RunPython(preencher_contadores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-17 12:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chamados', '0007_contadores'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chamado',
+            index=models.Index(fields=['criado_por', '-criado_em', '-id'], name='chamado_usuario_recentes'),
+        ),
+    ]
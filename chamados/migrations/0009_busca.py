@@ -0,0 +1,37 @@
+from django.db import migrations
+
+LOTE = 1000
+
+
+def criar_indice(apps, schema_editor):
+    from chamados import busca
+
+    backend = busca.backend_para(schema_editor.connection)
+    backend.criar(schema_editor)
+    Chamado = apps.get_model('chamados', 'Chamado')
+    Comentario = apps.get_model('chamados', 'Comentario')
+    # Tudo pela conexão da migração (migrate --database=...), não a padrão.
+    alias = schema_editor.connection.alias
+    ids = list(Chamado.objects.using(alias).order_by('pk').values_list('pk', flat=True))
+    for inicio in range(0, len(ids), LOTE):
+        backend.indexar(ids[inicio:inicio + LOTE], Chamado, Comentario)
+    busca._backend.cache_clear()
+
+
+def remover_indice(apps, schema_editor):
+    from chamados import busca
+
+    busca.backend_para(schema_editor.connection).remover_estrutura(schema_editor)
+    busca._backend.cache_clear()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientes', '0001_initial'),
+        ('chamados', '0008_chamado_usuario_recentes'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indice, remover_indice),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 4.2.16 on 2026-10-17 12:19
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('chamados', '0009_busca'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConsolidacaoMetricas',
+            fields=[
+                ('nome', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('processado_ate', models.DateField(verbose_name='Processado até')),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Consolidação de Métricas',
+                'verbose_name_plural': 'Consolidação de Métricas',
+            },
+        ),
+        migrations.CreateModel(
+            name='MetricaDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia', models.DateField(verbose_name='Dia')),
+                ('chamados_criados', models.PositiveIntegerField(default=0)),
+                ('chamados_resolvidos', models.PositiveIntegerField(default=0, help_text='Resolvidos/fechados com última alteração no dia.')),
+                ('status_aberto', models.PositiveIntegerField(default=0)),
+                ('status_em_andamento', models.PositiveIntegerField(default=0)),
+                ('status_resolvido', models.PositiveIntegerField(default=0)),
+                ('status_fechado', models.PositiveIntegerField(default=0)),
+                ('prioridade_baixa', models.PositiveIntegerField(default=0)),
+                ('prioridade_media', models.PositiveIntegerField(default=0)),
+                ('prioridade_alta', models.PositiveIntegerField(default=0)),
+                ('prioridade_critica', models.PositiveIntegerField(default=0)),
+                ('videos_enviados', models.PositiveIntegerField(default=0)),
+                ('bytes_enviados', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Métrica Diária',
+                'verbose_name_plural': 'Métricas Diárias',
+                'ordering': ['usuario', 'dia'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='chamado',
+            index=models.Index(fields=['criado_em'], name='chamado_criado_em'),
+        ),
+        migrations.AddIndex(
+            model_name='chamado',
+            index=models.Index(fields=['atualizado_em'], name='chamado_atualizado_em'),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['enviado_em'], name='video_enviado_em'),
+        ),
+        migrations.AddField(
+            model_name='metricadiaria',
+            name='usuario',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='metricas_diarias', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='metricadiaria',
+            constraint=models.UniqueConstraint(fields=('usuario', 'dia'), name='metrica_diaria_unica'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.16 on 2026-10-17 13:05
+
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.db import migrations
+
+
+def gerar_hashes(apps, schema_editor):
+    Chamado = apps.get_model('chamados', 'Chamado')
+    alias = schema_editor.connection.alias
+    chamados = []
+    for chamado in Chamado.objects.using(alias).exclude(senha_compartilhamento='').only('senha_compartilhamento').iterator():
+        try:
+            identify_hasher(chamado.senha_compartilhamento)
+        except ValueError:
+            chamado.senha_compartilhamento = make_password(chamado.senha_compartilhamento)
+            chamados.append(chamado)
+    Chamado.objects.using(alias).bulk_update(chamados, ['senha_compartilhamento'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chamados', '0010_metricas_diarias'),
+    ]
+
+    operations = [
+        # Senhas em texto puro viram hash; não há volta.
+        migrations.RunPython(gerar_hashes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-17 12:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chamados', '0011_senha_compartilhamento_hash'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='chamado',
+            index=models.Index(fields=['cliente', '-criado_em', '-id'], name='chamado_cliente_recentes'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+def remover_fk(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    # Ver BuscaPostgres.criar: a remoção passa a ser feita pelo sinal.
+    schema_editor.execute(
+        'ALTER TABLE chamados_busca DROP CONSTRAINT IF EXISTS chamados_busca_chamado_id_fkey'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chamados', '0012_chamado_cliente_recentes'),
+    ]
+
+    operations = [
+        migrations.RunPython(remover_fk, migrations.RunPython.noop),
+    ]
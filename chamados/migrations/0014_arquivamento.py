@@ -0,0 +1,99 @@
+# Generated by Django 4.2.16 on 2026-10-17 12:44
+
+import chamados.models
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('clientes', '0004_indices_postgres'),
+        ('chamados', '0013_busca_sem_fk'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChamadoArquivado',
+            fields=[
+                ('slug', models.SlugField(editable=False, max_length=64, unique=True)),
+                ('titulo', models.CharField(max_length=200, verbose_name='Título')),
+                ('descricao', models.TextField(blank=True, verbose_name='Descrição')),
+                ('status', models.CharField(choices=[('aberto', 'Aberto'), ('em_andamento', 'Em Andamento'), ('resolvido', 'Resolvido'), ('fechado', 'Fechado')], default='aberto', max_length=20)),
+                ('prioridade', models.CharField(choices=[('baixa', 'Baixa'), ('media', 'Média'), ('alta', 'Alta'), ('critica', 'Crítica')], default='media', max_length=20)),
+                ('tipo_compartilhamento', models.CharField(choices=[('publico', 'Link Público'), ('temporario', 'Link Temporário'), ('protegido', 'Protegido por Senha')], default='publico', max_length=20, verbose_name='Tipo de Compartilhamento')),
+                ('senha_compartilhamento', models.CharField(blank=True, help_text='Necessário quando o tipo é "Protegido por Senha".', max_length=128, verbose_name='Senha do Link')),
+                ('expira_em', models.DateTimeField(blank=True, help_text='Necessário quando o tipo é "Link Temporário".', null=True, verbose_name='Expira em')),
+                ('qtd_videos', models.PositiveIntegerField(default=0, verbose_name='Quantidade de vídeos')),
+                ('tamanho_videos', models.BigIntegerField(default=0, verbose_name='Tamanho dos vídeos (bytes)')),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('criado_em', models.DateTimeField(verbose_name='Criado em')),
+                ('atualizado_em', models.DateTimeField(verbose_name='Atualizado em')),
+                ('arquivado_em', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Arquivado em')),
+                ('cliente', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='chamados_arquivados', to='clientes.cliente', verbose_name='Cliente')),
+                ('criado_por', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chamados_arquivados', to=settings.AUTH_USER_MODEL, verbose_name='Criado por')),
+            ],
+            options={
+                'verbose_name': 'Chamado Arquivado',
+                'verbose_name_plural': 'Chamados Arquivados',
+                'ordering': ['-criado_em'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ComentarioArquivado',
+            fields=[
+                ('texto', models.TextField(verbose_name='Comentário')),
+                ('autor_nome', models.CharField(blank=True, help_text='Identificação opcional para visitantes externos', max_length=100, verbose_name='Nome do Autor')),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('criado_em', models.DateTimeField(verbose_name='Criado em')),
+                ('autor_usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+                ('chamado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comentarios', to='chamados.chamadoarquivado')),
+            ],
+            options={
+                'verbose_name': 'Comentário Arquivado',
+                'verbose_name_plural': 'Comentários Arquivados',
+                'ordering': ['criado_em'],
+            },
+        ),
+        migrations.CreateModel(
+            name='VideoArquivado',
+            fields=[
+                ('arquivo', models.FileField(upload_to=chamados.models.video_upload_path, verbose_name='Arquivo de Vídeo')),
+                ('nome_original', models.CharField(max_length=255, verbose_name='Nome Original')),
+                ('tamanho', models.BigIntegerField(default=0, verbose_name='Tamanho (bytes)')),
+                ('descricao', models.CharField(blank=True, max_length=300, verbose_name='Descrição do vídeo')),
+                ('duracao', models.FloatField(blank=True, null=True, verbose_name='Duração (s)')),
+                ('largura', models.PositiveIntegerField(blank=True, null=True, verbose_name='Largura')),
+                ('altura', models.PositiveIntegerField(blank=True, null=True, verbose_name='Altura')),
+                ('codec', models.CharField(blank=True, max_length=50, verbose_name='Codec')),
+                ('mime_type', models.CharField(blank=True, max_length=100, verbose_name='Tipo MIME')),
+                ('otimizado', models.BooleanField(default=False, help_text='MP4/MOV com o índice (moov) no início do arquivo.', verbose_name='Otimizado para streaming')),
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('enviado_em', models.DateTimeField(verbose_name='Enviado em')),
+                ('blob', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='videos_arquivados', to='chamados.arquivovideo', verbose_name='Conteúdo')),
+                ('chamado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='videos', to='chamados.chamadoarquivado')),
+                ('enviado_por', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Enviado por')),
+            ],
+            options={
+                'verbose_name': 'Vídeo Arquivado',
+                'verbose_name_plural': 'Vídeos Arquivados',
+                'ordering': ['-enviado_em'],
+                'indexes': [models.Index(fields=['enviado_em'], name='video_arquivado_enviado_em')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='chamadoarquivado',
+            index=models.Index(fields=['criado_por', '-criado_em', '-id'], name='arquivado_usuario_recentes'),
+        ),
+        migrations.AddIndex(
+            model_name='chamadoarquivado',
+            index=models.Index(fields=['criado_em'], name='arquivado_criado_em'),
+        ),
+        migrations.AddIndex(
+            model_name='chamadoarquivado',
+            index=models.Index(fields=['atualizado_em'], name='arquivado_atualizado_em'),
+        ),
+    ]
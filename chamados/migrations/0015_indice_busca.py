@@ -0,0 +1,37 @@
+# Generated by Django 4.2.16 on 2026-10-17 13:19
+
+import chamados.busca
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chamados', '0014_arquivamento'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndiceBuscaFTS5',
+            fields=[
+                ('chamado', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='indice_fts5', serialize=False, to='chamados.chamado')),
+                ('documento', chamados.busca.DocumentoFTS5(db_column='chamados_busca')),
+            ],
+            options={
+                'db_table': 'chamados_busca',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='IndiceBuscaTsvector',
+            fields=[
+                ('chamado', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='indice_tsvector', serialize=False, to='chamados.chamado')),
+                ('vetor', chamados.busca.VetorBusca()),
+            ],
+            options={
+                'db_table': 'chamados_busca',
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.16 on 2026-10-17 14:02
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def preencher_resolvido_em(apps, schema_editor):
+    alias = schema_editor.connection.alias
+    # Sem histórico de status: a última alteração é a melhor aproximação.
+    for nome in ('Chamado', 'ChamadoArquivado'):
+        apps.get_model('chamados', nome).objects.using(alias).filter(
+            status__in=['resolvido', 'fechado'],
+        ).update(resolvido_em=F('atualizado_em'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chamados', '0015_indice_busca'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='chamadoarquivado',
+            name='arquivado_atualizado_em',
+        ),
+        migrations.AddField(
+            model_name='chamado',
+            name='resolvido_em',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Resolvido em'),
+        ),
+        migrations.AddField(
+            model_name='chamadoarquivado',
+            name='resolvido_em',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Resolvido em'),
+        ),
+        migrations.AlterField(
+            model_name='metricadiaria',
+            name='chamados_resolvidos',
+            field=models.PositiveIntegerField(default=0, help_text='Chamados que passaram a resolvido/fechado no dia.'),
+        ),
+        migrations.AddIndex(
+            model_name='chamado',
+            index=models.Index(fields=['resolvido_em'], name='chamado_resolvido_em'),
+        ),
+        migrations.AddIndex(
+            model_name='chamadoarquivado',
+            index=models.Index(fields=['resolvido_em'], name='arquivado_resolvido_em'),
+        ),
+        migrations.RunPython(preencher_resolvido_em, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,15 @@
 import uuid
 from django.conf import settings
+from django.contrib.auth.hashers import check_password
 from django.db import models
 from django.utils import timezone
+from django.utils.crypto import salted_hmac
 
+from .busca import DocumentoFTS5, VetorBusca
 
-class Chamado(models.Model):
-    """Representa um chamado / ocorrência de monitoramento."""
+
+class ChamadoBase(models.Model):
+    """Campos e helpers comuns a ``Chamado`` e ``ChamadoArquivado``."""
 
     class Status(models.TextChoices):
         ABERTO = 'aberto', 'Aberto'
@@ -31,14 +35,6 @@ class Chamado(models.Model):
     titulo = models.CharField('Título', max_length=200)
     descricao = models.TextField('Descrição', blank=True)
 
-    # Localização / cliente
-    cliente = models.ForeignKey(
-        'clientes.Cliente',
-        on_delete=models.PROTECT,
-        related_name='chamados',
-        verbose_name='Cliente',
-    )
-
     # Classificação
     status = models.CharField(
         max_length=20, choices=Status.choices, default=Status.ABERTO,
@@ -54,6 +50,7 @@ class Chamado(models.Model):
         choices=TipoCompartilhamento.choices,
         default=TipoCompartilhamento.PUBLICO,
     )
+    # Guardada como hash (make_password no ChamadoForm); ver verificar_senha.
     senha_compartilhamento = models.CharField(
         'Senha do Link', max_length=128, blank=True,
         help_text='Necessário quando o tipo é "Protegido por Senha".',
@@ -63,29 +60,22 @@ class Chamado(models.Model):
         help_text='Necessário quando o tipo é "Link Temporário".',
     )
 
-    # Meta
-    criado_por = models.ForeignKey(
-        settings.AUTH_USER_MODEL,
-        on_delete=models.CASCADE,
-        related_name='chamados',
-        verbose_name='Criado por',
-    )
-    criado_em = models.DateTimeField('Criado em', auto_now_add=True)
-    atualizado_em = models.DateTimeField('Atualizado em', auto_now=True)
+    # Primeira passagem para resolvido/fechado; limpo se o chamado reabre.
+    resolvido_em = models.DateTimeField('Resolvido em', null=True, blank=True, editable=False)
+
+    # Contadores mantidos pelo VideoService (ver reconciliar_contadores)
+    qtd_videos = models.PositiveIntegerField('Quantidade de vídeos', default=0)
+    tamanho_videos = models.BigIntegerField('Tamanho dos vídeos (bytes)', default=0)
+
+    # Usado pelos templates para esconder as ações de edição.
+    arquivado = False
 
     class Meta:
-        ordering = ['-criado_em']
-        verbose_name = 'Chamado'
-        verbose_name_plural = 'Chamados'
+        abstract = True
 
     def __str__(self):
         return f'#{self.pk} — {self.titulo}'
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            self.slug = uuid.uuid4().hex[:12]
-        super().save(*args, **kwargs)
-
     # ---------- helpers ----------
     @property
     def link_compartilhamento(self):
@@ -99,14 +89,30 @@ class Chamado(models.Model):
             return False
         return timezone.now() > self.expira_em
 
+    def verificar_senha(self, senha):
+        """Compara com o hash em tempo constante."""
+        if not self.senha_compartilhamento:
+            return False
+        return check_password(senha, self.senha_compartilhamento)
+
+    @property
+    def impressao_senha(self):
+        """
+        Identifica a senha atual sem revelá-la. Vai dentro do cookie de acesso:
+        trocar a senha invalida os cookies já emitidos.
+        """
+        return salted_hmac(
+            'chamados.Chamado.impressao_senha', self.senha_compartilhamento,
+        ).hexdigest()[:20]
+
     @property
     def total_videos(self):
-        return self.videos.count()
+        return self.qtd_videos
 
     @property
     def tamanho_total(self):
         """Retorna o tamanho total dos vídeos em bytes."""
-        return self.videos.aggregate(total=models.Sum('tamanho'))['total'] or 0
+        return self.tamanho_videos
 
     @property
     def cor_prioridade(self):
@@ -129,32 +135,274 @@ class Chamado(models.Model):
         return cores.get(self.status, '#6b7280')
 
 
+class Chamado(ChamadoBase):
+    """Representa um chamado / ocorrência de monitoramento."""
+
+    # Localização / cliente
+    cliente = models.ForeignKey(
+        'clientes.Cliente',
+        on_delete=models.PROTECT,
+        related_name='chamados',
+        verbose_name='Cliente',
+    )
+
+    # Meta
+    criado_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='chamados',
+        verbose_name='Criado por',
+    )
+    criado_em = models.DateTimeField('Criado em', auto_now_add=True)
+    atualizado_em = models.DateTimeField('Atualizado em', auto_now=True)
+
+    class Meta:
+        ordering = ['-criado_em']
+        indexes = [
+            # Lista do usuário paginada por cursor em (-criado_em, -id).
+            models.Index(
+                fields=['criado_por', '-criado_em', '-id'],
+                name='chamado_usuario_recentes',
+            ),
+            # Chamados mais recentes de um cliente (detalhe do cliente).
+            models.Index(
+                fields=['cliente', '-criado_em', '-id'],
+                name='chamado_cliente_recentes',
+            ),
+            # Janelas por dia do consolidar_metricas.
+            models.Index(fields=['criado_em'], name='chamado_criado_em'),
+            models.Index(fields=['resolvido_em'], name='chamado_resolvido_em'),
+            models.Index(fields=['atualizado_em'], name='chamado_atualizado_em'),
+        ]
+        verbose_name = 'Chamado'
+        verbose_name_plural = 'Chamados'
+
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            self.slug = uuid.uuid4().hex[:12]
+        if self.status not in (self.Status.RESOLVIDO, self.Status.FECHADO):
+            self.resolvido_em = None
+        elif self.resolvido_em is None:
+            self.resolvido_em = timezone.now()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'status' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'resolvido_em'}
+        super().save(*args, **kwargs)
+
+
+class IndiceBuscaFTS5(models.Model):
+    """
+    Tabela FTS5 ``chamados_busca`` do SQLite (migração 0009, mantida por
+    ``chamados.busca``), mapeada só para a busca juntá-la aos chamados.
+    """
+
+    chamado = models.OneToOneField(
+        Chamado,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        related_name='indice_fts5',
+    )
+    documento = DocumentoFTS5(db_column='chamados_busca')
+
+    class Meta:
+        managed = False
+        db_table = 'chamados_busca'
+
+
+class IndiceBuscaTsvector(models.Model):
+    """A mesma tabela ``chamados_busca`` no PostgreSQL (``tsvector``)."""
+
+    chamado = models.OneToOneField(
+        Chamado,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_constraint=False,
+        related_name='indice_tsvector',
+    )
+    vetor = VetorBusca()
+
+    class Meta:
+        managed = False
+        db_table = 'chamados_busca'
+
+
+class ChamadoArquivado(ChamadoBase):
+    """
+    Chamado fechado movido para fora das tabelas quentes pelo comando
+    ``arquivar_chamados`` (ver ``ArquivamentoService``). Mantém o ``id`` e o
+    ``slug`` originais: o detalhe e o link compartilhado continuam valendo,
+    e a restauração devolve a linha como estava.
+    """
+
+    id = models.BigIntegerField('ID', primary_key=True)
+    cliente = models.ForeignKey(
+        'clientes.Cliente',
+        on_delete=models.PROTECT,
+        related_name='chamados_arquivados',
+        verbose_name='Cliente',
+    )
+    criado_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='chamados_arquivados',
+        verbose_name='Criado por',
+    )
+    # Copiadas do chamado: sem auto_now, que as sobrescreveria.
+    criado_em = models.DateTimeField('Criado em')
+    atualizado_em = models.DateTimeField('Atualizado em')
+    arquivado_em = models.DateTimeField('Arquivado em', default=timezone.now)
+
+    arquivado = True
+
+    class Meta:
+        ordering = ['-criado_em']
+        indexes = [
+            models.Index(
+                fields=['criado_por', '-criado_em', '-id'],
+                name='arquivado_usuario_recentes',
+            ),
+            # Janelas por dia do consolidar_metricas.
+            models.Index(fields=['criado_em'], name='arquivado_criado_em'),
+            models.Index(fields=['resolvido_em'], name='arquivado_resolvido_em'),
+        ]
+        verbose_name = 'Chamado Arquivado'
+        verbose_name_plural = 'Chamados Arquivados'
+
+
+class UsoArmazenamento(models.Model):
+    """Totais de vídeos dos chamados de um usuário, mantidos incrementalmente."""
+
+    usuario = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='uso_armazenamento',
+    )
+    total_videos = models.PositiveIntegerField('Total de vídeos', default=0)
+    espaco_usado = models.BigIntegerField('Espaço usado (bytes)', default=0)
+
+    class Meta:
+        verbose_name = 'Uso de Armazenamento'
+        verbose_name_plural = 'Uso de Armazenamento'
+
+    def __str__(self):
+        return f'{self.usuario} — {self.total_videos} vídeo(s)'
+
+
+class MetricaDiaria(models.Model):
+    """
+    Consolidação diária por usuário, gerada pelo comando
+    ``consolidar_metricas`` para os gráficos históricos do dashboard.
+
+    As contagens por status e prioridade são dos chamados abertos no dia,
+    com o status que tinham quando o dia foi consolidado.
+    """
+
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='metricas_diarias',
+    )
+    dia = models.DateField('Dia')
+
+    chamados_criados = models.PositiveIntegerField(default=0)
+    chamados_resolvidos = models.PositiveIntegerField(
+        default=0, help_text='Chamados que passaram a resolvido/fechado no dia.',
+    )
+    status_aberto = models.PositiveIntegerField(default=0)
+    status_em_andamento = models.PositiveIntegerField(default=0)
+    status_resolvido = models.PositiveIntegerField(default=0)
+    status_fechado = models.PositiveIntegerField(default=0)
+    prioridade_baixa = models.PositiveIntegerField(default=0)
+    prioridade_media = models.PositiveIntegerField(default=0)
+    prioridade_alta = models.PositiveIntegerField(default=0)
+    prioridade_critica = models.PositiveIntegerField(default=0)
+
+    videos_enviados = models.PositiveIntegerField(default=0)
+    bytes_enviados = models.BigIntegerField(default=0)
+
+    class Meta:
+        ordering = ['usuario', 'dia']
+        constraints = [
+            models.UniqueConstraint(fields=['usuario', 'dia'], name='metrica_diaria_unica'),
+        ]
+        verbose_name = 'Métrica Diária'
+        verbose_name_plural = 'Métricas Diárias'
+
+    def __str__(self):
+        return f'{self.usuario} — {self.dia:%d/%m/%Y}'
+
+
+class ConsolidacaoMetricas(models.Model):
+    """Marca d'água do ``consolidar_metricas``: último dia fechado."""
+
+    nome = models.CharField(max_length=50, primary_key=True)
+    processado_ate = models.DateField('Processado até')
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Consolidação de Métricas'
+        verbose_name_plural = 'Consolidação de Métricas'
+
+    def __str__(self):
+        return f'{self.nome}: {self.processado_ate:%d/%m/%Y}'
+
+
 def video_upload_path(instance, filename):
     return f'videos/chamado_{instance.chamado_id}/{filename}'
 
 
-class Video(models.Model):
-    """Arquivo de vídeo anexado a um chamado."""
+def blob_upload_path(instance, filename):
+    import os
+    ext = os.path.splitext(filename)[1].lower()
+    return f'videos/blobs/{instance.sha256[:2]}/{instance.sha256}{ext}'
+
+
+class ArquivoVideo(models.Model):
+    """
+    Conteúdo de vídeo armazenado uma única vez, endereçado pelo SHA-256 dos
+    bytes gravados (o arquivo nunca é reescrito no lugar; o faststart gera
+    outro conteúdo). Cada ``Video`` que usa o conteúdo conta uma referência;
+    o arquivo é removido quando a última referência some.
+    """
+
+    sha256 = models.CharField('SHA-256', max_length=64, unique=True)
+    arquivo = models.FileField('Arquivo', upload_to=blob_upload_path)
+    tamanho = models.BigIntegerField('Tamanho (bytes)', default=0)
+    referencias = models.PositiveIntegerField('Referências', default=0)
+    criado_em = models.DateTimeField('Criado em', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Arquivo de Vídeo'
+        verbose_name_plural = 'Arquivos de Vídeo'
+
+    def __str__(self):
+        return self.sha256
+
+
+class VideoBase(models.Model):
+    """Campos e helpers comuns a ``Video`` e ``VideoArquivado``."""
 
-    chamado = models.ForeignKey(
-        Chamado, on_delete=models.CASCADE, related_name='videos',
-    )
     arquivo = models.FileField('Arquivo de Vídeo', upload_to=video_upload_path)
     nome_original = models.CharField('Nome Original', max_length=255)
     tamanho = models.BigIntegerField('Tamanho (bytes)', default=0)
     descricao = models.CharField('Descrição do vídeo', max_length=300, blank=True)
-    enviado_por = models.ForeignKey(
-        settings.AUTH_USER_MODEL,
-        on_delete=models.SET_NULL,
-        null=True,
-        verbose_name='Enviado por',
+
+    # Metadados do contêiner (preenchidos no envio, ver chamados.metadados)
+    duracao = models.FloatField('Duração (s)', null=True, blank=True)
+    largura = models.PositiveIntegerField('Largura', null=True, blank=True)
+    altura = models.PositiveIntegerField('Altura', null=True, blank=True)
+    codec = models.CharField('Codec', max_length=50, blank=True)
+    mime_type = models.CharField('Tipo MIME', max_length=100, blank=True)
+    otimizado = models.BooleanField(
+        'Otimizado para streaming', default=False,
+        help_text='MP4/MOV com o índice (moov) no início do arquivo.',
     )
-    enviado_em = models.DateTimeField('Enviado em', auto_now_add=True)
 
     class Meta:
-        ordering = ['-enviado_em']
-        verbose_name = 'Vídeo'
-        verbose_name_plural = 'Vídeos'
+        abstract = True
 
     def __str__(self):
         return self.nome_original
@@ -164,6 +412,31 @@ class Video(models.Model):
         import os
         return os.path.splitext(self.nome_original)[1].lower()
 
+    @property
+    def tipo_mime(self):
+        """MIME usado no ``<source type>`` dos players."""
+        if self.mime_type:
+            return self.mime_type
+        import mimetypes
+        return mimetypes.guess_type(self.nome_original)[0] or 'video/mp4'
+
+    @property
+    def duracao_formatada(self):
+        if self.duracao is None:
+            return ''
+        total = int(round(self.duracao))
+        horas, resto = divmod(total, 3600)
+        minutos, segundos = divmod(resto, 60)
+        if horas:
+            return f'{horas}:{minutos:02d}:{segundos:02d}'
+        return f'{minutos}:{segundos:02d}'
+
+    @property
+    def resolucao(self):
+        if self.largura and self.altura:
+            return f'{self.largura}×{self.altura}'
+        return ''
+
     @property
     def tamanho_formatado(self):
         """Mostra o tamanho de forma legível (KB, MB, GB)."""
@@ -175,12 +448,77 @@ class Video(models.Model):
         return f'{size:.1f} TB'
 
 
-class Comentario(models.Model):
-    """Comentário em um chamado."""
+class Video(VideoBase):
+    """Arquivo de vídeo anexado a um chamado."""
 
     chamado = models.ForeignKey(
-        Chamado, on_delete=models.CASCADE, related_name='comentarios',
+        Chamado, on_delete=models.CASCADE, related_name='videos',
+    )
+    blob = models.ForeignKey(
+        ArquivoVideo,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='videos',
+        verbose_name='Conteúdo',
+        help_text='Preenchido no armazenamento deduplicado.',
+    )
+    enviado_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        verbose_name='Enviado por',
     )
+    enviado_em = models.DateTimeField('Enviado em', auto_now_add=True)
+
+    class Meta:
+        ordering = ['-enviado_em']
+        indexes = [
+            models.Index(fields=['enviado_em'], name='video_enviado_em'),
+        ]
+        verbose_name = 'Vídeo'
+        verbose_name_plural = 'Vídeos'
+
+
+class VideoArquivado(VideoBase):
+    """
+    Vídeo de um ``ChamadoArquivado``. O arquivo fica onde estava e a
+    referência ao conteúdo deduplicado continua contada em ``ArquivoVideo``.
+    """
+
+    id = models.BigIntegerField('ID', primary_key=True)
+    chamado = models.ForeignKey(
+        ChamadoArquivado, on_delete=models.CASCADE, related_name='videos',
+    )
+    blob = models.ForeignKey(
+        ArquivoVideo,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='videos_arquivados',
+        verbose_name='Conteúdo',
+    )
+    enviado_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+',
+        verbose_name='Enviado por',
+    )
+    enviado_em = models.DateTimeField('Enviado em')
+
+    class Meta:
+        ordering = ['-enviado_em']
+        indexes = [
+            models.Index(fields=['enviado_em'], name='video_arquivado_enviado_em'),
+        ]
+        verbose_name = 'Vídeo Arquivado'
+        verbose_name_plural = 'Vídeos Arquivados'
+
+
+class ComentarioBase(models.Model):
+    """Campos e helpers comuns a ``Comentario`` e ``ComentarioArquivado``."""
+
     texto = models.TextField('Comentário')
     autor_nome = models.CharField(
         'Nome do Autor',
@@ -188,6 +526,27 @@ class Comentario(models.Model):
         blank=True,
         help_text='Identificação opcional para visitantes externos',
     )
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        autor = self.autor_usuario.username if self.autor_usuario else self.autor_nome or 'Anônimo'
+        return f'{autor} em {self.criado_em.strftime("%d/%m/%Y %H:%M")}'
+
+    @property
+    def autor_display(self):
+        if self.autor_usuario:
+            return f'{self.autor_usuario.get_full_name() or self.autor_usuario.username} (Proceder)'
+        return self.autor_nome or 'Visitante'
+
+
+class Comentario(ComentarioBase):
+    """Comentário em um chamado."""
+
+    chamado = models.ForeignKey(
+        Chamado, on_delete=models.CASCADE, related_name='comentarios',
+    )
     autor_usuario = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.SET_NULL,
@@ -202,12 +561,67 @@ class Comentario(models.Model):
         verbose_name = 'Comentário'
         verbose_name_plural = 'Comentários'
 
+
+class ComentarioArquivado(ComentarioBase):
+    """Comentário de um ``ChamadoArquivado``."""
+
+    id = models.BigIntegerField('ID', primary_key=True)
+    chamado = models.ForeignKey(
+        ChamadoArquivado, on_delete=models.CASCADE, related_name='comentarios',
+    )
+    autor_usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Usuário',
+    )
+    criado_em = models.DateTimeField('Criado em')
+
+    class Meta:
+        ordering = ['criado_em']
+        verbose_name = 'Comentário Arquivado'
+        verbose_name_plural = 'Comentários Arquivados'
+
+
+class SessaoUpload(models.Model):
+    """Upload retomável de um vídeo, enviado em partes numeradas."""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    chamado = models.ForeignKey(
+        Chamado, on_delete=models.CASCADE, related_name='sessoes_upload',
+    )
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='sessoes_upload',
+    )
+    nome_original = models.CharField('Nome Original', max_length=255)
+    tamanho = models.BigIntegerField('Tamanho (bytes)')
+    tamanho_parte = models.PositiveIntegerField('Tamanho da parte (bytes)')
+    descricao = models.CharField('Descrição do vídeo', max_length=300, blank=True)
+    finalizando = models.BooleanField(default=False)
+    criado_em = models.DateTimeField('Criado em', auto_now_add=True)
+    expira_em = models.DateTimeField('Expira em', db_index=True)
+
+    class Meta:
+        verbose_name = 'Sessão de Upload'
+        verbose_name_plural = 'Sessões de Upload'
+
     def __str__(self):
-        autor = self.autor_usuario.username if self.autor_usuario else self.autor_nome or 'Anônimo'
-        return f'{autor} em {self.criado_em.strftime("%d/%m/%Y %H:%M")}'
+        return f'{self.nome_original} ({self.pk})'
 
     @property
-    def autor_display(self):
-        if self.autor_usuario:
-            return f'{self.autor_usuario.get_full_name() or self.autor_usuario.username} (Proceder)'
-        return self.autor_nome or 'Visitante'
+    def total_partes(self):
+        return max(1, -(-self.tamanho // self.tamanho_parte))
+
+    def tamanho_da_parte(self, numero):
+        """Tamanho esperado da parte ``numero`` (a última pode ser menor)."""
+        inicio = numero * self.tamanho_parte
+        return max(0, min(self.tamanho_parte, self.tamanho - inicio))
+
+    @property
+    def diretorio(self):
+        import os
+        return os.path.join(settings.UPLOAD_SESSAO_DIR, str(self.pk))
@@ -0,0 +1,77 @@
+"""
+Faststart dos vídeos em segundo plano.
+
+O envio só grava o arquivo; os vídeos MP4/MOV novos são enfileirados (após
+o commit) para uma thread do próprio processo, que move o índice (``moov``)
+para o início do arquivo com ``VideoService.otimizar_streaming``. Os que
+ficarem na fila quando o processo terminar continuam com
+``otimizado=False`` e são tratados pelo comando ``otimizar_videos``.
+"""
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_fila = queue.Queue()
+_trava = threading.Lock()
+_thread = None
+
+
+def agendar(*video_ids):
+    """Otimiza os vídeos ``video_ids`` depois do commit da transação atual."""
+    video_ids = [i for i in video_ids if i]
+    if video_ids:
+        transaction.on_commit(lambda: _enfileirar(video_ids))
+
+
+def _enfileirar(video_ids):
+    if not settings.OTIMIZACAO_ASSINCRONA:
+        for video_id in video_ids:
+            _otimizar(video_id)
+        return
+    _iniciar()
+    for video_id in video_ids:
+        _fila.put(video_id)
+
+
+def _iniciar():
+    global _thread
+    with _trava:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(
+                target=_trabalhar, name='otimizacao-videos', daemon=True,
+            )
+            _thread.start()
+
+
+def _otimizar(video_id):
+    from .models import Video
+    from .services import VideoService
+
+    try:
+        video = Video.objects.filter(pk=video_id, otimizado=False).first()
+        if video is not None:
+            VideoService.otimizar_streaming(video)
+    except Exception:
+        logger.exception('Falha ao otimizar o vídeo %s', video_id)
+
+
+def _trabalhar():
+    while True:
+        video_id = _fila.get()
+        try:
+            _otimizar(video_id)
+        finally:
+            # A thread passa a maior parte do tempo ociosa: não segura conexão
+            # (só as desta thread são fechadas; com pool, voltam para ele).
+            connections.close_all()
+            _fila.task_done()
+
+
+def aguardar():
+    """Bloqueia até a fila esvaziar (usado por comandos e testes)."""
+    _fila.join()
@@ -0,0 +1,69 @@
+"""
+Remoção de arquivos do storage em segundo plano.
+
+As exclusões de vídeo só apagam as linhas do banco dentro da requisição; os
+arquivos são enfileirados (após o commit) para uma thread do próprio
+processo. Se o processo terminar antes de esvaziar a fila, os arquivos que
+sobrarem são encontrados pelo comando ``coletar_orfaos``.
+"""
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+_fila = queue.Queue()
+_trava = threading.Lock()
+_thread = None
+
+
+def agendar(*nomes):
+    """Remove ``nomes`` do storage depois do commit da transação atual."""
+    nomes = [n for n in nomes if n]
+    if nomes:
+        transaction.on_commit(lambda: _enfileirar(nomes))
+
+
+def _enfileirar(nomes):
+    if not settings.REMOCAO_ASSINCRONA:
+        for nome in nomes:
+            _remover(nome)
+        return
+    _iniciar()
+    for nome in nomes:
+        _fila.put(nome)
+
+
+def _iniciar():
+    global _thread
+    with _trava:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(
+                target=_trabalhar, name='remocao-arquivos', daemon=True,
+            )
+            _thread.start()
+
+
+def _remover(nome):
+    try:
+        default_storage.delete(nome)
+    except Exception:
+        logger.exception('Falha ao remover "%s"', nome)
+
+
+def _trabalhar():
+    while True:
+        nome = _fila.get()
+        try:
+            _remover(nome)
+        finally:
+            _fila.task_done()
+
+
+def aguardar():
+    """Bloqueia até a fila esvaziar (usado por comandos e testes)."""
+    _fila.join()
@@ -2,12 +2,41 @@
 Serviços de negócio para o módulo de chamados.
 Mantém a lógica fora das views / models.
 """
+import hashlib
+import logging
+import mimetypes
 import os
+import shutil
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
 from django.conf import settings
-from django.db.models import Sum, Count
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.db import IntegrityError, connection, connections, transaction
+from django.db.models import Count, Exists, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Greatest, TruncDate
 from django.utils import timezone
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+from vision_hub.replicas import ler_da_replica
+
+from . import busca, faststart, metadados, otimizacao, remocao, versoes
+from .models import (
+    ArquivoVideo, Chamado, ChamadoArquivado, Comentario, ComentarioArquivado, MetricaDiaria,
+    SessaoUpload, UsoArmazenamento, Video, VideoArquivado,
+)
+
+FASTSTART_MIME_TYPES = ('video/mp4', 'video/quicktime')
 
-from .models import Chamado, Video
+logger = logging.getLogger(__name__)
+
+
+def _somar(campo, valor):
+    """``campo + valor`` calculado no banco, sem passar de zero para baixo."""
+    return Greatest(F(campo) + valor, 0)
 
 
 class ChamadoService:
@@ -26,98 +55,855 @@ class ChamadoService:
         chamado.save()
         return chamado
 
+    @staticmethod
+    def excluir_chamado(chamado: Chamado):
+        # Os vídeos saem em cascata; o sinal post_delete agenda os arquivos.
+        chamado.delete()
+
     @staticmethod
     def pesquisar(query: str, usuario=None):
         qs = Chamado.objects.all()
         if usuario:
             qs = qs.filter(criado_por=usuario)
         if query:
-            qs = qs.filter(
-                models_Q_titulo_descricao_cliente(query)
-            )
+            qs = busca.filtrar(qs, query)
         return qs
 
     @staticmethod
-    def buscar_chamados(usuario, query='', status='', prioridade=''):
-        qs = Chamado.objects.filter(criado_por=usuario)
-        if query:
-            from django.db.models import Q
-            qs = qs.filter(
-                Q(titulo__icontains=query)
-                | Q(descricao__icontains=query)
-                | Q(cliente__icontains=query)
-                | Q(slug__icontains=query)
-            )
+    def com_validadores(qs):
+        """
+        Anota o último vídeo/comentário e a quantidade de comentários, para
+        ``validadores`` sem consultas extras (subconsultas no mesmo SELECT).
+        Serve para ``Chamado`` e ``ChamadoArquivado``.
+        """
+        opcoes = qs.model._meta
+        videos = opcoes.get_field('videos').related_model.objects
+        comentarios = opcoes.get_field('comentarios').related_model.objects.filter(
+            chamado=OuterRef('pk'),
+        ).order_by()
+        return qs.annotate(
+            ultimo_video=Subquery(
+                videos.filter(chamado=OuterRef('pk'))
+                .order_by('-enviado_em').values('enviado_em')[:1]
+            ),
+            ultimo_comentario=Subquery(
+                comentarios.order_by('-criado_em').values('criado_em')[:1]
+            ),
+            qtd_comentarios=Subquery(
+                comentarios.values('chamado').annotate(total=Count('pk')).values('total')
+            ),
+        )
+
+    @staticmethod
+    def validadores(chamado, variante=''):
+        """
+        ``(etag, ultima_modificacao)`` da página compartilhada de um chamado
+        anotado por ``com_validadores``. As quantidades entram no ETag para
+        que exclusões (que não mudam as datas) também gerem um novo valor;
+        ``variante`` separa cópias da página que diferem por visitante.
+        """
+        datas = [
+            chamado.atualizado_em, chamado.cliente.atualizado_em,
+            chamado.ultimo_video, chamado.ultimo_comentario,
+        ]
+        ultima_modificacao = max(d for d in datas if d is not None)
+        partes = [chamado.pk, chamado.arquivado, chamado.qtd_videos, chamado.qtd_comentarios or 0]
+        partes += [d.timestamp() if d else '' for d in datas] + [variante]
+        resumo = hashlib.sha1(repr(partes).encode()).hexdigest()[:20]
+        return f'"{resumo}"', ultima_modificacao
+
+    @staticmethod
+    def versao_compartilhado(chamado_id):
+        """Versão do HTML em cache da página compartilhada do chamado."""
+        return versoes.atual(f'compartilhado:versao:{chamado_id}')
+
+    @staticmethod
+    def invalidar_compartilhado(chamado_id):
+        versoes.invalidar(f'compartilhado:versao:{chamado_id}')
+
+    @staticmethod
+    def buscar_chamados(usuario, query='', status='', prioridade='', arquivados=False):
+        modelo = ChamadoArquivado if arquivados else Chamado
+        qs = modelo.objects.filter(criado_por=usuario).select_related('cliente')
         if status:
             qs = qs.filter(status=status)
         if prioridade:
             qs = qs.filter(prioridade=prioridade)
+        if query and arquivados:
+            # O arquivo fica fora do índice de busca: só título, cliente e slug.
+            qs = qs.filter(
+                Q(titulo__icontains=query) | Q(cliente__nome__icontains=query) | Q(slug=query)
+            )
+        elif query:
+            # Ordena por relevância (ver chamados.busca).
+            qs = busca.filtrar(qs, query)
         return qs
 
+    @staticmethod
+    def _codificar_cursor(chamado: Chamado) -> str:
+        valor = f'{chamado.criado_em.isoformat()}|{chamado.pk}'
+        return urlsafe_base64_encode(valor.encode())
+
+    @staticmethod
+    def _decodificar_cursor(cursor: str):
+        try:
+            criado_em, pk = urlsafe_base64_decode(cursor).decode().split('|')
+            return datetime.fromisoformat(criado_em), int(pk)
+        except (ValueError, UnicodeDecodeError):
+            return None
+
+    @staticmethod
+    def paginar(qs, *, depois='', antes='', por_pagina=None):
+        """
+        Paginação por cursor em ``(-criado_em, -id)``: cada página é um
+        ``WHERE (criado_em, id) < cursor ... LIMIT n`` sobre o índice
+        ``chamado_usuario_recentes``, com o mesmo custo em qualquer posição.
+
+        ``depois`` avança a partir do último item da página anterior e
+        ``antes`` volta a partir do primeiro. Cursores inválidos levam à
+        primeira página. Retorna ``(chamados, cursor_anterior, cursor_proximo)``.
+        """
+        por_pagina = por_pagina or settings.CHAMADOS_POR_PAGINA
+        cursor = antes or depois
+        limite = ChamadoService._decodificar_cursor(cursor) if cursor else None
+        voltando = bool(limite and antes)
+
+        if limite:
+            criado_em, pk = limite
+            if voltando:
+                qs = qs.filter(Q(criado_em__gt=criado_em) | Q(criado_em=criado_em, pk__gt=pk))
+            else:
+                qs = qs.filter(Q(criado_em__lt=criado_em) | Q(criado_em=criado_em, pk__lt=pk))
+        ordem = ('criado_em', 'id') if voltando else ('-criado_em', '-id')
+        chamados = list(qs.order_by(*ordem)[:por_pagina + 1])
+
+        ha_mais = len(chamados) > por_pagina
+        chamados = chamados[:por_pagina]
+        if voltando:
+            chamados.reverse()
+            tem_anterior, tem_proximo = ha_mais, True
+        else:
+            tem_anterior, tem_proximo = bool(limite), ha_mais
+
+        codificar = ChamadoService._codificar_cursor
+        anterior = codificar(chamados[0]) if chamados and tem_anterior else ''
+        proximo = codificar(chamados[-1]) if chamados and tem_proximo else ''
+        return chamados, anterior, proximo
+
+    @staticmethod
+    def paginar_busca(qs, pagina='', por_pagina=None):
+        """
+        Paginação por posição para pesquisas, que vêm ordenadas por relevância
+        e não por data (o cursor de ``paginar`` não se aplica). Páginas
+        inválidas levam à primeira. Retorna ``(chamados, anterior, proxima)``,
+        com o número das páginas vizinhas ou ``None``.
+        """
+        por_pagina = por_pagina or settings.CHAMADOS_POR_PAGINA
+        try:
+            pagina = max(int(pagina), 1)
+        except (TypeError, ValueError):
+            pagina = 1
+        inicio = (pagina - 1) * por_pagina
+        chamados = list(qs[inicio:inicio + por_pagina + 1])
+        proxima = pagina + 1 if len(chamados) > por_pagina else None
+        anterior = pagina - 1 if pagina > 1 else None
+        return chamados[:por_pagina], anterior, proxima
+
+    @staticmethod
+    def estimar_total(qs, limite=None):
+        """
+        Conta no máximo ``limite`` chamados (``COUNT`` sobre uma subconsulta
+        com ``LIMIT``). Retorna ``(total, excedeu)``.
+        """
+        limite = limite or settings.CHAMADOS_LIMITE_CONTAGEM
+        total = qs.order_by()[:limite + 1].count()
+        return min(total, limite), total > limite
+
 
 class VideoService:
     """Operações de alto nível sobre Vídeos."""
 
+    @staticmethod
+    def erro_extensao(ext: str) -> str:
+        return (
+            f'Extensão "{ext}" não permitida. '
+            f'Use: {", ".join(settings.ALLOWED_VIDEO_EXTENSIONS)}'
+        )
+
+    @staticmethod
+    def erro_tamanho() -> str:
+        max_mb = settings.MAX_VIDEO_FILE_SIZE / (1024 * 1024)
+        return f'Arquivo excede o limite de {max_mb:.0f} MB.'
+
     @staticmethod
     def validar_arquivo(arquivo) -> list[str]:
         erros = []
         ext = os.path.splitext(arquivo.name)[1].lower()
         if ext not in settings.ALLOWED_VIDEO_EXTENSIONS:
-            erros.append(
-                f'Extensão "{ext}" não permitida. '
-                f'Use: {", ".join(settings.ALLOWED_VIDEO_EXTENSIONS)}'
-            )
+            erros.append(VideoService.erro_extensao(ext))
         if arquivo.size > settings.MAX_VIDEO_FILE_SIZE:
-            max_mb = settings.MAX_VIDEO_FILE_SIZE / (1024 * 1024)
-            erros.append(f'Arquivo excede o limite de {max_mb:.0f} MB.')
+            erros.append(VideoService.erro_tamanho())
         return erros
 
     @staticmethod
     def salvar_video(*, chamado: Chamado, arquivo, usuario, descricao='') -> Video:
-        video = Video(
+        resultado, = VideoService._ingerir(
+            chamado=chamado, arquivos=[arquivo], usuario=usuario, descricao=descricao,
+        )
+        if isinstance(resultado, Exception):
+            raise resultado
+        return resultado
+
+    @staticmethod
+    def salvar_videos(*, chamado: Chamado, arquivos, usuario, descricao='') -> list[dict]:
+        """
+        Envio em lote: valida todos os arquivos antes, grava-os em paralelo
+        e insere os registros com um único ``bulk_create``.
+
+        Retorna um resultado por arquivo: ``{'nome', 'video', 'erros'}``.
+        """
+        resultados = [
+            {'nome': a.name, 'video': None, 'erros': VideoService.validar_arquivo(a)}
+            for a in arquivos
+        ]
+        validos = [(r, a) for r, a in zip(resultados, arquivos) if not r['erros']]
+        if validos:
+            ingeridos = VideoService._ingerir(
+                chamado=chamado,
+                arquivos=[a for _, a in validos],
+                usuario=usuario,
+                descricao=descricao,
+            )
+            for (resultado, arquivo), ingerido in zip(validos, ingeridos):
+                if isinstance(ingerido, Exception):
+                    logger.error('Falha ao gravar "%s"', arquivo.name, exc_info=ingerido)
+                    resultado['erros'].append(f'Falha ao gravar "{arquivo.name}".')
+                else:
+                    resultado['video'] = ingerido
+        return resultados
+
+    @staticmethod
+    def _ingerir(*, chamado: Chamado, arquivos, usuario, descricao='') -> list:
+        """
+        Grava ``arquivos`` (já validados) e cria os ``Video``. Retorna, na
+        mesma ordem, o vídeo criado ou a exceção que impediu aquele arquivo.
+
+        As threads só fazem trabalho de arquivo (metadados, gravação no
+        storage); todo acesso ao banco fica na thread da requisição, em uma
+        única transação. O faststart fica para depois do commit
+        (``otimizacao``): reescrever o arquivo seguraria a resposta.
+        """
+        dedup = settings.VIDEO_DEDUPLICACAO
+        # Chave do conteúdo: o SHA-256 (deduplicado) ou o próprio índice.
+        chaves = [VideoService._sha256(a) if dedup else n for n, a in enumerate(arquivos)]
+        existentes = {}
+        if dedup:
+            existentes = {
+                b.sha256: b for b in ArquivoVideo.objects.filter(sha256__in=set(chaves))
+            }
+        # Um arquivo "dono" por conteúdo grava (ou reaproveita).
+        donos = {}
+        for n, chave in enumerate(chaves):
+            donos.setdefault(chave, n)
+
+        campo_blob = ArquivoVideo._meta.get_field('arquivo')
+        campo_video = Video._meta.get_field('arquivo')
+
+        def processar(n):
+            arquivo = arquivos[n]
+            meta = metadados.extrair(arquivo, arquivo.name)
+            if donos[chaves[n]] != n:
+                return meta, None
+            if chaves[n] in existentes:
+                nome, gravado = existentes[chaves[n]].arquivo.name, False
+            else:
+                if dedup:
+                    destino = campo_blob.generate_filename(ArquivoVideo(sha256=chaves[n]), arquivo.name)
+                else:
+                    destino = campo_video.generate_filename(Video(chamado=chamado), arquivo.name)
+                nome, gravado = default_storage.save(destino, arquivo), True
+            return meta, (nome, gravado)
+
+        trabalhadores = min(settings.VIDEO_INGESTAO_THREADS, len(arquivos))
+        saidas = []
+        if trabalhadores <= 1:
+            for n in range(len(arquivos)):
+                try:
+                    saidas.append(processar(n))
+                except Exception as exc:
+                    saidas.append(exc)
+        else:
+            with ThreadPoolExecutor(max_workers=trabalhadores) as pool:
+                futuros = [pool.submit(processar, n) for n in range(len(arquivos))]
+            for futuro in futuros:
+                exc = futuro.exception()
+                saidas.append(exc if exc else futuro.result())
+
+        gravados = [s[1][0] for s in saidas if not isinstance(s, Exception) and s[1] and s[1][1]]
+        armazenado = {}
+        for n, saida in enumerate(saidas):
+            if not isinstance(saida, Exception) and saida[1]:
+                armazenado[chaves[n]] = saida[1][0]
+
+        resultados = [None] * len(arquivos)
+        prontos = []
+        for n, saida in enumerate(saidas):
+            if isinstance(saida, Exception):
+                resultados[n] = saida
+            elif chaves[n] not in armazenado:
+                resultados[n] = saidas[donos[chaves[n]]]
+            else:
+                prontos.append(n)
+
+        try:
+            with transaction.atomic():
+                blobs = {}
+                if dedup and prontos:
+                    totais = Counter(chaves[n] for n in prontos)
+                    ArquivoVideo.objects.bulk_create(
+                        [
+                            ArquivoVideo(
+                                sha256=chave,
+                                arquivo=armazenado[chave],
+                                tamanho=arquivos[donos[chave]].size,
+                                referencias=total,
+                            )
+                            for chave, total in totais.items()
+                            if chave not in existentes
+                        ],
+                        ignore_conflicts=True,
+                    )
+                    blobs = {
+                        b.sha256: b for b in ArquivoVideo.objects.filter(sha256__in=set(totais))
+                    }
+                    for chave, total in totais.items():
+                        blob = blobs.get(chave)
+                        if blob and chave not in existentes and blob.arquivo.name == armazenado[chave]:
+                            continue  # inserido agora, já com as referências
+                        if blob is None or not ArquivoVideo.objects.filter(pk=blob.pk).update(
+                            referencias=F('referencias') + total,
+                        ):
+                            raise ArquivoVideo.DoesNotExist(chave)
+
+                videos = []
+                for n in prontos:
+                    meta = saidas[n][0]
+                    blob = blobs.get(chaves[n])
+                    videos.append(Video(
+                        chamado=chamado,
+                        arquivo=blob.arquivo.name if blob else armazenado[chaves[n]],
+                        blob=blob,
+                        nome_original=arquivos[n].name,
+                        tamanho=arquivos[n].size,
+                        descricao=descricao,
+                        enviado_por=usuario,
+                        **meta,
+                    ))
+                Video.objects.bulk_create(videos)
+                otimizacao.agendar(*(
+                    v.pk for v in videos if v.tipo_mime in FASTSTART_MIME_TYPES
+                ))
+                VideoService.contabilizar(
+                    chamado.pk, chamado.criado_por_id,
+                    len(videos), sum(v.tamanho for v in videos),
+                )
+        except Exception:
+            for nome in gravados:
+                default_storage.delete(nome)
+            raise
+
+        # Conteúdo gravado em paralelo com outro envio igual: fica o do outro.
+        for nome in gravados:
+            if dedup and not any(b.arquivo.name == nome for b in blobs.values()):
+                remocao.agendar(nome)
+
+        for n, video in zip(prontos, videos):
+            resultados[n] = video
+        return resultados
+
+    @staticmethod
+    def _sha256(arquivo) -> str:
+        digest = getattr(arquivo, 'sha256', None)
+        if digest:
+            return digest
+        h = hashlib.sha256()
+        for chunk in arquivo.chunks():
+            h.update(chunk)
+        arquivo.seek(0)
+        return h.hexdigest()
+
+    @staticmethod
+    def vincular_blob(*, chamado: Chamado, blob: ArquivoVideo, nome: str, usuario,
+                      descricao='') -> Video | None:
+        """Cria um ``Video`` para um conteúdo já armazenado, sem novo envio."""
+        modelo = blob.videos.first() or blob.videos_arquivados.first()
+        if modelo is None or not ArquivoVideo.objects.filter(pk=blob.pk).update(
+            referencias=F('referencias') + 1,
+        ):
+            return None
+        video = Video.objects.create(
             chamado=chamado,
-            arquivo=arquivo,
-            nome_original=arquivo.name,
-            tamanho=arquivo.size,
+            arquivo=blob.arquivo.name,
+            blob=blob,
+            nome_original=nome,
+            tamanho=blob.tamanho,
             descricao=descricao,
             enviado_por=usuario,
+            duracao=modelo.duracao,
+            largura=modelo.largura,
+            altura=modelo.altura,
+            codec=modelo.codec,
+            mime_type=modelo.mime_type,
+            otimizado=modelo.otimizado,
         )
-        video.save()
+        if not video.otimizado and video.tipo_mime in FASTSTART_MIME_TYPES:
+            otimizacao.agendar(video.pk)
+        VideoService.contabilizar(chamado.pk, chamado.criado_por_id, 1, video.tamanho)
         return video
 
+    @staticmethod
+    def contabilizar(chamado_id, usuario_id, quantidade: int, tamanho: int):
+        """
+        Ajusta os contadores de vídeos do chamado e do dono do chamado com
+        ``F()``, sem ler os valores atuais (seguro com envios simultâneos).
+
+        Os decrementos param em zero: um vídeo criado por fora do serviço
+        (shell, fixture, SQL) nunca foi somado, e subtraí-lo violaria o
+        ``CHECK`` dos campos positivos, abortando a exclusão do chamado.
+        """
+        if not quantidade:
+            return
+        Chamado.objects.filter(pk=chamado_id).update(
+            qtd_videos=_somar('qtd_videos', quantidade),
+            tamanho_videos=_somar('tamanho_videos', tamanho),
+        )
+        DashboardService.invalidar(usuario_id)
+        ChamadoService.invalidar_compartilhado(chamado_id)
+        if UsoArmazenamento.objects.filter(usuario_id=usuario_id).update(
+            total_videos=_somar('total_videos', quantidade),
+            espaco_usado=_somar('espaco_usado', tamanho),
+        ):
+            return
+        if quantidade < 0:
+            # Sem registro a decrementar (ex.: usuário sendo excluído em cascata).
+            return
+        try:
+            with transaction.atomic():
+                UsoArmazenamento.objects.create(
+                    usuario_id=usuario_id,
+                    total_videos=quantidade,
+                    espaco_usado=tamanho,
+                )
+        except IntegrityError:
+            # Criado por outra requisição entre o UPDATE e o INSERT.
+            UsoArmazenamento.objects.filter(usuario_id=usuario_id).update(
+                total_videos=_somar('total_videos', quantidade),
+                espaco_usado=_somar('espaco_usado', tamanho),
+            )
+
+    @staticmethod
+    def liberar_blob(blob_id):
+        """
+        Remove uma referência; apaga o conteúdo quando não sobra nenhuma.
+
+        A linha fica travada (``select_for_update``) até o fim da transação:
+        um ``vincular_blob``/``salvar_videos`` simultâneo espera no seu
+        ``UPDATE referencias + 1`` e, se o conteúdo foi apagado, não encontra
+        a linha e desiste, em vez de apontar um vídeo novo para um arquivo
+        removido. No SQLite a escrita já é serializada pelo próprio banco.
+        """
+        with transaction.atomic():
+            blob = ArquivoVideo.objects.select_for_update().filter(pk=blob_id).first()
+            if blob is None:
+                return
+            # O vídeo liberado já saiu da tabela: qualquer outro que aponte
+            # para o conteúdo (mesmo com o contador defasado) o mantém.
+            if blob.referencias > 1 or blob.videos.exists() or blob.videos_arquivados.exists():
+                ArquivoVideo.objects.filter(pk=blob_id).update(
+                    referencias=_somar('referencias', -1),
+                )
+                return
+            blob.delete()
+            remocao.agendar(blob.arquivo.name)
+
+    @staticmethod
+    def otimizar_streaming(video: Video) -> bool:
+        """
+        Aplica o faststart em MP4/MOV e registra o resultado em ``video.otimizado``.
+
+        Roda fora da requisição (``otimizacao`` e ``otimizar_videos``). O
+        arquivo próprio de um vídeo é reescrito no lugar; o de um conteúdo
+        deduplicado não (ver ``_otimizar_conteudo``).
+        """
+        if video.blob_id:
+            otimizado = VideoService._otimizar_conteudo(video.blob_id, video.tipo_mime)
+            try:
+                video.refresh_from_db(fields=['arquivo', 'blob', 'otimizado'])
+            except Video.DoesNotExist:
+                pass
+            return otimizado
+        otimizado = VideoService._otimizar_arquivo(video.arquivo.name, video.tipo_mime)
+        if otimizado != video.otimizado:
+            video.otimizado = otimizado
+            Video.objects.filter(pk=video.pk).update(otimizado=otimizado)
+        return otimizado
+
+    @staticmethod
+    def _otimizar_conteudo(blob_id, mime_type: str) -> bool:
+        """
+        Faststart de um ``ArquivoVideo`` sem alterar o arquivo dele: o SHA-256
+        tem de continuar sendo o dos bytes gravados, senão um reaproveitamento
+        anexaria um conteúdo diferente do que o cliente comprovou ter.
+
+        A versão reescrita vai para um arquivo novo, com hash próprio, e vira
+        outro conteúdo (ou soma-se ao que já tiver esse hash); os vídeos e as
+        referências passam para ele e o antigo é apagado.
+        """
+        blob = ArquivoVideo.objects.filter(pk=blob_id).first()
+        if blob is None or mime_type not in FASTSTART_MIME_TYPES:
+            return False
+        try:
+            caminho = default_storage.path(blob.arquivo.name)
+            estado = faststart.situacao(caminho)
+            if estado == 'pendente':
+                temporario = f'{caminho}.{uuid.uuid4().hex}.faststart'
+                if not faststart.otimizar(caminho, destino=temporario):
+                    return False
+        except (NotImplementedError, ValueError, OSError):
+            # Storage sem caminho local ou arquivo malformado: fica como está.
+            return False
+        if estado is None:
+            return False
+        if estado == 'otimizado':
+            for modelo in (Video, VideoArquivado):
+                modelo.objects.filter(blob_id=blob_id, otimizado=False).update(otimizado=True)
+            return True
+
+        nome = None
+        try:
+            sha256 = VideoService._sha256_caminho(temporario)
+            with transaction.atomic():
+                # Mesma trava de liberar_blob: ninguém soma nem tira
+                # referências do conteúdo antigo durante a troca.
+                antigo = ArquivoVideo.objects.select_for_update().filter(pk=blob_id).first()
+                if antigo is None:
+                    return False
+                novo = ArquivoVideo.objects.select_for_update().filter(sha256=sha256).first()
+                if novo is None:
+                    nome = default_storage.get_available_name(
+                        ArquivoVideo._meta.get_field('arquivo').generate_filename(
+                            ArquivoVideo(sha256=sha256), antigo.arquivo.name,
+                        )
+                    )
+                    caminho_novo = default_storage.path(nome)
+                    os.makedirs(os.path.dirname(caminho_novo), exist_ok=True)
+                    os.replace(temporario, caminho_novo)
+                    novo = ArquivoVideo.objects.create(
+                        sha256=sha256, arquivo=nome, tamanho=os.path.getsize(caminho_novo),
+                        referencias=antigo.referencias,
+                    )
+                else:
+                    ArquivoVideo.objects.filter(pk=novo.pk).update(
+                        referencias=F('referencias') + antigo.referencias,
+                    )
+                for modelo in (Video, VideoArquivado):
+                    modelo.objects.filter(blob=antigo).update(
+                        blob=novo, arquivo=novo.arquivo.name, otimizado=True,
+                    )
+                antigo.delete()
+                remocao.agendar(antigo.arquivo.name)
+        except BaseException:
+            if nome:
+                default_storage.delete(nome)
+            raise
+        finally:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+        return True
+
+    @staticmethod
+    def _sha256_caminho(caminho) -> str:
+        h = hashlib.sha256()
+        with open(caminho, 'rb') as f:
+            for bloco in iter(lambda: f.read(1024 * 1024), b''):
+                h.update(bloco)
+        return h.hexdigest()
+
+    @staticmethod
+    def _otimizar_arquivo(nome: str, mime_type: str) -> bool:
+        if mime_type not in FASTSTART_MIME_TYPES:
+            return False
+        try:
+            return faststart.otimizar(default_storage.path(nome))
+        except (NotImplementedError, ValueError, OSError):
+            # Storage sem caminho local ou arquivo malformado: fica como está.
+            return False
+
     @staticmethod
     def excluir_video(video: Video):
-        if video.arquivo:
-            video.arquivo.delete(save=False)
+        # O arquivo (ou a referência ao conteúdo deduplicado) é liberado pelo
+        # sinal post_delete, em segundo plano.
         video.delete()
 
 
+class UploadService:
+    """
+    Upload retomável: o cliente cria uma sessão, envia as partes numeradas
+    (em qualquer ordem, inclusive em paralelo), consulta quais já chegaram
+    e finaliza. Cada parte é gravada em um arquivo próprio, então envios
+    simultâneos não disputam o mesmo arquivo nem a mesma linha do banco.
+    """
+
+    LEITURA = 64 * 1024
+
+    @staticmethod
+    def _validade():
+        return timezone.now() + timedelta(seconds=settings.UPLOAD_SESSAO_VALIDADE)
+
+    @staticmethod
+    def criar_sessao(*, chamado: Chamado, usuario, nome: str, tamanho: int,
+                     descricao='') -> tuple[SessaoUpload | None, list[str]]:
+        UploadService.limpar_expiradas()
+
+        erros = []
+        nome = os.path.basename(nome or '')
+        ext = os.path.splitext(nome)[1].lower()
+        if ext not in settings.ALLOWED_VIDEO_EXTENSIONS:
+            erros.append(VideoService.erro_extensao(ext))
+        if tamanho <= 0:
+            erros.append('Informe o tamanho do arquivo.')
+        elif tamanho > settings.MAX_VIDEO_FILE_SIZE:
+            erros.append(VideoService.erro_tamanho())
+        if erros:
+            return None, erros
+
+        sessao = SessaoUpload.objects.create(
+            chamado=chamado,
+            usuario=usuario,
+            nome_original=nome,
+            tamanho=tamanho,
+            tamanho_parte=settings.UPLOAD_SESSAO_TAMANHO_PARTE,
+            descricao=descricao,
+            expira_em=UploadService._validade(),
+        )
+        os.makedirs(sessao.diretorio, exist_ok=True)
+        return sessao, []
+
+    @staticmethod
+    def reaproveitar(*, chamado: Chamado, usuario, nome: str, tamanho: int,
+                     sha256: str, descricao='') -> Video | None:
+        """
+        Se o conteúdo informado pelo cliente (SHA-256 + tamanho) já estiver
+        armazenado em um vídeo de chamado do próprio usuário, cria o ``Video``
+        na hora, sem envio de partes.
+
+        O hash é só uma alegação do cliente: sem a restrição ao que o usuário
+        já possui, qualquer um poderia anexar (e baixar) o vídeo de outro
+        conhecendo o SHA-256, ou sondar se um arquivo existe no sistema. Para
+        os demais, as partes são enviadas e a deduplicação acontece em
+        ``finalizar``, com o hash calculado no servidor.
+        """
+        if not settings.VIDEO_DEDUPLICACAO or not sha256:
+            return None
+        nome = os.path.basename(nome or '')
+        if os.path.splitext(nome)[1].lower() not in settings.ALLOWED_VIDEO_EXTENSIONS:
+            return None
+        blob = ArquivoVideo.objects.filter(
+            Q(videos__chamado__criado_por=usuario)
+            | Q(videos_arquivados__chamado__criado_por=usuario),
+            sha256=sha256.lower(), tamanho=tamanho,
+        ).first()
+        if blob is None:
+            return None
+        return VideoService.vincular_blob(
+            chamado=chamado, blob=blob, nome=nome, usuario=usuario, descricao=descricao,
+        )
+
+    @staticmethod
+    def salvar_parte(sessao: SessaoUpload, numero: int, stream) -> list[str]:
+        """Grava a parte ``numero`` lendo ``stream`` em blocos pequenos."""
+        if numero < 0 or numero >= sessao.total_partes:
+            return [f'Parte {numero} fora do intervalo (0–{sessao.total_partes - 1}).']
+
+        esperado = sessao.tamanho_da_parte(numero)
+        os.makedirs(sessao.diretorio, exist_ok=True)
+        destino = os.path.join(sessao.diretorio, f'{numero}.part')
+        temporario = f'{destino}.{uuid.uuid4().hex}'
+        recebido = 0
+        try:
+            with open(temporario, 'wb') as f:
+                while recebido <= esperado:
+                    bloco = stream.read(min(UploadService.LEITURA, esperado + 1 - recebido))
+                    if not bloco:
+                        break
+                    recebido += len(bloco)
+                    f.write(bloco)
+            if recebido != esperado:
+                os.remove(temporario)
+                return [f'Parte {numero} deve ter {esperado} bytes.']
+            # Reenvio da mesma parte apenas substitui a anterior.
+            os.replace(temporario, destino)
+        except OSError:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+
+        SessaoUpload.objects.filter(pk=sessao.pk).update(
+            expira_em=UploadService._validade(),
+        )
+        return []
+
+    @staticmethod
+    def partes_recebidas(sessao: SessaoUpload) -> list[int]:
+        try:
+            entradas = os.scandir(sessao.diretorio)
+        except FileNotFoundError:
+            return []
+        with entradas:
+            return sorted(
+                int(e.name[:-len('.part')])
+                for e in entradas
+                if e.name.endswith('.part') and e.name[:-len('.part')].isdigit()
+            )
+
+    @staticmethod
+    def finalizar(sessao: SessaoUpload) -> tuple[Video | None, list[str]]:
+        recebidas = set(UploadService.partes_recebidas(sessao))
+        faltando = [n for n in range(sessao.total_partes) if n not in recebidas]
+        if faltando:
+            return None, [f'Partes pendentes: {", ".join(map(str, faltando))}.']
+
+        # Garante que só uma requisição monte o arquivo.
+        if not SessaoUpload.objects.filter(pk=sessao.pk, finalizando=False).update(finalizando=True):
+            return None, ['Upload já está sendo finalizado.']
+
+        content_type = mimetypes.guess_type(sessao.nome_original)[0] or 'application/octet-stream'
+        arquivo = TemporaryUploadedFile(sessao.nome_original, content_type, sessao.tamanho, None)
+        try:
+            h = hashlib.sha256()
+            for numero in range(sessao.total_partes):
+                caminho = os.path.join(sessao.diretorio, f'{numero}.part')
+                with open(caminho, 'rb') as parte:
+                    while bloco := parte.read(UploadService.LEITURA):
+                        h.update(bloco)
+                        arquivo.write(bloco)
+            arquivo.seek(0)
+            arquivo.sha256 = h.hexdigest()
+            # O storage move o arquivo temporário para video_upload_path.
+            video = VideoService.salvar_video(
+                chamado=sessao.chamado,
+                arquivo=arquivo,
+                usuario=sessao.usuario,
+                descricao=sessao.descricao,
+            )
+        except Exception:
+            SessaoUpload.objects.filter(pk=sessao.pk).update(finalizando=False)
+            raise
+        finally:
+            arquivo.close()
+
+        UploadService.descartar(sessao)
+        return video, []
+
+    @staticmethod
+    def descartar(sessao: SessaoUpload):
+        shutil.rmtree(sessao.diretorio, ignore_errors=True)
+        sessao.delete()
+
+    @staticmethod
+    def limpar_expiradas() -> int:
+        expiradas = SessaoUpload.objects.filter(expira_em__lt=timezone.now())
+        total = 0
+        for sessao in expiradas:
+            UploadService.descartar(sessao)
+            total += 1
+        return total
+
+
 class DashboardService:
-    """Métricas para o dashboard."""
+    """
+    Métricas para o dashboard.
+
+    ``obter_metricas`` guarda o resultado de ``get_metricas`` no cache, numa
+    chave com a versão atual do usuário. ``invalidar`` só incrementa essa
+    versão (sinais de Chamado/Cliente e ``VideoService.contabilizar``); as
+    entradas antigas deixam de ser lidas e expiram sozinhas.
+    """
+
+    CHAVE_VERSAO = 'dashboard:versao:{}'
+    CHAVE_METRICAS = 'dashboard:metricas:{}:{}'
+    CHAVE_ACERTOS = 'dashboard:acertos'
+    CHAVE_FALHAS = 'dashboard:falhas'
+
+    @staticmethod
+    def invalidar(usuario_id):
+        """Descarta as métricas em cache do usuário quando a transação atual confirmar."""
+        versoes.invalidar(DashboardService.CHAVE_VERSAO.format(usuario_id))
+
+    @staticmethod
+    def _contar(chave):
+        try:
+            cache.incr(chave)
+        except ValueError:
+            if not cache.add(chave, 1, None):
+                cache.incr(chave)
 
     @staticmethod
+    def obter_metricas(usuario):
+        chave = DashboardService.CHAVE_METRICAS.format(
+            usuario.pk, versoes.atual(DashboardService.CHAVE_VERSAO.format(usuario.pk)),
+        )
+        metricas = cache.get(chave)
+        if metricas is not None:
+            DashboardService._contar(DashboardService.CHAVE_ACERTOS)
+            return metricas
+        DashboardService._contar(DashboardService.CHAVE_FALHAS)
+        metricas = DashboardService.get_metricas(usuario)
+        metricas['ultimos_chamados'] = list(metricas['ultimos_chamados'])
+        cache.set(chave, metricas, settings.DASHBOARD_CACHE_TIMEOUT)
+        return metricas
+
+    @staticmethod
+    def estatisticas_cache():
+        acertos = cache.get(DashboardService.CHAVE_ACERTOS, 0)
+        falhas = cache.get(DashboardService.CHAVE_FALHAS, 0)
+        total = acertos + falhas
+        return {
+            'acertos': acertos,
+            'falhas': falhas,
+            'taxa_acerto': round(acertos / total, 4) if total else None,
+        }
+
+    @staticmethod
+    @ler_da_replica()
     def get_metricas(usuario):
         chamados = Chamado.objects.filter(criado_por=usuario)
-        videos = Video.objects.filter(chamado__criado_por=usuario)
 
-        total_chamados = chamados.count()
-        chamados_abertos = chamados.filter(status='aberto').count()
-        chamados_andamento = chamados.filter(status='em_andamento').count()
-        chamados_resolvidos = chamados.filter(status='resolvido').count()
-        chamados_fechados = chamados.filter(status='fechado').count()
+        # Todas as contagens em um único SELECT com agregações condicionais.
+        contagens = {'total_chamados': Count('id')}
+        for status in Chamado.Status.values:
+            contagens[f'status_{status}'] = Count('id', filter=Q(status=status))
+        for prioridade in Chamado.Prioridade.values:
+            contagens[f'prioridade_{prioridade}'] = Count('id', filter=Q(prioridade=prioridade))
+        totais = chamados.aggregate(**contagens)
+
+        total_chamados = totais['total_chamados']
+        chamados_abertos = totais['status_aberto']
+        chamados_andamento = totais['status_em_andamento']
+        chamados_resolvidos = totais['status_resolvido']
+        chamados_fechados = totais['status_fechado']
 
-        total_videos = videos.count()
-        espaco_usado = videos.aggregate(total=Sum('tamanho'))['total'] or 0
+        uso = UsoArmazenamento.objects.filter(usuario=usuario).first()
+        total_videos = uso.total_videos if uso else 0
+        espaco_usado = uso.espaco_usado if uso else 0
 
         # Últimos chamados
-        ultimos_chamados = chamados[:5]
+        ultimos_chamados = list(chamados.select_related('cliente')[:5])
 
         # Chamados por prioridade
         por_prioridade = {
-            'baixa': chamados.filter(prioridade='baixa').count(),
-            'media': chamados.filter(prioridade='media').count(),
-            'alta': chamados.filter(prioridade='alta').count(),
-            'critica': chamados.filter(prioridade='critica').count(),
+            prioridade: totais[f'prioridade_{prioridade}']
+            for prioridade in Chamado.Prioridade.values
         }
 
         return {
@@ -133,6 +919,106 @@ class DashboardService:
             'por_prioridade': por_prioridade,
         }
 
+    # ─────────── Séries históricas (MetricaDiaria) ───────────
+    @staticmethod
+    def _limites(inicio, fim):
+        """Intervalo ``[inicio 00:00, fim+1 00:00)`` no fuso local."""
+        return (
+            timezone.make_aware(datetime.combine(inicio, datetime.min.time())),
+            timezone.make_aware(datetime.combine(fim + timedelta(days=1), datetime.min.time())),
+        )
+
+    @staticmethod
+    def consolidar(inicio, fim) -> int:
+        """
+        Recalcula as ``MetricaDiaria`` de todos os usuários entre ``inicio`` e
+        ``fim`` (datas locais, inclusive) com consultas agrupadas por usuário
+        e dia (tabelas quentes e arquivo), e substitui as linhas existentes
+        no período.
+        Retorna a quantidade de linhas gravadas.
+        """
+        de, ate = DashboardService._limites(inicio, fim)
+        linhas = {}
+
+        def linha(usuario_id, dia):
+            chave = (usuario_id, dia)
+            if chave not in linhas:
+                linhas[chave] = MetricaDiaria(usuario_id=usuario_id, dia=dia)
+            return linhas[chave]
+
+        contagens = {'chamados_criados': Count('id')}
+        for status in Chamado.Status.values:
+            contagens[f'status_{status}'] = Count('id', filter=Q(status=status))
+        for prioridade in Chamado.Prioridade.values:
+            contagens[f'prioridade_{prioridade}'] = Count('id', filter=Q(prioridade=prioridade))
+        for modelo in (Chamado, ChamadoArquivado):
+            criados = (
+                modelo.objects.filter(criado_em__gte=de, criado_em__lt=ate)
+                .annotate(dia=TruncDate('criado_em')).order_by()
+                .values('criado_por_id', 'dia').annotate(**contagens)
+            )
+            for valores in criados:
+                metrica = linha(valores.pop('criado_por_id'), valores.pop('dia'))
+                for campo, valor in valores.items():
+                    setattr(metrica, campo, getattr(metrica, campo) + valor)
+
+            # Pelo dia da resolução: editar ou restaurar depois não conta de novo.
+            resolvidos = (
+                modelo.objects.filter(resolvido_em__gte=de, resolvido_em__lt=ate)
+                .annotate(dia=TruncDate('resolvido_em')).order_by()
+                .values('criado_por_id', 'dia').annotate(total=Count('id'))
+            )
+            for valores in resolvidos:
+                linha(valores['criado_por_id'], valores['dia']).chamados_resolvidos += valores['total']
+
+        for modelo in (Video, VideoArquivado):
+            enviados = (
+                modelo.objects.filter(enviado_em__gte=de, enviado_em__lt=ate)
+                .annotate(dia=TruncDate('enviado_em')).order_by()
+                .values('chamado__criado_por_id', 'dia')
+                .annotate(total=Count('id'), bytes=Sum('tamanho'))
+            )
+            for valores in enviados:
+                metrica = linha(valores['chamado__criado_por_id'], valores['dia'])
+                metrica.videos_enviados += valores['total']
+                metrica.bytes_enviados += valores['bytes'] or 0
+
+        with transaction.atomic():
+            MetricaDiaria.objects.filter(dia__gte=inicio, dia__lte=fim).delete()
+            MetricaDiaria.objects.bulk_create(linhas.values(), batch_size=1000)
+        return len(linhas)
+
+    @staticmethod
+    @ler_da_replica()
+    def serie_diaria(usuario, dias=30) -> list[dict]:
+        """
+        Série dos últimos ``dias`` dias (inclusive hoje) lida de
+        ``MetricaDiaria``; dias sem atividade aparecem zerados.
+        ``bytes_acumulados`` soma tudo o que foi enviado até o dia.
+        """
+        hoje = timezone.localdate()
+        inicio = hoje - timedelta(days=dias - 1)
+        metricas = MetricaDiaria.objects.filter(usuario=usuario)
+        por_dia = {m.dia: m for m in metricas.filter(dia__gte=inicio)}
+        acumulado = metricas.filter(dia__lt=inicio).aggregate(
+            total=Sum('bytes_enviados'),
+        )['total'] or 0
+
+        serie = []
+        for n in range(dias):
+            dia = inicio + timedelta(days=n)
+            metrica = por_dia.get(dia) or MetricaDiaria(dia=dia)
+            acumulado += metrica.bytes_enviados
+            serie.append({
+                'dia': dia.isoformat(),
+                'chamados_criados': metrica.chamados_criados,
+                'chamados_resolvidos': metrica.chamados_resolvidos,
+                'videos_enviados': metrica.videos_enviados,
+                'bytes_enviados': metrica.bytes_enviados,
+                'bytes_acumulados': acumulado,
+            })
+        return serie
+
     @staticmethod
     def _formatar_tamanho(size_bytes):
         if size_bytes == 0:
@@ -142,3 +1028,106 @@ class DashboardService:
                 return f'{size_bytes:.1f} {unit}'
             size_bytes /= 1024
         return f'{size_bytes:.1f} TB'
+
+
+class ArquivamentoService:
+    """
+    Move chamados fechados antigos, com seus vídeos e comentários, para as
+    tabelas ``*Arquivado`` (e de volta), para que listas, buscas e o
+    dashboard só percorram os chamados em uso.
+
+    Cada lote é uma transação: ``INSERT ... SELECT`` nas tabelas de destino
+    e ``DELETE`` nas de origem, sem passar por objetos nem sinais. Os
+    arquivos de vídeo não mudam de lugar e as referências de
+    ``ArquivoVideo`` e o ``UsoArmazenamento`` continuam valendo.
+    """
+
+    # (origem, destino, coluna com o id do chamado); pais antes dos filhos.
+    PARA_ARQUIVO = (
+        (Chamado, ChamadoArquivado, 'id'),
+        (Video, VideoArquivado, 'chamado_id'),
+        (Comentario, ComentarioArquivado, 'chamado_id'),
+    )
+    DO_ARQUIVO = tuple((destino, origem, coluna) for origem, destino, coluna in PARA_ARQUIVO)
+
+    @staticmethod
+    def candidatos(corte):
+        """Chamados fechados sem alteração, vídeo ou comentário desde ``corte``."""
+        return Chamado.objects.filter(
+            ~Exists(Comentario.objects.filter(chamado=OuterRef('pk'), criado_em__gte=corte)),
+            ~Exists(Video.objects.filter(chamado=OuterRef('pk'), enviado_em__gte=corte)),
+            # Envio retomável em andamento (ou ainda não limpo pelo limpar_uploads).
+            ~Exists(SessaoUpload.objects.filter(chamado=OuterRef('pk'))),
+            status=Chamado.Status.FECHADO,
+            atualizado_em__lt=corte,
+        )
+
+    @staticmethod
+    def arquivar_lote(corte, tamanho: int) -> list[int]:
+        """Arquiva até ``tamanho`` candidatos; retorna os ids (vazio ao terminar)."""
+        with transaction.atomic():
+            linhas = list(
+                ArquivamentoService.candidatos(corte).select_for_update()
+                .order_by('pk').values_list('pk', 'criado_por_id')[:tamanho]
+            )
+            ids = [pk for pk, _ in linhas]
+            if ids:
+                ArquivamentoService._mover(ArquivamentoService.PARA_ARQUIVO, ids)
+                busca.remover(ids)
+                ArquivamentoService._invalidar(linhas)
+        return ids
+
+    @staticmethod
+    def restaurar(chamado_ids) -> int:
+        """
+        Devolve chamados arquivados às tabelas quentes. ``atualizado_em``
+        passa a ser agora, para o chamado não voltar ao arquivo na próxima
+        execução do ``arquivar_chamados``.
+        """
+        with transaction.atomic():
+            linhas = list(
+                ChamadoArquivado.objects.select_for_update()
+                .filter(pk__in=list(chamado_ids)).values_list('pk', 'criado_por_id')
+            )
+            ids = [pk for pk, _ in linhas]
+            if ids:
+                ArquivamentoService._mover(ArquivamentoService.DO_ARQUIVO, ids)
+                Chamado.objects.filter(pk__in=ids).update(atualizado_em=timezone.now())
+                busca.indexar(ids)
+                ArquivamentoService._invalidar(linhas)
+        return len(ids)
+
+    @staticmethod
+    def _mover(tabelas, ids):
+        marcadores = ', '.join(['%s'] * len(ids))
+        qn = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            for origem, destino, coluna in tabelas:
+                existentes = {campo.column for campo in origem._meta.concrete_fields}
+                colunas, selecao, valores = [], [], []
+                for campo in destino._meta.concrete_fields:
+                    colunas.append(qn(campo.column))
+                    if campo.column in existentes:
+                        selecao.append(qn(campo.column))
+                    else:
+                        # Só do destino (arquivado_em): o default do campo.
+                        selecao.append('%s')
+                        valores.append(campo.get_db_prep_save(campo.get_default(), connection))
+                cursor.execute(
+                    f'INSERT INTO {qn(destino._meta.db_table)} ({", ".join(colunas)}) '
+                    f'SELECT {", ".join(selecao)} FROM {qn(origem._meta.db_table)} '
+                    f'WHERE {qn(coluna)} IN ({marcadores})',
+                    [*valores, *ids],
+                )
+            for origem, _, coluna in reversed(tabelas):
+                cursor.execute(
+                    f'DELETE FROM {qn(origem._meta.db_table)} WHERE {qn(coluna)} IN ({marcadores})',
+                    ids,
+                )
+
+    @staticmethod
+    def _invalidar(linhas):
+        for chamado_id, _ in linhas:
+            ChamadoService.invalidar_compartilhado(chamado_id)
+        for usuario_id in {usuario_id for _, usuario_id in linhas}:
+            DashboardService.invalidar(usuario_id)
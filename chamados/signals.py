@@ -0,0 +1,79 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from clientes.models import Cliente
+
+from . import busca, remocao
+from .models import Chamado, Comentario, Video, VideoArquivado
+from .services import ChamadoService, DashboardService, VideoService
+
+
+@receiver(post_delete, sender=Video)
+@receiver(post_delete, sender=VideoArquivado)
+def liberar_arquivo_do_video(sender, instance, **kwargs):
+    # Cobre também as exclusões em cascata (chamado, usuário).
+    chamados = sender._meta.get_field('chamado').related_model.objects
+    chamado = chamados.filter(pk=instance.chamado_id).values('criado_por_id').first()
+    if chamado:
+        VideoService.contabilizar(
+            instance.chamado_id, chamado['criado_por_id'], -1, -instance.tamanho,
+        )
+    if instance.blob_id:
+        VideoService.liberar_blob(instance.blob_id)
+    elif instance.arquivo:
+        remocao.agendar(instance.arquivo.name)
+
+
+# ─────────────────── Índice de busca ───────────────────
+@receiver(post_save, sender=Chamado)
+def indexar_chamado(sender, instance, **kwargs):
+    busca.indexar([instance.pk])
+
+
+@receiver(post_delete, sender=Chamado)
+def desindexar_chamado(sender, instance, **kwargs):
+    busca.remover([instance.pk])
+
+
+@receiver(post_save, sender=Comentario)
+@receiver(post_delete, sender=Comentario)
+def indexar_comentario(sender, instance, **kwargs):
+    busca.indexar([instance.chamado_id])
+
+
+@receiver(post_save, sender=Cliente)
+def indexar_chamados_do_cliente(sender, instance, created, **kwargs):
+    if not created:
+        busca.indexar(instance.chamados.values_list('pk', flat=True))
+
+
+# ─────────────────── Caches (dashboard e página compartilhada) ───────────────────
+# Vídeos criados/excluídos invalidam pelo VideoService.contabilizar
+# (inclusive bulk_create, que não dispara sinais).
+@receiver(post_save, sender=Chamado)
+@receiver(post_delete, sender=Chamado)
+def invalidar_caches_chamado(sender, instance, **kwargs):
+    DashboardService.invalidar(instance.criado_por_id)
+    ChamadoService.invalidar_compartilhado(instance.pk)
+
+
+@receiver(post_save, sender=Video)
+def invalidar_compartilhado_video(sender, instance, **kwargs):
+    ChamadoService.invalidar_compartilhado(instance.chamado_id)
+
+
+@receiver(post_save, sender=Comentario)
+@receiver(post_delete, sender=Comentario)
+def invalidar_compartilhado_comentario(sender, instance, **kwargs):
+    ChamadoService.invalidar_compartilhado(instance.chamado_id)
+
+
+@receiver(post_save, sender=Cliente)
+def invalidar_caches_cliente(sender, instance, created, **kwargs):
+    if created:
+        return
+    for chamado_id, usuario_id in instance.chamados.values_list('pk', 'criado_por_id'):
+        DashboardService.invalidar(usuario_id)
+        ChamadoService.invalidar_compartilhado(chamado_id)
+    for chamado_id in instance.chamados_arquivados.values_list('pk', flat=True):
+        ChamadoService.invalidar_compartilhado(chamado_id)
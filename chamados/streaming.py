@@ -0,0 +1,263 @@
+"""
+Entrega de arquivos de vídeo com suporte a HTTP Range (206 Partial Content).
+
+Os players ``<video>`` pedem trechos do arquivo ao buscar uma posição; sem
+Range o navegador precisa baixar tudo até o ponto desejado.
+
+Também monta o ZIP com todos os vídeos de um chamado, gerado durante o
+envio (sem arquivo temporário e com memória constante).
+"""
+import mimetypes
+import os
+import zipfile
+
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.crypto import get_random_string
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+BLOCO = 64 * 1024
+MAX_INTERVALOS = 16
+
+
+class _TrechoArquivo:
+    """
+    Expõe apenas ``tamanho`` bytes de um arquivo já posicionado no início do
+    trecho. Mantém ``fileno()`` para que o servidor WSGI possa usar
+    ``wsgi.file_wrapper`` / ``os.sendfile`` (limitado pelo Content-Length).
+    """
+
+    def __init__(self, arquivo, tamanho):
+        self._arquivo = arquivo
+        self._restante = tamanho
+
+    def read(self, n=-1):
+        if self._restante <= 0:
+            return b''
+        if n is None or n < 0 or n > self._restante:
+            n = self._restante
+        dados = self._arquivo.read(n)
+        self._restante -= len(dados)
+        return dados
+
+    def fileno(self):
+        return self._arquivo.fileno()
+
+    def close(self):
+        self._arquivo.close()
+
+
+def _etag(stat):
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def _parse_range(cabecalho, tamanho):
+    """
+    Interpreta ``Range: bytes=...``. Retorna a lista de intervalos
+    ``(inicio, fim)`` inclusivos, ``None`` se o cabeçalho deve ser ignorado
+    ou ``[]`` se nenhum intervalo é satisfatível.
+    """
+    unidade, _, especificacao = cabecalho.partition('=')
+    if unidade.strip().lower() != 'bytes' or not especificacao:
+        return None
+    intervalos = []
+    for parte in especificacao.split(','):
+        inicio, sep, fim = parte.strip().partition('-')
+        if not sep:
+            return None
+        try:
+            if inicio == '':
+                # Sufixo: últimos N bytes.
+                n = int(fim)
+                if n <= 0:
+                    continue
+                intervalos.append((max(0, tamanho - n), tamanho - 1))
+                continue
+            inicio = int(inicio)
+            fim = int(fim) if fim else None
+        except ValueError:
+            return None
+        if fim is not None and inicio > fim:
+            return None
+        if inicio >= tamanho:
+            continue
+        fim = tamanho - 1 if fim is None else min(fim, tamanho - 1)
+        intervalos.append((inicio, fim))
+    if len(intervalos) > MAX_INTERVALOS:
+        # Muitos intervalos pequenos: mais barato mandar o arquivo inteiro.
+        return None
+    return intervalos
+
+
+def _if_range_valido(request, etag, mtime):
+    valor = request.headers.get('If-Range')
+    if not valor:
+        return True
+    if valor.startswith('"') or valor.startswith('W/'):
+        return valor == etag
+    data = parse_http_date_safe(valor)
+    return data is not None and int(mtime) <= data
+
+
+def _multipart(caminho, intervalos, content_type, tamanho, fronteira):
+    with open(caminho, 'rb') as arquivo:
+        for inicio, fim in intervalos:
+            yield (
+                f'\r\n--{fronteira}\r\n'
+                f'Content-Type: {content_type}\r\n'
+                f'Content-Range: bytes {inicio}-{fim}/{tamanho}\r\n\r\n'
+            ).encode()
+            arquivo.seek(inicio)
+            restante = fim - inicio + 1
+            while restante > 0:
+                dados = arquivo.read(min(BLOCO, restante))
+                if not dados:
+                    break
+                restante -= len(dados)
+                yield dados
+        yield f'\r\n--{fronteira}--\r\n'.encode()
+
+
+def resposta_video(request, caminho, nome, content_type=None, cache_control=None):
+    """
+    Monta a resposta para ``GET``/``HEAD`` de um arquivo de vídeo, tratando
+    ``Range`` (um ou vários intervalos), ``If-Range`` e as requisições
+    condicionais (``If-None-Match``/``If-Modified-Since`` → 304).
+    ``cache_control`` é um dict repassado a ``patch_cache_control``.
+    """
+    stat = os.stat(caminho)
+    tamanho = stat.st_size
+    etag = _etag(stat)
+    content_type = content_type or mimetypes.guess_type(nome)[0] or 'application/octet-stream'
+
+    condicional = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime),
+    )
+    if condicional is not None:
+        condicional['Accept-Ranges'] = 'bytes'
+        condicional['Last-Modified'] = http_date(stat.st_mtime)
+        if cache_control:
+            patch_cache_control(condicional, **cache_control)
+        return condicional
+
+    intervalos = None
+    cabecalho = request.headers.get('Range')
+    if cabecalho and _if_range_valido(request, etag, stat.st_mtime):
+        intervalos = _parse_range(cabecalho, tamanho)
+
+    if intervalos == []:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{tamanho}'
+    elif request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type)
+        if intervalos and len(intervalos) == 1:
+            inicio, fim = intervalos[0]
+            response.status_code = 206
+            response['Content-Range'] = f'bytes {inicio}-{fim}/{tamanho}'
+            response['Content-Length'] = fim - inicio + 1
+        else:
+            response['Content-Length'] = tamanho
+    elif not intervalos:
+        response = FileResponse(open(caminho, 'rb'), content_type=content_type)
+        response.block_size = BLOCO
+    elif len(intervalos) == 1:
+        inicio, fim = intervalos[0]
+        arquivo = open(caminho, 'rb')
+        arquivo.seek(inicio)
+        response = FileResponse(
+            _TrechoArquivo(arquivo, fim - inicio + 1),
+            content_type=content_type,
+            status=206,
+        )
+        response.block_size = BLOCO
+        response['Content-Range'] = f'bytes {inicio}-{fim}/{tamanho}'
+        response['Content-Length'] = fim - inicio + 1
+    else:
+        fronteira = get_random_string(32)
+        response = StreamingHttpResponse(
+            _multipart(caminho, intervalos, content_type, tamanho, fronteira),
+            status=206,
+            content_type=f'multipart/byteranges; boundary={fronteira}',
+        )
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    if response.status_code != 416:
+        response['Content-Disposition'] = content_disposition_header(False, nome)
+    if cache_control:
+        patch_cache_control(response, **cache_control)
+    return response
+
+
+class _SaidaZip:
+    """
+    Destino não posicionável para o ``ZipFile``: acumula o que foi escrito
+    até ser consumido pelo gerador da resposta. Sem ``seek``/``tell`` o
+    ``zipfile`` grava tamanhos e CRC em *data descriptors* após cada entrada.
+    """
+
+    def __init__(self):
+        self._partes = []
+
+    def write(self, dados):
+        self._partes.append(bytes(dados))
+        return len(dados)
+
+    def flush(self):
+        pass
+
+    def consumir(self):
+        dados = b''.join(self._partes)
+        self._partes.clear()
+        return dados
+
+
+def _nome_unico(nome, usados):
+    base, ext = os.path.splitext(nome)
+    candidato, n = nome, 1
+    while candidato.lower() in usados:
+        n += 1
+        candidato = f'{base} ({n}){ext}'
+    usados.add(candidato.lower())
+    return candidato
+
+
+def _zip(entradas):
+    saida = _SaidaZip()
+    usados = set()
+    with zipfile.ZipFile(saida, 'w', zipfile.ZIP_STORED, allowZip64=True) as zf:
+        for nome, abrir, tamanho, data_hora in entradas:
+            info = zipfile.ZipInfo(
+                _nome_unico(os.path.basename(nome) or 'video', usados),
+                date_time=max(data_hora.timetuple()[:6], (1980, 1, 1, 0, 0, 0)),
+            )
+            info.compress_type = zipfile.ZIP_STORED
+            # Define se a entrada usa ZIP64 (arquivos acima de ~4 GB).
+            info.file_size = tamanho
+            with abrir() as origem, zf.open(info, 'w') as destino:
+                yield saida.consumir()
+                while True:
+                    dados = origem.read(BLOCO)
+                    if not dados:
+                        break
+                    destino.write(dados)
+                    yield saida.consumir()
+            yield saida.consumir()
+    yield saida.consumir()
+
+
+def resposta_zip(entradas, nome):
+    """
+    Resposta com um ZIP (entradas ``STORED``, ZIP64) montado durante o envio.
+
+    ``entradas`` é um iterável de ``(nome, abrir, tamanho, data_hora)``, em
+    que ``abrir()`` devolve o arquivo aberto em modo binário. Vídeos já são
+    comprimidos: sem deflate o custo é só o CRC-32 de cada bloco.
+    """
+    response = StreamingHttpResponse(
+        (dados for dados in _zip(entradas) if dados),
+        content_type='application/zip',
+    )
+    response['Content-Disposition'] = content_disposition_header(True, nome)
+    return response
@@ -0,0 +1,514 @@
+import hashlib
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from datetime import date, datetime, time as hora
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from clientes.models import Cliente
+
+from . import faststart, remocao
+from .management.commands.medir_metadados import criar_mp4
+from .models import ArquivoVideo, Chamado, Comentario, MetricaDiaria, UsoArmazenamento, Video
+from .services import ArquivamentoService, ChamadoService, DashboardService, VideoService
+
+TAMANHOS = (1, 10, 1000)
+
+
+def criar_chamados(usuario, cliente, quantidade, **campos):
+    """Cria ``quantidade`` chamados de uma vez (sem ``save()``, que gera o slug)."""
+    return Chamado.objects.bulk_create(
+        Chamado(
+            titulo=f'Chamado {i}', cliente=cliente, criado_por=usuario,
+            slug=uuid.uuid4().hex[:12], **campos,
+        )
+        for i in range(quantidade)
+    )
+
+
+def popular_chamado(chamado, usuario, quantidade):
+    """``quantidade`` vídeos e ``quantidade`` comentários (metade de usuário)."""
+    Video.objects.bulk_create(
+        Video(
+            chamado=chamado, arquivo=f'videos/{i}.mp4', nome_original=f'{i}.mp4',
+            tamanho=1024, mime_type='video/mp4', enviado_por=usuario,
+        )
+        for i in range(quantidade)
+    )
+    Comentario.objects.bulk_create(
+        Comentario(
+            chamado=chamado, texto=f'Comentário {i}',
+            autor_usuario=usuario if i % 2 else None, autor_nome='Visitante',
+        )
+        for i in range(quantidade)
+    )
+    Chamado.objects.filter(pk=chamado.pk).update(qtd_videos=quantidade, tamanho_videos=1024 * quantidade)
+
+
+# O manifesto do whitenoise só existe depois do collectstatic.
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class ConsultasConstantesTests(TestCase):
+    """
+    As páginas rodam o mesmo número de consultas com 1, 10 e 1000 linhas
+    (sem N+1 em cliente, vídeos, comentários ou autores).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cliente = Cliente.objects.create(nome='Cliente', cpf='123.456.789-00')
+
+    def setUp(self):
+        cache.clear()
+
+    def entrar(self, nome):
+        usuario = User.objects.create_user(nome, password='x')
+        self.client.force_login(usuario)
+        return usuario
+
+    def test_lista(self):
+        for linhas in TAMANHOS:
+            with self.subTest(linhas=linhas):
+                usuario = self.entrar(f'lista{linhas}')
+                criar_chamados(usuario, self.cliente, linhas)
+                with self.assertNumQueries(4):
+                    resposta = self.client.get(reverse('chamados:lista'))
+                self.assertEqual(resposta.status_code, 200)
+                self.assertEqual(len(resposta.context['chamados']), min(linhas, 25))
+
+    def test_detalhe(self):
+        usuario = self.entrar('detalhe')
+        for linhas in TAMANHOS:
+            with self.subTest(linhas=linhas):
+                chamado, = criar_chamados(usuario, self.cliente, 1)
+                popular_chamado(chamado, usuario, linhas)
+                with self.assertNumQueries(5):
+                    resposta = self.client.get(reverse('chamados:detalhe', args=[chamado.pk]))
+                self.assertEqual(resposta.status_code, 200)
+                self.assertEqual(len(resposta.context['comentarios']), linhas)
+
+    def test_compartilhado(self):
+        usuario = User.objects.create_user('dono', password='x')
+        for linhas in TAMANHOS:
+            with self.subTest(linhas=linhas):
+                chamado, = criar_chamados(usuario, self.cliente, 1)
+                popular_chamado(chamado, usuario, linhas)
+                with self.assertNumQueries(3):
+                    resposta = self.client.get(reverse('chamados:compartilhado', args=[chamado.slug]))
+                self.assertEqual(resposta.status_code, 200)
+                self.assertContains(resposta, f'{linhas - 1}.mp4')
+
+
+class BuscaTests(TestCase):
+    """Busca textual pelo índice do banco (FTS5 no SQLite, tsvector no PostgreSQL)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('operador', password='x')
+        jose = Cliente.objects.create(nome='José Ribeiro', cpf='987.654.321-00')
+        maria = Cliente.objects.create(nome='Maria', cpf='123.456.789-00')
+        cls.portaria = Chamado.objects.create(
+            titulo='Câmera da portaria sem imagem', cliente=jose, criado_por=cls.usuario,
+        )
+        cls.hd = Chamado.objects.create(
+            titulo='Troca de HD', descricao='Gravador da câmera externa', cliente=maria,
+            criado_por=cls.usuario,
+        )
+        Comentario.objects.create(chamado=cls.hd, texto='Instalação concluída na portaria')
+
+    def buscar(self, consulta):
+        return list(ChamadoService.buscar_chamados(self.usuario, query=consulta))
+
+    def test_sem_acentos_e_por_relevancia(self):
+        # O título pesa mais que a descrição.
+        self.assertEqual(self.buscar('camera'), [self.portaria, self.hd])
+        self.assertEqual(self.buscar('instalacao'), [self.hd])
+        self.assertEqual(self.buscar('jose'), [self.portaria])
+        self.assertEqual(self.buscar('98765432100'), [self.portaria])
+        self.assertEqual(self.buscar('camera externa'), [self.hd])
+        self.assertEqual(self.buscar('inexistente'), [])
+
+    def test_so_chamados_do_usuario(self):
+        outro = User.objects.create_user('outro', password='x')
+        self.assertEqual(list(ChamadoService.buscar_chamados(outro, query='camera')), [])
+
+    def test_acompanha_edicao_e_exclusao(self):
+        self.portaria.titulo = 'Poste sem energia'
+        self.portaria.save()
+        self.assertEqual(self.buscar('camera'), [self.hd])
+        self.hd.delete()
+        self.assertEqual(self.buscar('portaria'), [])
+
+    @override_settings(
+        STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+        CHAMADOS_POR_PAGINA=1,
+    )
+    def test_lista_pagina_os_resultados(self):
+        self.client.force_login(self.usuario)
+        url = reverse('chamados:lista')
+        resposta = self.client.get(url, {'q': 'camera'})
+        self.assertEqual(resposta.context['chamados'], [self.portaria])
+        self.assertEqual(resposta.context['total'], 2)
+        self.assertContains(resposta, '?q=camera&pagina=2')
+
+        resposta = self.client.get(url, {'q': 'camera', 'pagina': 2})
+        self.assertEqual(resposta.context['chamados'], [self.hd])
+        self.assertEqual((resposta.context['pagina_anterior'], resposta.context['pagina_proxima']), (1, None))
+
+
+# O manifesto do whitenoise só existe depois do collectstatic.
+@override_settings(
+    STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+    REMOCAO_ASSINCRONA=False,
+)
+class UploadVideoTests(TestCase):
+    """``upload_video`` grava os vídeos em disco durante o recebimento (VideoUploadHandler)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('operador', password='x')
+        cliente = Cliente.objects.create(nome='Cliente', cpf='123.456.789-00')
+        cls.chamado = Chamado.objects.create(titulo='Chamado', cliente=cliente, criado_por=cls.usuario)
+
+    def setUp(self):
+        midia = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, midia, ignore_errors=True)
+        configuracao = override_settings(MEDIA_ROOT=midia)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        self.client.force_login(self.usuario)
+
+    def enviar(self, *arquivos):
+        with mock.patch.object(VideoService, 'salvar_videos', wraps=VideoService.salvar_videos) as salvar:
+            resposta = self.client.post(
+                reverse('chamados:upload_video', args=[self.chamado.pk]),
+                {'arquivos': list(arquivos)},
+            )
+        self.assertRedirects(resposta, reverse('chamados:detalhe', args=[self.chamado.pk]))
+        erros = [str(m) for m in get_messages(resposta.wsgi_request) if m.level_tag == 'error']
+        return salvar, erros
+
+    def test_grava_em_arquivo_temporario(self):
+        # Abaixo e acima de FILE_UPLOAD_MAX_MEMORY_SIZE: nunca fica em memória.
+        for tamanho in (100 * 1024, 8 * 1024 * 1024):
+            with self.subTest(tamanho=tamanho):
+                conteudo = bytes(range(256)) * (tamanho // 256)
+                salvar, erros = self.enviar(SimpleUploadedFile(f'{tamanho}.mp4', conteudo, 'video/mp4'))
+                self.assertEqual(erros, [])
+                arquivo, = salvar.call_args.kwargs['arquivos']
+                self.assertIsInstance(arquivo, TemporaryUploadedFile)
+                self.assertEqual(arquivo.size, tamanho)
+                self.assertEqual(arquivo.sha256, hashlib.sha256(conteudo).hexdigest())
+                video = Video.objects.get(nome_original=f'{tamanho}.mp4')
+                self.assertEqual(video.tamanho, tamanho)
+                self.assertEqual(video.arquivo.size, tamanho)
+
+    @override_settings(MAX_VIDEO_FILE_SIZE=1024 * 1024)
+    def test_arquivo_acima_do_limite_interrompe_o_upload(self):
+        conteudo = b'\0' * (3 * 1024 * 1024)
+        salvar, erros = self.enviar(SimpleUploadedFile('grande.mp4', conteudo, 'video/mp4'))
+        # StopUpload: o restante do corpo nem é lido e nada chega ao serviço.
+        salvar.assert_not_called()
+        self.assertEqual(erros, [f'"grande.mp4": {VideoService.erro_tamanho()}'])
+        self.assertFalse(Video.objects.exists())
+
+    def test_extensao_nao_permitida_descarta_so_o_arquivo(self):
+        salvar, erros = self.enviar(
+            SimpleUploadedFile('notas.txt', b'texto', 'text/plain'),
+            SimpleUploadedFile('camera.mp4', b'\0' * 4096, 'video/mp4'),
+        )
+        # SkipFile: o .txt é ignorado e o vídeo seguinte é gravado.
+        self.assertEqual(erros, [f'"notas.txt": {VideoService.erro_extensao(".txt")}'])
+        arquivo, = salvar.call_args.kwargs['arquivos']
+        self.assertEqual(arquivo.name, 'camera.mp4')
+        self.assertEqual(list(Video.objects.values_list('nome_original', flat=True)), ['camera.mp4'])
+
+
+class ConteudoCompartilhadoMixin:
+    """Um ``ArquivoVideo`` usado por ``videos`` vídeos de um chamado."""
+
+    def criar_conteudo(self, videos, referencias=None):
+        usuario = User.objects.create_user(f'operador{uuid.uuid4().hex[:6]}')
+        cliente = Cliente.objects.create(nome='Cliente', cpf='123.456.789-00')
+        self.chamado = Chamado.objects.create(titulo='Chamado', cliente=cliente, criado_por=usuario)
+        blob = ArquivoVideo.objects.create(
+            sha256=uuid.uuid4().hex * 2, arquivo='videos/conteudo/camera.mp4', tamanho=1024,
+            referencias=videos if referencias is None else referencias,
+        )
+        return blob, [
+            Video.objects.create(
+                chamado=self.chamado, arquivo=blob.arquivo.name, blob=blob, nome_original=f'{i}.mp4',
+                tamanho=1024, mime_type='video/mp4', enviado_por=usuario,
+            )
+            for i in range(videos)
+        ]
+
+
+class LiberarConteudoTests(ConteudoCompartilhadoMixin, TestCase):
+    """Excluir um vídeo deduplicado libera uma referência do ``ArquivoVideo``."""
+
+    def test_apaga_com_a_ultima_referencia(self):
+        blob, (primeiro, segundo) = self.criar_conteudo(2)
+        with mock.patch.object(remocao, 'agendar') as agendar:
+            primeiro.delete()
+            blob.refresh_from_db()
+            self.assertEqual(blob.referencias, 1)
+            agendar.assert_not_called()
+
+            segundo.delete()
+        self.assertFalse(ArquivoVideo.objects.filter(pk=blob.pk).exists())
+        agendar.assert_called_once_with('videos/conteudo/camera.mp4')
+
+    def test_contador_defasado_nao_apaga_conteudo_em_uso(self):
+        blob, (primeiro, segundo) = self.criar_conteudo(2, referencias=1)
+        with mock.patch.object(remocao, 'agendar') as agendar:
+            primeiro.delete()
+        blob.refresh_from_db()
+        self.assertEqual(blob.referencias, 0)
+        agendar.assert_not_called()
+        self.assertEqual(segundo.blob_id, blob.pk)
+
+
+class EsperarBloqueioMixin:
+
+    def esperar_bloqueio(self):
+        for _ in range(100):
+            with connection.cursor() as cursor:
+                # Dentro da transação as estatísticas ficam congeladas sem isso.
+                cursor.execute('SELECT pg_stat_clear_snapshot()')
+                cursor.execute(
+                    "SELECT COUNT(*) FROM pg_stat_activity "
+                    "WHERE datname = current_database() AND wait_event_type = 'Lock'"
+                )
+                if cursor.fetchone()[0]:
+                    return
+            time.sleep(0.05)
+        self.fail('A outra conexão não esperou pela trava.')
+
+
+@skipUnless(connection.vendor == 'postgresql', 'select_for_update só trava linhas no PostgreSQL.')
+class LiberarConteudoConcorrenteTests(EsperarBloqueioMixin, ConteudoCompartilhadoMixin, TransactionTestCase):
+
+    def test_reaproveitamento_espera_a_exclusao(self):
+        blob, (video,) = self.criar_conteudo(1)
+        resultado = {}
+
+        def reaproveitar():
+            try:
+                resultado['video'] = VideoService.vincular_blob(
+                    chamado=self.chamado, blob=blob, nome='copia.mp4', usuario=self.chamado.criado_por,
+                )
+            finally:
+                connections.close_all()
+
+        with mock.patch.object(remocao, 'agendar') as agendar:
+            with transaction.atomic():
+                video.delete()
+                concorrente = threading.Thread(target=reaproveitar)
+                concorrente.start()
+                self.esperar_bloqueio()
+            concorrente.join(10)
+        # Depois do commit o UPDATE não encontra mais o conteúdo e desiste.
+        self.assertIsNone(resultado['video'])
+        self.assertFalse(ArquivoVideo.objects.filter(pk=blob.pk).exists())
+        self.assertFalse(Video.objects.exists())
+        agendar.assert_called_once_with('videos/conteudo/camera.mp4')
+
+
+class ReconciliarContadoresTests(TestCase):
+
+    def test_corrige_contadores_defasados(self):
+        usuario = User.objects.create_user('operador')
+        cliente = Cliente.objects.create(nome='Cliente', cpf='123.456.789-00')
+        chamado, vazio = criar_chamados(usuario, cliente, 2)
+        popular_chamado(chamado, usuario, 3)
+        Chamado.objects.filter(pk=vazio.pk).update(qtd_videos=5, tamanho_videos=5)
+
+        call_command('reconciliar_contadores', dry_run=True, stdout=StringIO())
+        self.assertFalse(UsoArmazenamento.objects.exists())
+        self.assertEqual(Chamado.objects.get(pk=vazio.pk).qtd_videos, 5)
+
+        saida = StringIO()
+        call_command('reconciliar_contadores', stdout=saida)
+        self.assertIn('1 chamado(s) e 1 usuário(s) corrigido(s).', saida.getvalue())
+        self.assertEqual(
+            list(Chamado.objects.order_by('pk').values_list('qtd_videos', 'tamanho_videos')),
+            [(3, 3072), (0, 0)],
+        )
+        uso = UsoArmazenamento.objects.get(usuario=usuario)
+        self.assertEqual((uso.total_videos, uso.espaco_usado), (3, 3072))
+
+
+@skipUnless(connection.vendor == 'postgresql', 'select_for_update só trava linhas no PostgreSQL.')
+class ReconciliarContadoresConcorrenteTests(EsperarBloqueioMixin, TransactionTestCase):
+
+    def test_envio_durante_a_reconciliacao(self):
+        usuario = User.objects.create_user('operador')
+        cliente = Cliente.objects.create(nome='Cliente', cpf='123.456.789-00')
+        chamado = Chamado.objects.create(titulo='Chamado', cliente=cliente, criado_por=usuario)
+        # Contadores defasados: um vídeo no banco e nenhum contado.
+        popular_chamado(chamado, usuario, 1)
+        Chamado.objects.filter(pk=chamado.pk).update(qtd_videos=0, tamanho_videos=0)
+
+        def reconciliar():
+            try:
+                call_command('reconciliar_contadores', stdout=StringIO())
+            finally:
+                connections.close_all()
+
+        with transaction.atomic():
+            # Um envio em andamento: vídeo gravado e contadores incrementados.
+            Video.objects.create(
+                chamado=chamado, arquivo='videos/novo.mp4', nome_original='novo.mp4',
+                tamanho=1024, mime_type='video/mp4', enviado_por=usuario,
+            )
+            VideoService.contabilizar(chamado.pk, usuario.pk, 1, 1024)
+            concorrente = threading.Thread(target=reconciliar)
+            concorrente.start()
+            self.esperar_bloqueio()
+        concorrente.join(10)
+
+        chamado.refresh_from_db()
+        self.assertEqual((chamado.qtd_videos, chamado.tamanho_videos), (2, 2048))
+        uso = UsoArmazenamento.objects.get(usuario=usuario)
+        self.assertEqual((uso.total_videos, uso.espaco_usado), (2, 2048))
+
+
+class MetricasDiariasTests(TestCase):
+    """``chamados_resolvidos`` conta cada chamado no dia em que foi resolvido."""
+
+    def no_dia(self, dia):
+        agora = timezone.make_aware(datetime.combine(date(2026, 3, dia), hora(12)))
+        return mock.patch('django.utils.timezone.now', return_value=agora)
+
+    def resolvidos(self):
+        DashboardService.consolidar(date(2026, 3, 1), date(2026, 3, 31))
+        return dict(MetricaDiaria.objects.filter(chamados_resolvidos__gt=0).values_list('dia__day', 'chamados_resolvidos'))
+
+    def test_edicao_e_restauracao_nao_contam_de_novo(self):
+        usuario = User.objects.create_user('operador')
+        cliente = Cliente.objects.create(nome='Cliente', cpf='123.456.789-00')
+        with self.no_dia(1):
+            chamado = Chamado.objects.create(titulo='Chamado', cliente=cliente, criado_por=usuario)
+        with self.no_dia(2):
+            ChamadoService.atualizar_chamado(chamado, {'status': Chamado.Status.FECHADO})
+        with self.no_dia(5):
+            ChamadoService.atualizar_chamado(chamado, {'titulo': 'Chamado editado'})
+        self.assertEqual(self.resolvidos(), {2: 1})
+
+        with self.no_dia(20):
+            self.assertEqual(ArquivamentoService.arquivar_lote(timezone.now(), 10), [chamado.pk])
+            ArquivamentoService.restaurar([chamado.pk])
+        self.assertEqual(self.resolvidos(), {2: 1})
+
+        # Reaberto e resolvido de novo: passa a contar no novo dia.
+        chamado.refresh_from_db()
+        with self.no_dia(21):
+            ChamadoService.atualizar_chamado(chamado, {'status': Chamado.Status.ABERTO})
+        self.assertIsNone(chamado.resolvido_em)
+        with self.no_dia(22):
+            ChamadoService.atualizar_chamado(chamado, {'status': Chamado.Status.RESOLVIDO})
+        self.assertEqual(self.resolvidos(), {22: 1})
+
+
+@override_settings(REMOCAO_ASSINCRONA=False, OTIMIZACAO_ASSINCRONA=False)
+class OtimizacaoTests(TestCase):
+    """O faststart roda depois do commit e nunca reescreve um conteúdo deduplicado."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('operador', password='x')
+        cliente = Cliente.objects.create(nome='Cliente', cpf='123.456.789-00')
+        cls.chamado = Chamado.objects.create(titulo='Chamado', cliente=cliente, criado_por=cls.usuario)
+
+    def setUp(self):
+        midia = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, midia, ignore_errors=True)
+        configuracao = override_settings(MEDIA_ROOT=midia)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        criar_mp4(f'{midia}/original.mp4', 64 * 1024, moov_no_fim=True)
+        with open(f'{midia}/original.mp4', 'rb') as f:
+            self.original = f.read()
+
+    def enviar(self):
+        """Envia o MP4 com o ``moov`` no fim; devolve o vídeo e os callbacks do commit."""
+        with self.captureOnCommitCallbacks() as callbacks:
+            resultado, = VideoService.salvar_videos(
+                chamado=self.chamado, usuario=self.usuario,
+                arquivos=[SimpleUploadedFile('camera.mp4', self.original, 'video/mp4')],
+            )
+        self.assertEqual(resultado['erros'], [])
+        return resultado['video'], callbacks
+
+    def concluir(self, callbacks):
+        """Roda os callbacks do commit (e os que eles registrarem, como a remoção)."""
+        with self.captureOnCommitCallbacks(execute=True):
+            for callback in callbacks:
+                callback()
+
+    def conteudo(self, video):
+        with video.arquivo.open('rb') as f:
+            return f.read()
+
+    def test_envio_grava_o_original_e_otimiza_depois(self):
+        with mock.patch.object(faststart, 'otimizar', wraps=faststart.otimizar) as otimizar:
+            video, callbacks = self.enviar()
+            otimizar.assert_not_called()
+            self.assertFalse(video.otimizado)
+            antigo = video.blob
+            self.assertEqual(self.conteudo(video), self.original)
+            self.assertEqual(antigo.sha256, hashlib.sha256(self.original).hexdigest())
+
+            self.concluir(callbacks)
+            otimizar.assert_called_once()
+
+        video.refresh_from_db()
+        self.assertTrue(video.otimizado)
+        self.assertFalse(ArquivoVideo.objects.filter(pk=antigo.pk).exists())
+        self.assertFalse(antigo.arquivo.storage.exists(antigo.arquivo.name))
+        novo = video.blob
+        self.assertEqual(novo.arquivo.name, video.arquivo.name)
+        self.assertEqual(novo.referencias, 1)
+        # O hash do conteúdo novo é o dos bytes reescritos.
+        otimizado = self.conteudo(video)
+        self.assertEqual(novo.sha256, hashlib.sha256(otimizado).hexdigest())
+        self.assertEqual(novo.tamanho, len(otimizado))
+        self.assertEqual(faststart.situacao(video.arquivo.path), 'otimizado')
+
+    def test_reenvio_do_original_junta_no_conteudo_otimizado(self):
+        primeiro, callbacks = self.enviar()
+        self.concluir(callbacks)
+        primeiro.refresh_from_db()
+
+        segundo, callbacks = self.enviar()
+        self.assertNotEqual(segundo.blob_id, primeiro.blob_id)
+        self.concluir(callbacks)
+        segundo.refresh_from_db()
+
+        self.assertEqual(segundo.blob_id, primeiro.blob_id)
+        self.assertEqual(segundo.arquivo.name, primeiro.arquivo.name)
+        self.assertEqual(ArquivoVideo.objects.get().referencias, 2)
+
+    @override_settings(VIDEO_DEDUPLICACAO=False)
+    def test_video_sem_deduplicacao_reescrito_no_lugar(self):
+        video, callbacks = self.enviar()
+        nome = video.arquivo.name
+        self.concluir(callbacks)
+        video.refresh_from_db()
+        self.assertTrue(video.otimizado)
+        self.assertIsNone(video.blob_id)
+        self.assertEqual(video.arquivo.name, nome)
+        self.assertEqual(faststart.situacao(video.arquivo.path), 'otimizado')
@@ -0,0 +1,65 @@
+"""
+Upload handlers para o envio de vídeos.
+
+Os arquivos são gravados em disco à medida que os chunks chegam, e as regras
+de extensão / tamanho são aplicadas durante o recebimento, sem esperar o
+corpo inteiro da requisição.
+"""
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.files.uploadhandler import (
+    SkipFile,
+    StopUpload,
+    TemporaryFileUploadHandler,
+)
+
+from .services import VideoService
+
+
+class VideoUploadHandler(TemporaryFileUploadHandler):
+    """
+    Grava cada vídeo direto em um arquivo temporário, chunk a chunk.
+
+    - Extensão não permitida: o arquivo é descartado (``SkipFile``) sem
+      ser gravado, e os demais arquivos da requisição seguem normalmente.
+    - Arquivo acima de ``MAX_VIDEO_FILE_SIZE``: o upload é interrompido
+      (``StopUpload``) assim que o limite é ultrapassado.
+
+    Os erros ficam em ``self.erros`` para a view exibir ao usuário. O
+    SHA-256 de cada arquivo é calculado durante o recebimento e fica em
+    ``arquivo.sha256`` (usado pelo armazenamento deduplicado).
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.erros = []
+        self._recebidos = 0
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        # O arquivo anterior já pertence a request.FILES; sem isso o parser
+        # o fecharia (e apagaria do disco) ao tratar SkipFile / StopUpload.
+        self.__dict__.pop('file', None)
+        ext = os.path.splitext(file_name)[1].lower()
+        if ext not in settings.ALLOWED_VIDEO_EXTENSIONS:
+            self.erros.append(f'"{file_name}": {VideoService.erro_extensao(ext)}')
+            raise SkipFile()
+        self._recebidos = 0
+        self._hash = hashlib.sha256()
+        super().new_file(field_name, file_name, *args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self._recebidos += len(raw_data)
+        if self._recebidos > settings.MAX_VIDEO_FILE_SIZE:
+            self.erros.append(
+                f'"{self.file_name}": {VideoService.erro_tamanho()}'
+            )
+            raise StopUpload(connection_reset=True)
+        self._hash.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        arquivo = super().file_complete(file_size)
+        arquivo.sha256 = self._hash.hexdigest()
+        return arquivo
@@ -13,9 +13,20 @@ urlpatterns = [
     path('<int:pk>/upload/', views.upload_video, name='upload_video'),
     path('<int:pk>/comentario/', views.adicionar_comentario, name='adicionar_comentario'),
     path('<int:pk>/status/', views.mudar_status, name='mudar_status'),
+    path('<int:pk>/restaurar/', views.restaurar_chamado, name='restaurar'),
+    path('<int:pk>/videos.zip', views.videos_zip, name='videos_zip'),
     path('video/<int:video_id>/excluir/', views.excluir_video, name='excluir_video'),
+    path('video/<int:video_id>/arquivo/', views.video_arquivo, name='video_arquivo'),
+
+    # --- Upload retomável (API JSON) ---
+    path('<int:pk>/uploads/', views.upload_sessao_criar, name='upload_sessao_criar'),
+    path('uploads/<uuid:sessao_id>/', views.upload_sessao_status, name='upload_sessao_status'),
+    path('uploads/<uuid:sessao_id>/partes/<int:numero>/', views.upload_sessao_parte, name='upload_sessao_parte'),
+    path('uploads/<uuid:sessao_id>/finalizar/', views.upload_sessao_finalizar, name='upload_sessao_finalizar'),
 
     # --- Área pública (compartilhamento) ---
     path('compartilhado/<slug:slug>/', views.chamado_compartilhado, name='compartilhado'),
     path('compartilhado/<slug:slug>/comentario/', views.adicionar_comentario_publico, name='adicionar_comentario_publico'),
+    path('compartilhado/<slug:slug>/video/<int:video_id>/', views.video_compartilhado, name='video_compartilhado'),
+    path('compartilhado/<slug:slug>/videos.zip', views.videos_zip_compartilhado, name='videos_zip_compartilhado'),
 ]
@@ -0,0 +1,34 @@
+"""
+Versões para invalidar entradas de cache sem apagá-las.
+
+Cada grupo (dashboard de um usuário, página compartilhada de um chamado)
+tem um número de versão que entra na chave das entradas. Invalidar é só
+incrementar a versão: as entradas antigas deixam de ser lidas e expiram
+pelo timeout. Funciona igual no cache local e em cache compartilhado.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def atual(chave):
+    versao = cache.get(chave)
+    if versao is None:
+        # Nunca reaproveita uma versão anterior se a chave foi descartada.
+        versao = time.time_ns()
+        cache.add(chave, versao, None)
+        versao = cache.get(chave, versao)
+    return versao
+
+
+def _incrementar(chave):
+    try:
+        cache.incr(chave)
+    except ValueError:
+        cache.set(chave, time.time_ns(), None)
+
+
+def invalidar(chave):
+    """Incrementa a versão quando a transação atual confirmar."""
+    transaction.on_commit(lambda: _incrementar(chave))
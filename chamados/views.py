@@ -1,33 +1,82 @@
+import os
+
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import Http404
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.crypto import constant_time_compare
+from django.utils.http import http_date
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.decorators.http import require_GET, require_http_methods, require_POST
+from vision_hub.replicas import ler_da_replica
 
 from .forms import ChamadoForm, ComentarioForm, SenhaCompartilhamentoForm, VideoUploadForm
-from .models import Chamado, Comentario, Video
-from .services import ChamadoService, VideoService
+from .models import Chamado, ChamadoArquivado, Comentario, SessaoUpload, Video, VideoArquivado
+from .services import ArquivamentoService, ChamadoService, UploadService, VideoService
+from .streaming import resposta_video, resposta_zip
+from .uploadhandlers import VideoUploadHandler
+
+
+def _buscar_ou_404(querysets, **filtros):
+    """Primeiro objeto encontrado: nas tabelas quentes e, depois, no arquivo."""
+    for qs in querysets:
+        objeto = qs.filter(**filtros).first()
+        if objeto is not None:
+            return objeto
+    raise Http404
 
 
 # ─────────────────── LISTA ───────────────────
 @login_required
+@ler_da_replica()
 def lista_chamados(request):
     query = request.GET.get('q', '')
     status = request.GET.get('status', '')
     prioridade = request.GET.get('prioridade', '')
+    arquivados = request.GET.get('arquivados') == '1'
 
     chamados = ChamadoService.buscar_chamados(
         usuario=request.user,
         query=query,
         status=status,
         prioridade=prioridade,
+        arquivados=arquivados,
     )
+    total, total_excedido = ChamadoService.estimar_total(chamados)
+    cursor_anterior = cursor_proximo = ''
+    pagina_anterior = pagina_proxima = None
+    if query and not arquivados:
+        # Pesquisa: os mais relevantes primeiro, paginada por posição.
+        chamados, pagina_anterior, pagina_proxima = ChamadoService.paginar_busca(
+            chamados, request.GET.get('pagina'),
+        )
+    else:
+        chamados, cursor_anterior, cursor_proximo = ChamadoService.paginar(
+            chamados,
+            depois=request.GET.get('depois', ''),
+            antes=request.GET.get('antes', ''),
+        )
+
+    filtros = request.GET.copy()
+    for chave in ('depois', 'antes', 'pagina'):
+        filtros.pop(chave, None)
 
     context = {
         'chamados': chamados,
+        'total': total,
+        'total_excedido': total_excedido,
+        'cursor_anterior': cursor_anterior,
+        'cursor_proximo': cursor_proximo,
+        'pagina_anterior': pagina_anterior,
+        'pagina_proxima': pagina_proxima,
+        'filtros': filtros.urlencode(),
         'query': query,
         'status_filtro': status,
         'prioridade_filtro': prioridade,
+        'arquivados': arquivados,
         'status_choices': Chamado.Status.choices,
         'prioridade_choices': Chamado.Prioridade.choices,
     }
@@ -54,10 +103,13 @@ def criar_chamado(request):
 # ─────────────────── DETALHE ───────────────────
 @login_required
 def detalhe_chamado(request, pk):
-    chamado = get_object_or_404(Chamado, pk=pk, criado_por=request.user)
-    videos = chamado.videos.all()
+    chamado = _buscar_ou_404(
+        (Chamado.objects.select_related('cliente'), ChamadoArquivado.objects.select_related('cliente')),
+        pk=pk, criado_por=request.user,
+    )
+    videos = list(chamado.videos.all())
     video_form = VideoUploadForm()
-    comentarios = chamado.comentarios.all()
+    comentarios = list(chamado.comentarios.select_related('autor_usuario'))
     comentario_form = ComentarioForm()
     share_url = request.build_absolute_uri(chamado.link_compartilhamento)
 
@@ -95,45 +147,126 @@ def editar_chamado(request, pk):
 def excluir_chamado(request, pk):
     chamado = get_object_or_404(Chamado, pk=pk, criado_por=request.user)
     if request.method == 'POST':
-        for video in chamado.videos.all():
-            VideoService.excluir_video(video)
-        chamado.delete()
+        ChamadoService.excluir_chamado(chamado)
         messages.success(request, 'Chamado excluído com sucesso!')
         return redirect('chamados:lista')
     return render(request, 'chamados/confirmar_exclusao.html', {'chamado': chamado})
 
 
 # ─────────────────── UPLOAD VÍDEO ───────────────────
+@csrf_exempt
 @login_required
 def upload_video(request, pk):
+    # Os upload handlers precisam ser trocados antes de request.POST/FILES
+    # serem lidos, o que o CsrfViewMiddleware faria; por isso o CSRF é
+    # verificado na view interna.
+    handler = VideoUploadHandler(request)
+    request.upload_handlers = [handler]
+    return _upload_video(request, pk, handler)
+
+
+@csrf_protect
+def _upload_video(request, pk, handler):
     chamado = get_object_or_404(Chamado, pk=pk, criado_por=request.user)
     if request.method == 'POST':
         arquivos = request.FILES.getlist('arquivos')
         descricao = request.POST.get('descricao', '')
+        erros_total = list(handler.erros)
         if arquivos:
-            erros_total = []
-            salvos = 0
-            for arq in arquivos:
-                erros = VideoService.validar_arquivo(arq)
-                if erros:
-                    erros_total.extend(erros)
-                else:
-                    VideoService.salvar_video(
-                        chamado=chamado,
-                        arquivo=arq,
-                        usuario=request.user,
-                        descricao=descricao,
-                    )
-                    salvos += 1
+            resultados = VideoService.salvar_videos(
+                chamado=chamado,
+                arquivos=arquivos,
+                usuario=request.user,
+                descricao=descricao,
+            )
+            salvos = sum(1 for r in resultados if r['video'])
             if salvos:
                 messages.success(request, f'{salvos} vídeo(s) enviado(s) com sucesso!')
-            for e in erros_total:
-                messages.error(request, e)
-        else:
+            for r in resultados:
+                erros_total.extend(f'"{r["nome"]}": {e}' for e in r['erros'])
+        elif not erros_total:
             messages.error(request, 'Selecione ao menos um arquivo de vídeo.')
+        for e in erros_total:
+            messages.error(request, e)
     return redirect('chamados:detalhe', pk=pk)
 
 
+# ─────────────────── UPLOAD RETOMÁVEL (API) ───────────────────
+def _sessao_upload_ou_404(request, sessao_id):
+    return get_object_or_404(
+        SessaoUpload,
+        pk=sessao_id,
+        usuario=request.user,
+        expira_em__gt=timezone.now(),
+    )
+
+
+def _sessao_upload_json(sessao):
+    recebidas = UploadService.partes_recebidas(sessao)
+    return {
+        'id': str(sessao.pk),
+        'nome': sessao.nome_original,
+        'tamanho': sessao.tamanho,
+        'tamanho_parte': sessao.tamanho_parte,
+        'total_partes': sessao.total_partes,
+        'recebidas': recebidas,
+        'expira_em': sessao.expira_em.isoformat(),
+    }
+
+
+@login_required
+@require_POST
+def upload_sessao_criar(request, pk):
+    chamado = get_object_or_404(Chamado, pk=pk, criado_por=request.user)
+    try:
+        tamanho = int(request.POST.get('tamanho', ''))
+    except ValueError:
+        tamanho = 0
+    dados = {
+        'chamado': chamado,
+        'usuario': request.user,
+        'nome': request.POST.get('nome', ''),
+        'tamanho': tamanho,
+        'descricao': request.POST.get('descricao', ''),
+    }
+    # Conteúdo já conhecido: o vídeo é criado sem envio das partes.
+    video = UploadService.reaproveitar(sha256=request.POST.get('sha256', ''), **dados)
+    if video:
+        return JsonResponse({'video': video.pk, 'nome': video.nome_original}, status=201)
+    sessao, erros = UploadService.criar_sessao(**dados)
+    if erros:
+        return JsonResponse({'erros': erros}, status=400)
+    return JsonResponse(_sessao_upload_json(sessao), status=201)
+
+
+@login_required
+@require_GET
+def upload_sessao_status(request, sessao_id):
+    sessao = _sessao_upload_ou_404(request, sessao_id)
+    return JsonResponse(_sessao_upload_json(sessao))
+
+
+@login_required
+@require_http_methods(['PUT'])
+def upload_sessao_parte(request, sessao_id, numero):
+    sessao = _sessao_upload_ou_404(request, sessao_id)
+    # Lê direto do stream da requisição: a parte nunca fica inteira em memória.
+    erros = UploadService.salvar_parte(sessao, numero, request)
+    if erros:
+        return JsonResponse({'erros': erros}, status=400)
+    return JsonResponse({'numero': numero})
+
+
+@login_required
+@require_POST
+def upload_sessao_finalizar(request, sessao_id):
+    sessao = _sessao_upload_ou_404(request, sessao_id)
+    video, erros = UploadService.finalizar(sessao)
+    if erros:
+        return JsonResponse({'erros': erros}, status=409)
+    return JsonResponse({'video': video.pk, 'nome': video.nome_original}, status=201)
+
+
 # ─────────────────── EXCLUIR VÍDEO ───────────────────
 @login_required
 def excluir_video(request, video_id):
@@ -145,43 +278,193 @@ def excluir_video(request, video_id):
     return redirect('chamados:detalhe', pk=chamado_pk)
 
 
+# ─────────────────── ARQUIVO DE VÍDEO (STREAMING) ───────────────────
+def _cookie_compartilhamento(chamado):
+    return f'chamado_acesso_{chamado.pk}'
+
+
+def _acesso_liberado(request, chamado):
+    """
+    Cookie assinado e com validade emitido ao acertar a senha; conferido só
+    com a SECRET_KEY, sem sessão nem banco. Carrega a impressão da senha
+    atual, então trocar a senha revoga os acessos já concedidos.
+    """
+    impressao = request.get_signed_cookie(
+        _cookie_compartilhamento(chamado), default=None,
+        salt='chamados.compartilhado', max_age=settings.COMPARTILHADO_ACESSO_MAX_AGE,
+    )
+    return impressao is not None and constant_time_compare(impressao, chamado.impressao_senha)
+
+
+def _liberar_acesso(response, request, chamado):
+    response.set_signed_cookie(
+        _cookie_compartilhamento(chamado), chamado.impressao_senha,
+        salt='chamados.compartilhado', max_age=settings.COMPARTILHADO_ACESSO_MAX_AGE,
+        path=chamado.link_compartilhamento, secure=request.is_secure(),
+        httponly=True, samesite='Lax',
+    )
+
+
+def _compartilhamento_liberado(request, chamado):
+    """Mesmas regras de ``chamado_compartilhado``: link válido e senha informada."""
+    if chamado.link_expirado:
+        return False
+    if chamado.tipo_compartilhamento == Chamado.TipoCompartilhamento.PROTEGIDO:
+        return _acesso_liberado(request, chamado)
+    return True
+
+
+def _cache_control(chamado):
+    """
+    Diretivas de cache dos vídeos: só os de chamados públicos podem ser
+    guardados por proxies; os demais ficam no navegador e revalidam sempre.
+    """
+    if chamado.tipo_compartilhamento == Chamado.TipoCompartilhamento.PUBLICO:
+        return {'public': True, 'max_age': settings.COMPARTILHADO_MAX_AGE}
+    return {'private': True, 'no_cache': True}
+
+
+def _resposta_arquivo_video(request, video, cache_control):
+    if not video.arquivo:
+        raise Http404
+    try:
+        caminho = video.arquivo.path
+    except NotImplementedError:
+        # Storage remoto: o próprio backend serve o arquivo.
+        return redirect(video.arquivo.url)
+    if not os.path.exists(caminho):
+        raise Http404
+    return resposta_video(
+        request, caminho, video.nome_original, video.tipo_mime, cache_control,
+    )
+
+
+@login_required
+@require_http_methods(['GET', 'HEAD'])
+def video_arquivo(request, video_id):
+    video = _buscar_ou_404(
+        (Video.objects, VideoArquivado.objects), pk=video_id, chamado__criado_por=request.user,
+    )
+    return _resposta_arquivo_video(request, video, {'private': True, 'no_cache': True})
+
+
+@require_http_methods(['GET', 'HEAD'])
+def video_compartilhado(request, slug, video_id):
+    video = _buscar_ou_404(
+        (Video.objects.select_related('chamado'), VideoArquivado.objects.select_related('chamado')),
+        pk=video_id, chamado__slug=slug,
+    )
+    if not _compartilhamento_liberado(request, video.chamado):
+        raise Http404
+    return _resposta_arquivo_video(request, video, _cache_control(video.chamado))
+
+
+def _resposta_zip_videos(chamado):
+    videos = list(chamado.videos.exclude(arquivo='').order_by('enviado_em'))
+    if not videos:
+        raise Http404
+
+    def entradas():
+        for video in videos:
+            try:
+                tamanho = video.arquivo.size
+            except FileNotFoundError:
+                continue
+            yield (
+                video.nome_original,
+                lambda video=video: video.arquivo.storage.open(video.arquivo.name, 'rb'),
+                tamanho,
+                timezone.localtime(video.enviado_em),
+            )
+
+    return resposta_zip(entradas(), f'chamado-{chamado.pk}-videos.zip')
+
+
+@login_required
+@require_GET
+def videos_zip(request, pk):
+    chamado = _buscar_ou_404(
+        (Chamado.objects, ChamadoArquivado.objects), pk=pk, criado_por=request.user,
+    )
+    return _resposta_zip_videos(chamado)
+
+
+@require_GET
+def videos_zip_compartilhado(request, slug):
+    chamado = _buscar_ou_404((Chamado.objects, ChamadoArquivado.objects), slug=slug)
+    if not _compartilhamento_liberado(request, chamado):
+        raise Http404
+    return _resposta_zip_videos(chamado)
+
+
 # ─────────────────── COMPARTILHADO (PÚBLICO) ───────────────────
+# Montado uma vez: cada requisição só clona e filtra (as subconsultas de
+# com_validadores são caras de construir no ORM).
+CHAMADOS_COMPARTILHADOS = (
+    ChamadoService.com_validadores(Chamado.objects.select_related('cliente')),
+    ChamadoService.com_validadores(ChamadoArquivado.objects.select_related('cliente')),
+)
+
+
+@ler_da_replica()
 def chamado_compartilhado(request, slug):
-    chamado = get_object_or_404(Chamado, slug=slug)
+    chamado = _buscar_ou_404(CHAMADOS_COMPARTILHADOS, slug=slug)
 
     # Verificar expiração
     if chamado.link_expirado:
         return render(request, 'chamados/link_expirado.html', {'chamado': chamado})
 
     # Verificar senha
-    if chamado.tipo_compartilhamento == Chamado.TipoCompartilhamento.PROTEGIDO:
-        session_key = f'chamado_auth_{chamado.pk}'
-        if not request.session.get(session_key):
-            if request.method == 'POST':
-                form = SenhaCompartilhamentoForm(request.POST)
-                if form.is_valid():
-                    if form.cleaned_data['senha'] == chamado.senha_compartilhamento:
-                        request.session[session_key] = True
-                    else:
-                        messages.error(request, 'Senha incorreta.')
-                        return render(request, 'chamados/senha_acesso.html', {
-                            'form': form, 'chamado': chamado,
-                        })
-            else:
-                form = SenhaCompartilhamentoForm()
-                return render(request, 'chamados/senha_acesso.html', {
-                    'form': form, 'chamado': chamado,
-                })
+    if (
+        chamado.tipo_compartilhamento == Chamado.TipoCompartilhamento.PROTEGIDO
+        and not _acesso_liberado(request, chamado)
+    ):
+        form = SenhaCompartilhamentoForm(request.POST or None)
+        if form.is_valid():
+            if chamado.verificar_senha(form.cleaned_data['senha']):
+                response = redirect('chamados:compartilhado', slug=slug)
+                _liberar_acesso(response, request, chamado)
+                return response
+            messages.error(request, 'Senha incorreta.')
+        return render(request, 'chamados/senha_acesso.html', {
+            'form': form, 'chamado': chamado,
+        })
+
+    # O HTML leva o token CSRF do formulário de comentário (e o cookie que
+    # o acompanha): nunca vai para cache compartilhado, nem de chamado
+    # público. O segredo do cookie entra no ETag para que um 304 não
+    # reaproveite uma página com o token de outro cookie.
+    etag, ultima_modificacao = ChamadoService.validadores(
+        chamado, variante=request.META.get('CSRF_COOKIE', ''),
+    )
+    cache_control = {'private': True, 'no_cache': True}
+    # Com mensagens pendentes a página muda; não responde 304.
+    if request.method in ('GET', 'HEAD') and not len(messages.get_messages(request)):
+        condicional = get_conditional_response(
+            request, etag=etag, last_modified=int(ultima_modificacao.timestamp()),
+        )
+        if condicional is not None:
+            patch_cache_control(condicional, **cache_control)
+            return condicional
 
+    # Vídeos e comentários ficam como querysets: só são consultados se o
+    # HTML do chamado não estiver em cache (ver compartilhado.html).
     videos = chamado.videos.all()
-    comentarios = chamado.comentarios.all()
+    comentarios = chamado.comentarios.select_related('autor_usuario')
     comentario_form = ComentarioForm()
-    return render(request, 'chamados/compartilhado.html', {
+    response = render(request, 'chamados/compartilhado.html', {
         'chamado': chamado,
         'videos': videos,
         'comentarios': comentarios,
         'comentario_form': comentario_form,
+        'cache_timeout': settings.COMPARTILHADO_CACHE_TIMEOUT,
+        'cache_versao': ChamadoService.versao_compartilhado(chamado.pk),
     })
+    if request.method in ('GET', 'HEAD'):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(ultima_modificacao.timestamp())
+        patch_cache_control(response, **cache_control)
+    return response
 
 
 # ─────────────────── ADICIONAR COMENTÁRIO ───────────────────
@@ -203,6 +486,8 @@ def adicionar_comentario(request, pk):
 # ─────────────────── COMENTÁRIO PÚBLICO ───────────────────
 def adicionar_comentario_publico(request, slug):
     chamado = get_object_or_404(Chamado, slug=slug)
+    if not _compartilhamento_liberado(request, chamado):
+        raise Http404
     if request.method == 'POST':
         texto = request.POST.get('texto', '').strip()
         autor_nome = request.POST.get('autor_nome', '').strip()
@@ -216,6 +501,16 @@ def adicionar_comentario_publico(request, slug):
     return redirect('chamados:compartilhado', slug=slug)
 
 
+# ─────────────────── RESTAURAR DO ARQUIVO ───────────────────
+@login_required
+@require_POST
+def restaurar_chamado(request, pk):
+    chamado = get_object_or_404(ChamadoArquivado, pk=pk, criado_por=request.user)
+    ArquivamentoService.restaurar([chamado.pk])
+    messages.success(request, f'Chamado #{chamado.pk} restaurado do arquivo!')
+    return redirect('chamados:detalhe', pk=pk)
+
+
 # ─────────────────── MUDAR STATUS ───────────────────
 @login_required
 def mudar_status(request, pk):
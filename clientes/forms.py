@@ -1,7 +1,30 @@
 from django import forms
+from django.urls import reverse_lazy
 from .models import Cliente
 
 
+class ClienteAutocompleteSelect(forms.Select):
+    """
+    Select que só renderiza o cliente selecionado; os demais são buscados
+    em ``clientes:autocomplete`` conforme o usuário digita.
+    """
+
+    def __init__(self, attrs=None):
+        attrs = {'data-autocomplete-url': reverse_lazy('clientes:autocomplete'), **(attrs or {})}
+        super().__init__(attrs)
+
+    def optgroups(self, name, value, attrs=None):
+        selecionados = [v for v in value if str(v).isdigit()]
+        opcoes = [self.create_option(name, '', self.choices.field.empty_label or '', not selecionados, 0)]
+        if selecionados:
+            for indice, cliente in enumerate(self.choices.queryset.filter(pk__in=selecionados), 1):
+                opcoes.append(self.create_option(
+                    name, self.choices.choice(cliente)[0],
+                    self.choices.field.label_from_instance(cliente), True, indice,
+                ))
+        return [(None, opcoes, 0)]
+
+
 class ClienteForm(forms.ModelForm):
     class Meta:
         model = Cliente
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.16 on 2026-10-17 12:16
+
+import re
+
+from django.db import migrations, models
+
+
+def preencher_digitos(apps, schema_editor):
+    Cliente = apps.get_model('clientes', 'Cliente')
+    alias = schema_editor.connection.alias
+    clientes = []
+    for cliente in Cliente.objects.using(alias).only('cpf', 'cnpj', 'telefone').iterator():
+        cliente.cpf_digitos = re.sub(r'\D', '', cliente.cpf)
+        cliente.cnpj_digitos = re.sub(r'\D', '', cliente.cnpj)
+        cliente.telefone_digitos = re.sub(r'\D', '', cliente.telefone)
+        clientes.append(cliente)
+    Cliente.objects.using(alias).bulk_update(
+        clientes, ['cpf_digitos', 'cnpj_digitos', 'telefone_digitos'], batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cliente',
+            name='cnpj_digitos',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=14),
+        ),
+        migrations.AddField(
+            model_name='cliente',
+            name='cpf_digitos',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=11),
+        ),
+        migrations.AddField(
+            model_name='cliente',
+            name='telefone_digitos',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=20),
+        ),
+        migrations.RunPython(preencher_digitos, migrations.RunPython.noop),
+    ]
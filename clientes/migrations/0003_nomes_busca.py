@@ -0,0 +1,46 @@
+# Generated by Django 4.2.16 on 2026-10-17 12:26
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+def normalizar(valor):
+    valor = unicodedata.normalize('NFKD', valor or '')
+    valor = ''.join(c for c in valor if not unicodedata.combining(c)).lower()
+    return ' '.join(re.findall(r'[a-z0-9]+', valor))
+
+
+def preencher_nomes(apps, schema_editor):
+    Cliente = apps.get_model('clientes', 'Cliente')
+    alias = schema_editor.connection.alias
+    clientes = []
+    for cliente in Cliente.objects.using(alias).only('nome', 'nome_fantasia').iterator():
+        cliente.nome_busca = normalizar(cliente.nome)
+        cliente.nome_fantasia_busca = normalizar(cliente.nome_fantasia)
+        clientes.append(cliente)
+    Cliente.objects.using(alias).bulk_update(
+        clientes, ['nome_busca', 'nome_fantasia_busca'], batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientes', '0002_digitos'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cliente',
+            name='nome_busca',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='cliente',
+            name='nome_fantasia_busca',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=200),
+        ),
+        migrations.RunPython(preencher_nomes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+from django.db import migrations
+
+# Colunas das buscas por prefixo (ClienteService._prefixo): com collation "C"
+# a comparação é byte a byte, como no SQLite, e o intervalo [prefixo, próximo)
+# usa o índice B-tree.
+COLUNAS_PREFIXO = {
+    'cpf_digitos': 11, 'cnpj_digitos': 14, 'telefone_digitos': 20,
+    'nome_busca': 200, 'nome_fantasia_busca': 200,
+}
+# Busca textual da lista de clientes (icontains): índices de trigramas.
+COLUNAS_TRIGRAMA = ('nome', 'nome_fantasia', 'email')
+
+
+def criar_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for coluna, tamanho in COLUNAS_PREFIXO.items():
+        schema_editor.execute(
+            f'ALTER TABLE clientes_cliente ALTER COLUMN {coluna} TYPE varchar({tamanho}) COLLATE "C"'
+        )
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            # Sem o contrib instalado: a busca textual segue sem índice.
+            return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for coluna in COLUNAS_TRIGRAMA:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS cliente_{coluna}_trgm '
+            f'ON clientes_cliente USING gin (upper({coluna}) gin_trgm_ops)'
+        )
+
+
+def remover_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for coluna in COLUNAS_TRIGRAMA:
+        schema_editor.execute(f'DROP INDEX IF EXISTS cliente_{coluna}_trgm')
+    for coluna, tamanho in COLUNAS_PREFIXO.items():
+        schema_editor.execute(
+            f'ALTER TABLE clientes_cliente ALTER COLUMN {coluna} TYPE varchar({tamanho}) COLLATE "default"'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientes', '0003_nomes_busca'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indices, remover_indices),
+    ]
@@ -1,7 +1,21 @@
+import re
+import unicodedata
+
 from django.conf import settings
 from django.db import models
 
 
+def so_digitos(valor):
+    return re.sub(r'\D', '', valor or '')
+
+
+def normalizar(valor):
+    """Minúsculas, sem acentos e só letras/dígitos separados por um espaço."""
+    valor = unicodedata.normalize('NFKD', valor or '')
+    valor = ''.join(c for c in valor if not unicodedata.combining(c)).lower()
+    return ' '.join(re.findall(r'[a-z0-9]+', valor))
+
+
 class Cliente(models.Model):
     """Cliente que pode ser Pessoa Física ou Jurídica."""
 
@@ -35,6 +49,14 @@ class Cliente(models.Model):
     # Contato
     telefone = models.CharField('Telefone', max_length=20, blank=True)
     email = models.EmailField('E-mail', blank=True)
+
+    # Cópias só com dígitos (sem máscara), para busca indexada por prefixo.
+    cpf_digitos = models.CharField(max_length=11, blank=True, editable=False, db_index=True)
+    cnpj_digitos = models.CharField(max_length=14, blank=True, editable=False, db_index=True)
+    telefone_digitos = models.CharField(max_length=20, blank=True, editable=False, db_index=True)
+    # Nomes normalizados, para o autocomplete por prefixo.
+    nome_busca = models.CharField(max_length=200, blank=True, editable=False, db_index=True)
+    nome_fantasia_busca = models.CharField(max_length=200, blank=True, editable=False, db_index=True)
     
     # Meta
     criado_por = models.ForeignKey(
@@ -58,6 +80,23 @@ class Cliente(models.Model):
             return f'{self.nome_fantasia} ({self.cnpj})'
         return f'{self.nome} ({self.cpf or self.cnpj})'
 
+    def save(self, *args, **kwargs):
+        self.cpf_digitos = so_digitos(self.cpf)
+        self.cnpj_digitos = so_digitos(self.cnpj)
+        self.telefone_digitos = so_digitos(self.telefone)
+        self.nome_busca = normalizar(self.nome)
+        self.nome_fantasia_busca = normalizar(self.nome_fantasia)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {
+                f'{campo}_digitos' for campo in ('cpf', 'cnpj', 'telefone')
+                if campo in update_fields
+            } | {
+                f'{campo}_busca' for campo in ('nome', 'nome_fantasia')
+                if campo in update_fields
+            }
+        super().save(*args, **kwargs)
+
     @property
     def documento(self):
         return self.cnpj if self.tipo_pessoa == self.TipoPessoa.JURIDICA else self.cpf
@@ -0,0 +1,91 @@
+"""
+Serviços de negócio para o módulo de clientes.
+"""
+from django.db.models import Q
+
+from .models import Cliente, normalizar, so_digitos
+
+TAMANHO_CPF = 11
+TAMANHO_CNPJ = 14
+MINIMO_DIGITOS = 3
+MINIMO_LETRAS = 2
+LIMITE_SUGESTOES = 10
+CARACTERES_MASCARA = set(' .-/()+')
+
+
+class ClienteService:
+    """Operações de alto nível sobre Clientes."""
+
+    @staticmethod
+    def consulta_numerica(query: str) -> str:
+        """
+        Dígitos de ``query`` quando ela é um CPF/CNPJ/telefone (com ou sem
+        máscara); ``''`` quando é texto.
+        """
+        digitos = so_digitos(query)
+        if len(digitos) < MINIMO_DIGITOS:
+            return ''
+        if any(not c.isdigit() and c not in CARACTERES_MASCARA for c in query):
+            return ''
+        return digitos
+
+    @staticmethod
+    def _prefixo(campo: str, prefixo: str) -> Q:
+        # Intervalo [prefixo, próximo prefixo) em vez de LIKE 'x%': usa o
+        # índice B-tree em qualquer banco, independente de collation. As
+        # colunas só têm dígitos/letras minúsculas, então incrementar o
+        # último caractere dá o limite superior.
+        proximo = prefixo[:-1] + chr(ord(prefixo[-1]) + 1)
+        return Q(**{f'{campo}__gte': prefixo, f'{campo}__lt': proximo})
+
+    @staticmethod
+    def filtro_numerico(digitos: str) -> Q:
+        filtro = ClienteService._prefixo('telefone_digitos', digitos)
+        if len(digitos) == TAMANHO_CPF:
+            filtro |= Q(cpf_digitos=digitos)
+        elif len(digitos) < TAMANHO_CPF:
+            filtro |= ClienteService._prefixo('cpf_digitos', digitos)
+        if len(digitos) == TAMANHO_CNPJ:
+            filtro |= Q(cnpj_digitos=digitos)
+        elif len(digitos) < TAMANHO_CNPJ:
+            filtro |= ClienteService._prefixo('cnpj_digitos', digitos)
+        return filtro
+
+    @staticmethod
+    def pesquisar(qs, query: str):
+        """
+        Filtra ``qs`` por ``query``. Consultas numéricas vão direto aos
+        índices de ``cpf_digitos``/``cnpj_digitos``/``telefone_digitos``;
+        as demais procuram no nome, nome fantasia e e-mail.
+        """
+        if not query:
+            return qs
+        digitos = ClienteService.consulta_numerica(query)
+        if digitos:
+            return qs.filter(ClienteService.filtro_numerico(digitos))
+        return qs.filter(
+            Q(nome__icontains=query)
+            | Q(nome_fantasia__icontains=query)
+            | Q(email__icontains=query)
+        )
+
+    @staticmethod
+    def sugerir(query: str, limite: int = LIMITE_SUGESTOES):
+        """
+        Clientes ativos para o autocomplete: prefixo do CPF/CNPJ (com ou sem
+        máscara) ou do nome/nome fantasia, sem diferenciar acentos.
+        """
+        qs = Cliente.objects.filter(ativo=True).only(
+            'tipo_pessoa', 'nome', 'nome_fantasia', 'cpf', 'cnpj',
+        )
+        digitos = ClienteService.consulta_numerica(query)
+        if digitos:
+            filtro = ClienteService._prefixo('cpf_digitos', digitos)
+            filtro |= ClienteService._prefixo('cnpj_digitos', digitos)
+        else:
+            termo = normalizar(query)
+            if len(termo) < MINIMO_LETRAS:
+                return []
+            filtro = ClienteService._prefixo('nome_busca', termo)
+            filtro |= ClienteService._prefixo('nome_fantasia_busca', termo)
+        return list(qs.filter(filtro).order_by('nome_busca', 'pk')[:limite])
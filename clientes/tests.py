@@ -0,0 +1,51 @@
+import uuid
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from chamados.models import Chamado
+
+from .models import Cliente
+
+TAMANHOS = (1, 10, 1000)
+
+
+# O manifesto do whitenoise só existe depois do collectstatic.
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class ConsultasConstantesTests(TestCase):
+    """As páginas de clientes rodam o mesmo número de consultas com 1, 10 e 1000 linhas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('operador', password='x')
+
+    def setUp(self):
+        self.client.force_login(self.usuario)
+
+    def test_lista(self):
+        for linhas in TAMANHOS:
+            with self.subTest(linhas=linhas):
+                Cliente.objects.all().delete()
+                Cliente.objects.bulk_create(
+                    Cliente(nome=f'Cliente {i}', cpf=f'{i:011d}') for i in range(linhas)
+                )
+                with self.assertNumQueries(6):
+                    resposta = self.client.get(reverse('clientes:lista'))
+                self.assertEqual(resposta.status_code, 200)
+
+    def test_detalhe(self):
+        for linhas in TAMANHOS:
+            with self.subTest(linhas=linhas):
+                cliente = Cliente.objects.create(nome=f'Cliente {linhas}', cpf='123.456.789-00')
+                Chamado.objects.bulk_create(
+                    Chamado(
+                        titulo=f'Chamado {i}', cliente=cliente, criado_por=self.usuario,
+                        slug=uuid.uuid4().hex[:12],
+                    )
+                    for i in range(linhas)
+                )
+                with self.assertNumQueries(4):
+                    resposta = self.client.get(reverse('clientes:detalhe', args=[cliente.pk]))
+                self.assertEqual(resposta.status_code, 200)
+                self.assertEqual(len(resposta.context['chamados']), min(linhas, 10))
@@ -1,26 +1,20 @@
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from vision_hub.replicas import ler_da_replica
 from .models import Cliente
 from .forms import ClienteForm
+from .services import ClienteService
 
 
 @login_required
+@ler_da_replica()
 def lista_clientes(request):
     query = request.GET.get('q', '')
     tipo = request.GET.get('tipo', '')
     
-    clientes = Cliente.objects.filter(ativo=True)
-    if query:
-        from django.db.models import Q
-        clientes = clientes.filter(
-            Q(nome__icontains=query) |
-            Q(nome_fantasia__icontains=query) |
-            Q(cpf__icontains=query) |
-            Q(cnpj__icontains=query) |
-            Q(email__icontains=query) |
-            Q(telefone__icontains=query)
-        )
+    clientes = ClienteService.pesquisar(Cliente.objects.filter(ativo=True), query)
     if tipo:
         clientes = clientes.filter(tipo_pessoa=tipo)
     
@@ -36,6 +30,14 @@ def lista_clientes(request):
     return render(request, 'clientes/lista.html', context)
 
 
+@login_required
+def autocomplete(request):
+    clientes = ClienteService.sugerir(request.GET.get('q', '').strip())
+    return JsonResponse({
+        'resultados': [{'id': cliente.pk, 'texto': str(cliente)} for cliente in clientes],
+    })
+
+
 @login_required
 def criar_cliente(request):
     if request.method == 'POST':
@@ -56,7 +58,7 @@ def criar_cliente(request):
 @login_required
 def detalhe_cliente(request, pk):
     cliente = get_object_or_404(Cliente, pk=pk)
-    chamados = cliente.chamados.all()[:10]
+    chamados = list(cliente.chamados.all()[:10])
     context = {
         'cliente': cliente,
         'chamados': chamados,
@@ -5,4 +5,7 @@ app_name = 'dashboard'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('series/', views.series, name='series'),
+    path('cache/', views.estatisticas_cache, name='estatisticas_cache'),
+    path('banco/', views.estatisticas_banco, name='estatisticas_banco'),
 ]
@@ -1,9 +1,32 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
 from django.shortcuts import render
 from chamados.services import DashboardService
+from vision_hub import conexoes
 
 
 @login_required
 def index(request):
-    metricas = DashboardService.get_metricas(request.user)
+    metricas = DashboardService.obter_metricas(request.user)
     return render(request, 'dashboard/index.html', metricas)
+
+
+@staff_member_required
+def estatisticas_cache(request):
+    return JsonResponse(DashboardService.estatisticas_cache())
+
+
+@staff_member_required
+def estatisticas_banco(request):
+    return JsonResponse(conexoes.estatisticas(settings.DATABASES))
+
+
+@login_required
+def series(request):
+    try:
+        dias = min(max(int(request.GET.get('dias', 30)), 1), 366)
+    except ValueError:
+        dias = 30
+    return JsonResponse({'dias': DashboardService.serie_diaria(request.user, dias)})
@@ -0,0 +1,67 @@
+"""
+Tempo para obter uma conexão com o banco (abrir uma nova ou tirar do pool).
+Os números ficam na memória do processo, sem ida ao cache a cada conexão:
+cada worker tem os seus, desde que subiu. Ver /dashboard/banco/.
+"""
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+logger = logging.getLogger(__name__)
+
+# Limites superiores das faixas do histograma, em ms.
+FAIXAS_MS = (1, 5, 20, 100, 500)
+
+_contadores = defaultdict(Counter)
+_trava = threading.Lock()
+
+
+def faixa(ms):
+    for limite in FAIXAS_MS:
+        if ms < limite:
+            return f'<{limite}ms'
+    return f'>={FAIXAS_MS[-1]}ms'
+
+
+def registrar(alias, segundos):
+    ms = segundos * 1000
+    with _trava:
+        contador = _contadores[alias]
+        contador['total'] += 1
+        contador['us'] += round(segundos * 1_000_000)
+        contador[faixa(ms)] += 1
+    if ms >= FAIXAS_MS[-1]:
+        logger.warning('Conexão "%s" levou %.0f ms para ser obtida.', alias, ms)
+
+
+def estatisticas(aliases):
+    """Números deste processo para cada alias em ``aliases``."""
+    faixas = [f'<{limite}ms' for limite in FAIXAS_MS] + [f'>={FAIXAS_MS[-1]}ms']
+    resultado = {}
+    for alias in aliases:
+        with _trava:
+            valores = Counter(_contadores.get(alias, ()))
+        total = valores['total']
+        resultado[alias] = {
+            'aquisicoes': total,
+            'media_ms': round(valores['us'] / total / 1000, 3) if total else None,
+            'faixas': {f: valores[f] for f in faixas},
+        }
+    return resultado
+
+
+def zerar():
+    """Descarta os números acumulados (usado pelos testes)."""
+    with _trava:
+        _contadores.clear()
+
+
+class MedirAquisicaoMixin:
+    """Para ``DatabaseWrapper``: mede cada ``get_new_connection``."""
+
+    def get_new_connection(self, conn_params):
+        inicio = time.perf_counter()
+        conexao = super().get_new_connection(conn_params)
+        registrar(self.alias, time.perf_counter() - inicio)
+        return conexao
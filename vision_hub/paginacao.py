@@ -0,0 +1,41 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+# Abaixo disso o COUNT(*) é barato e exato.
+MINIMO_ESTIMATIVA = 10_000
+
+
+def contagem_estimada(qs):
+    """
+    Linhas de ``qs`` segundo o ``pg_class.reltuples`` (atualizado pelo
+    autovacuum/ANALYZE), sem varrer a tabela. Só vale para a tabela inteira
+    no PostgreSQL; nos demais casos retorna ``None``.
+    """
+    if not isinstance(qs, QuerySet) or qs.query.where or qs.query.distinct:
+        return None
+    conexao = connections[qs.db]
+    if conexao.vendor != 'postgresql':
+        return None
+    with conexao.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+            [qs.model._meta.db_table],
+        )
+        linha = cursor.fetchone()
+    # reltuples é -1 em tabela nunca analisada.
+    if linha is None or linha[0] < MINIMO_ESTIMATIVA:
+        return None
+    return linha[0]
+
+
+class PaginadorEstimado(Paginator):
+    """Paginator do admin que usa ``contagem_estimada`` nas tabelas grandes."""
+
+    @cached_property
+    def count(self):
+        estimativa = contagem_estimada(self.object_list)
+        if estimativa is not None:
+            return estimativa
+        return super().count
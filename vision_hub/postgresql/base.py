@@ -0,0 +1,101 @@
+"""
+Backend PostgreSQL com pool de conexões no processo (``psycopg_pool``).
+
+Com ``OPTIONS['pool']`` (``True`` ou um dict repassado ao
+``ConnectionPool``: ``min_size``, ``max_size``, ``timeout``...) cada thread
+do gunicorn (gthread) pega uma conexão do pool no início da requisição e a
+devolve no fim, em vez de abrir uma nova ou manter uma por thread com
+``CONN_MAX_AGE``. Mesmo desenho do pool nativo do Django 5.1; exige
+psycopg 3.
+"""
+import threading
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel, is_psycopg3
+
+from vision_hub import conexoes
+from vision_hub.conexoes import MedirAquisicaoMixin
+
+from .creation import DatabaseCreation
+
+_pools = {}
+_trava = threading.Lock()
+
+
+class DatabaseWrapper(MedirAquisicaoMixin, base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    @property
+    def pool(self):
+        opcoes = self.settings_dict['OPTIONS'].get('pool')
+        # Conexões avulsas ao banco "postgres" (criar/apagar bancos) não usam pool.
+        if not opcoes or self.alias == NO_DB_ALIAS:
+            return None
+        if self.alias in _pools:
+            return _pools[self.alias]
+        if not is_psycopg3:
+            raise ImproperlyConfigured('OPTIONS["pool"] exige psycopg 3.')
+        if self.settings_dict['CONN_MAX_AGE'] != 0:
+            raise ImproperlyConfigured('Com OPTIONS["pool"], use CONN_MAX_AGE = 0.')
+        try:
+            from psycopg_pool import ConnectionPool
+        except ImportError as erro:
+            raise ImproperlyConfigured('OPTIONS["pool"] exige o pacote psycopg-pool.') from erro
+        with _trava:
+            if self.alias not in _pools:
+                pool = ConnectionPool(
+                    kwargs=self.get_connection_params(),
+                    # Descarta conexões mortas ao tirá-las do pool.
+                    check=ConnectionPool.check_connection,
+                    name=f'vision_hub-{self.alias}',
+                    open=False,
+                    **({} if opcoes is True else opcoes),
+                )
+                pool.open()
+                _pools[self.alias] = pool
+        return _pools[self.alias]
+
+    def close_pool(self):
+        """Devolve a conexão atual e fecha o pool deste alias (recriado no próximo uso)."""
+        if self.alias not in _pools:
+            return
+        self.close()
+        with _trava:
+            pool = _pools.pop(self.alias, None)
+        if pool is not None:
+            pool.close()
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        if self.pool is None:
+            return super().get_new_connection(conn_params)
+        inicio = time.perf_counter()
+        conexao = self.pool.getconn()
+        conexoes.registrar(self.alias, time.perf_counter() - inicio)
+        # Mesmo ajuste de isolamento do get_new_connection do Django.
+        nivel = self.settings_dict['OPTIONS'].get('isolation_level')
+        if nivel is None:
+            self.isolation_level = IsolationLevel.READ_COMMITTED
+        else:
+            try:
+                self.isolation_level = IsolationLevel(nivel)
+            except ValueError:
+                raise ImproperlyConfigured(
+                    f'Nível de isolamento inválido: {nivel}.'
+                ) from None
+            conexao.isolation_level = self.isolation_level
+        return conexao
+
+    def _close(self):
+        if self.connection is not None and self.pool is not None:
+            # Devolve ao pool, que desfaz transações abertas.
+            with self.wrap_database_errors:
+                return self.pool.putconn(self.connection)
+        return super()._close()
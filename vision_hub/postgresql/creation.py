@@ -0,0 +1,16 @@
+from django.db.backends.postgresql import creation
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    """
+    Fecha o pool ao trocar de banco nos testes: as conexões guardadas
+    apontam para o banco anterior e impediriam o DROP do banco de teste.
+    """
+
+    def create_test_db(self, *args, **kwargs):
+        self.connection.close_pool()
+        return super().create_test_db(*args, **kwargs)
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        self.connection.close_pool()
+        return super()._destroy_test_db(test_database_name, verbosity)
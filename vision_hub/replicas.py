@@ -0,0 +1,130 @@
+"""
+Leituras em réplicas.
+
+Só o que roda dentro de ``ler_da_replica()`` (decorador ou ``with``) é
+lido das réplicas de ``settings.DATABASE_REPLICAS``; todo o resto, e toda
+escrita, continua no ``default``. A réplica é escolhida em rodízio, pulando
+as que falharam na última verificação de saúde.
+
+Depois de uma escrita as leituras voltam ao primário: no resto da própria
+requisição e, via cookie do ``ReplicaMiddleware``, por
+``REPLICA_JANELA_PRIMARIO`` segundos, para o usuário ver o que acabou de
+gravar mesmo com atraso na replicação.
+"""
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+COOKIE_PRIMARIO = 'ler_primario'
+
+_ler_da_replica = ContextVar('ler_da_replica', default=False)
+# {'primario': bool, 'escreveu': bool} da requisição em curso (ReplicaMiddleware).
+# Um dict, e não dois ContextVar, para a view síncrona sob ASGI (que roda numa
+# cópia do contexto) conseguir marcar a escrita.
+_requisicao = ContextVar('requisicao', default=None)
+
+_rodizio = itertools.count()
+# alias -> (saudável, time.monotonic() da verificação)
+_saude = {}
+
+
+@contextmanager
+def ler_da_replica():
+    token = _ler_da_replica.set(True)
+    try:
+        yield
+    finally:
+        _ler_da_replica.reset(token)
+
+
+def _saudavel(alias):
+    saudavel, verificado_em = _saude.get(alias, (True, None))
+    agora = time.monotonic()
+    if verificado_em is not None and agora - verificado_em < settings.REPLICA_VERIFICACAO:
+        return saudavel
+    try:
+        with connections[alias].cursor() as cursor:
+            # Uma tabela de verdade: um arquivo SQLite vazio também "conecta".
+            cursor.execute('SELECT 1 FROM django_migrations LIMIT 1')
+        saudavel = True
+    except DatabaseError:
+        logger.warning('Réplica "%s" indisponível; lendo do primário.', alias, exc_info=True)
+        saudavel = False
+    _saude[alias] = (saudavel, agora)
+    return saudavel
+
+
+def escolher_replica():
+    """Próxima réplica saudável no rodízio; ``None`` se não houver."""
+    replicas = settings.DATABASE_REPLICAS
+    inicio = next(_rodizio)
+    for deslocamento in range(len(replicas)):
+        alias = replicas[(inicio + deslocamento) % len(replicas)]
+        if _saudavel(alias):
+            return alias
+    return None
+
+
+class RoteadorReplicas:
+
+    def db_for_read(self, model, **hints):
+        if not _ler_da_replica.get():
+            return None
+        requisicao = _requisicao.get()
+        if requisicao and (requisicao['primario'] or requisicao['escreveu']):
+            return None
+        # Dentro de atomic() a leitura tem de ver a transação em curso.
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return escolher_replica()
+
+    def db_for_write(self, model, **hints):
+        requisicao = _requisicao.get()
+        if requisicao is not None:
+            requisicao['escreveu'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplicas são cópias do mesmo banco.
+        bancos = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in bancos and obj2._state.db in bancos:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        # O esquema chega às réplicas pela replicação.
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaMiddleware:
+    """
+    Lê o cookie de escrita recente no início da requisição e o renova
+    quando a requisição grava algo. Deve vir depois do SessionMiddleware,
+    para a gravação da sessão não contar como escrita do usuário.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        requisicao = {'primario': COOKIE_PRIMARIO in request.COOKIES, 'escreveu': False}
+        token = _requisicao.set(requisicao)
+        try:
+            response = self.get_response(request)
+            if requisicao['escreveu']:
+                response.set_cookie(
+                    COOKIE_PRIMARIO, '1', max_age=settings.REPLICA_JANELA_PRIMARIO,
+                    httponly=True, samesite='Lax', secure=request.is_secure(),
+                )
+        finally:
+            _requisicao.reset(token)
+        return response
@@ -4,6 +4,8 @@ Django settings for vision_hub project.
 import os
 from pathlib import Path
 
+from vision_hub.bancos import banco_da_url
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = os.environ.get(
@@ -41,6 +43,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'vision_hub.replicas.ReplicaMiddleware',
 ]
 
 ROOT_URLCONF = 'vision_hub.urls'
@@ -64,12 +67,63 @@ TEMPLATES = [
 WSGI_APPLICATION = 'vision_hub.wsgi.application'
 
 # ---------- Database ----------
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DATABASE_URL (postgres://… ou sqlite:///…) escolhe o banco; sem ela, SQLite
+# local. Ver vision_hub/bancos.py. Os testes rodam nos dois (ver
+# .github/workflows/testes.yml): DATABASE_URL=postgres://… manage.py test.
+#
+# SQLite com WAL: leitores não bloqueiam o escritor e vice-versa. Os PRAGMAs
+# valem por conexão (ver vision_hub/sqlite/base.py); journal_mode=wal fica
+# gravado no arquivo. Medição: manage.py medir_concorrencia_sqlite.
+SQLITE_OPTIONS = {
+    'transaction_mode': os.environ.get('SQLITE_TRANSACTION_MODE', 'IMMEDIATE'),
+    # PRAGMA optimize a cada N conexões fechadas (por processo); 0 desliga.
+    'optimize_intervalo': int(os.environ.get('SQLITE_OPTIMIZE_INTERVALO', 100)),
+    'pragmas': {
+        'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'wal'),
+        'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'normal'),
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)),     # ms
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 128 * 1024 * 1024)),
+        'cache_size': -int(os.environ.get('SQLITE_CACHE_KB', 20000)),       # KiB
+        'temp_store': 'memory',
+    },
+}
+# PostgreSQL: com DATABASE_POOL_MAX > 0, pool de conexões no processo (uma por
+# thread gthread em uso); senão conexões persistentes por CONN_MAX_AGE.
+DATABASE_POOL = None
+if int(os.environ.get('DATABASE_POOL_MAX', 0)):
+    DATABASE_POOL = {
+        'min_size': int(os.environ.get('DATABASE_POOL_MIN', 2)),
+        'max_size': int(os.environ.get('DATABASE_POOL_MAX')),
+        'timeout': float(os.environ.get('DATABASE_POOL_TIMEOUT', 10)),     # s esperando uma conexão
     }
+_opcoes_banco = {
+    'sqlite_opcoes': SQLITE_OPTIONS,
+    'pool': DATABASE_POOL,
+    'conn_max_age': int(os.environ.get('CONN_MAX_AGE', 60)),
 }
+DATABASES = {
+    'default': banco_da_url(
+        os.environ.get('DATABASE_URL', f'sqlite:///{BASE_DIR / "db.sqlite3"}'), **_opcoes_banco,
+    ),
+}
+
+# ---------- Réplicas de leitura ----------
+# DATABASE_REPLICA_URLS: URLs separadas por vírgula, cada uma vira o alias
+# replica_N, aberta só para leitura. Só leituras dentro de
+# vision_hub.replicas.ler_da_replica() vão para elas. Localmente, uma cópia do
+# primário serve de réplica:
+#   sqlite3 db.sqlite3 ".backup replica.sqlite3"
+#   DATABASE_REPLICA_URLS=sqlite:///replica.sqlite3
+DATABASE_REPLICAS = []
+for _i, _url in enumerate(filter(None, os.environ.get('DATABASE_REPLICA_URLS', '').split(',')), 1):
+    DATABASE_REPLICAS.append(f'replica_{_i}')
+    DATABASES[f'replica_{_i}'] = {
+        **banco_da_url(_url.strip(), somente_leitura=True, **_opcoes_banco),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['vision_hub.replicas.RoteadorReplicas']
+REPLICA_JANELA_PRIMARIO = int(os.environ.get('REPLICA_JANELA_PRIMARIO', 5))   # segundos lendo do primário após uma escrita
+REPLICA_VERIFICACAO = int(os.environ.get('REPLICA_VERIFICACAO', 10))           # segundos entre verificações de saúde
 
 # ---------- Auth ----------
 AUTH_PASSWORD_VALIDATORS = [
@@ -100,18 +154,71 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
 # ---------- Upload ----------
-DATA_UPLOAD_MAX_MEMORY_SIZE = 524288000   # 500 MB
-FILE_UPLOAD_MAX_MEMORY_SIZE = 524288000   # 500 MB
+# Os vídeos são gravados em disco chunk a chunk (chamados.uploadhandlers),
+# então os limites em memória ficam nos padrões do Django.
+DATA_UPLOAD_MAX_MEMORY_SIZE = 2621440     # 2.5 MB (campos que não são arquivo)
+FILE_UPLOAD_MAX_MEMORY_SIZE = 2621440     # 2.5 MB
 
 # Formatos de vídeo aceitos
 ALLOWED_VIDEO_EXTENSIONS = ['.mp4', '.mov', '.avi', '.mkv', '.wmv', '.webm']
 MAX_VIDEO_FILE_SIZE = 500 * 1024 * 1024   # 500 MB
+VIDEO_INGESTAO_THREADS = 4                # gravações simultâneas por envio em lote
+
+# Armazenamento deduplicado: cada conteúdo (SHA-256) é gravado uma única vez
+# em videos/blobs/ e compartilhado entre os vídeos que o referenciam.
+VIDEO_DEDUPLICACAO = os.environ.get('VIDEO_DEDUPLICACAO', 'True').lower() in ('true', '1', 'yes')
+
+# Arquivos de vídeos excluídos são removidos por uma thread em segundo plano
+REMOCAO_ASSINCRONA = True
+# Faststart dos vídeos enviados por uma thread em segundo plano (fora da requisição)
+OTIMIZACAO_ASSINCRONA = True
+
+# Upload retomável (partes numeradas)
+UPLOAD_SESSAO_DIR = BASE_DIR / 'uploads_parciais'
+UPLOAD_SESSAO_TAMANHO_PARTE = 8 * 1024 * 1024   # 8 MB
+UPLOAD_SESSAO_VALIDADE = 24 * 60 * 60           # segundos sem atividade
+
+# ---------- Listagem ----------
+CHAMADOS_POR_PAGINA = 25
+CHAMADOS_LIMITE_CONTAGEM = 1000   # acima disso a lista mostra "1000+"
+
+# ---------- Arquivamento (comando arquivar_chamados) ----------
+ARQUIVAMENTO_DIAS = int(os.environ.get('ARQUIVAMENTO_DIAS', 180))   # fechados sem atividade há N dias
+ARQUIVAMENTO_LOTE = int(os.environ.get('ARQUIVAMENTO_LOTE', 500))   # chamados por transação
+
+# ---------- Cache ----------
+# CACHE_URL: redis://host:6379/0, memcached://host:11211 ou vazio (memória local,
+# por processo). Em produção com vários workers use um cache compartilhado.
+# Os clientes (redis, pymemcache) estão no requirements.txt.
+CACHE_URL = os.environ.get('CACHE_URL', '')
+if CACHE_URL.startswith(('redis://', 'rediss://', 'unix://')):
+    CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_URL,
+    }}
+elif CACHE_URL.startswith('memcached://'):
+    CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': CACHE_URL.removeprefix('memcached://'),
+    }}
+else:
+    CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'vision-hub',
+    }}
+DASHBOARD_CACHE_TIMEOUT = int(os.environ.get('DASHBOARD_CACHE_TIMEOUT', 300))   # segundos
+COMPARTILHADO_CACHE_TIMEOUT = int(os.environ.get('COMPARTILHADO_CACHE_TIMEOUT', 600))
+# Cache-Control max-age dos vídeos de chamados públicos (proxies/CDN); o HTML é sempre privado
+COMPARTILHADO_MAX_AGE = int(os.environ.get('COMPARTILHADO_MAX_AGE', 60))
+# Validade do cookie assinado que libera um chamado protegido por senha
+COMPARTILHADO_ACESSO_MAX_AGE = int(os.environ.get('COMPARTILHADO_ACESSO_MAX_AGE', 60 * 60 * 12))
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # ---------- Heroku ----------
 try:
     import django_heroku
-    django_heroku.settings(locals())
+    # O banco já vem de DATABASE_URL acima (com pool/CONN_MAX_AGE próprios).
+    django_heroku.settings(locals(), databases=False)
 except ImportError:
     pass
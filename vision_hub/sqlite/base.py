@@ -0,0 +1,95 @@
+"""
+Backend SQLite para produção: o mesmo do Django, mais PRAGMAs aplicados a
+cada nova conexão e ``BEGIN IMMEDIATE`` nas transações.
+
+OPTIONS extras (retiradas antes de chegar ao ``sqlite3.connect``):
+
+``pragmas``
+    dict ``{nome: valor}`` executado como ``PRAGMA nome = valor``.
+``transaction_mode``
+    ``DEFERRED``, ``IMMEDIATE`` ou ``EXCLUSIVE``. Com ``IMMEDIATE`` o
+    ``atomic()`` reserva a escrita no ``BEGIN``: o ``busy_timeout`` vale
+    para a espera, em vez de um "database is locked" imediato quando uma
+    transação de leitura tenta virar de escrita.
+``optimize_intervalo``
+    a cada quantos fechamentos de conexão (por alias, no processo) roda
+    ``PRAGMA optimize``; 0 desliga. Padrão: 100.
+
+``PRAGMA optimize`` atualiza as estatísticas (``ANALYZE``) das tabelas que a
+conexão consultou, se ainda não existirem ou tiverem mudado muito. Roda só de
+tempos em tempos, para não somar a verificação a toda requisição. Sem elas o planejador supõe ~10 linhas por valor de índice e,
+por exemplo, parte de ``chamados_chamado`` (índice de ``criado_por``) para
+conferir o ``MATCH`` do FTS5 linha a linha, em vez de partir do índice de
+busca.
+"""
+import sqlite3
+import threading
+from collections import Counter
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+from vision_hub.conexoes import MedirAquisicaoMixin
+
+MODOS_TRANSACAO = {'DEFERRED', 'IMMEDIATE', 'EXCLUSIVE'}
+OPTIMIZE_INTERVALO = 100
+
+_fechamentos = Counter()
+_trava = threading.Lock()
+
+
+def aplicar_pragmas(conexao, pragmas):
+    """Executa ``pragmas`` em uma conexão ``sqlite3`` recém-aberta."""
+    for nome, valor in pragmas.items():
+        if not nome.isidentifier():
+            raise ImproperlyConfigured(f'PRAGMA inválido: {nome!r}.')
+        conexao.execute(f'PRAGMA {nome} = {valor}')
+
+
+def validar_modo(modo):
+    if modo is None:
+        return None
+    if modo.upper() not in MODOS_TRANSACAO:
+        raise ImproperlyConfigured(
+            f'transaction_mode deve ser um de {sorted(MODOS_TRANSACAO)}, não {modo!r}.'
+        )
+    return modo.upper()
+
+
+class DatabaseWrapper(MedirAquisicaoMixin, base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = params.pop('pragmas', {})
+        self.transaction_mode = validar_modo(params.pop('transaction_mode', None))
+        self.optimize_intervalo = int(params.pop('optimize_intervalo', OPTIMIZE_INTERVALO))
+        return params
+
+    def get_new_connection(self, conn_params):
+        conexao = super().get_new_connection(conn_params)
+        aplicar_pragmas(conexao, self.pragmas)
+        return conexao
+
+    def _otimizar_agora(self):
+        if self.pragmas.get('query_only') or self.optimize_intervalo <= 0:
+            return False
+        with _trava:
+            _fechamentos[self.alias] += 1
+            return _fechamentos[self.alias] % self.optimize_intervalo == 0
+
+    def _close(self):
+        if self.connection is not None and self._otimizar_agora():
+            try:
+                # analysis_limit: ANALYZE por amostragem, curto mesmo em tabelas grandes.
+                self.connection.execute('PRAGMA analysis_limit = 400')
+                self.connection.execute('PRAGMA optimize')
+            except sqlite3.Error:
+                # Banco ocupado ou somente leitura: fica para o próximo intervalo.
+                pass
+        super()._close()
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode:
+            self.cursor().execute(f'BEGIN {self.transaction_mode}')
+        else:
+            super()._start_transaction_under_autocommit()